@@ -0,0 +1,90 @@
+"""
+Broadcast latency with slow WebSocket subscribers.
+
+One match with 100 subscribers, 5 of which take 250 ms per send (a stalled
+overlay). Score updates are applied through the REST handler every ~5 ms;
+for each one the script measures how long the handler took (the time a
+mutation keeps the match locked and the caller waiting) and how long until
+every fast subscriber has received a frame:
+
+    python benchmarks/bench_broadcast.py --before 9539b89
+
+--before takes git revisions to measure besides the working tree
+(comma-separated), e.g. the revision before concurrent fan-out.
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+
+from common import (FakeWebSocket, load_main, make_trees, percentile, report, run_variant, subscribe,
+                    unsubscribe_all)
+
+MATCH_ID = "bench"
+
+
+async def workload(server, subscribers: int, slow: int, updates: int) -> dict:
+    clients = [FakeWebSocket(0.25 if i < slow else 0.0) for i in range(subscribers)]
+    fast = clients[slow:]
+    for client in clients:
+        subscribe(server, MATCH_ID, client)
+    await asyncio.sleep(0.05)
+
+    handler_times = []
+    delivery_times = []
+    for _ in range(updates):
+        before = [client.received for client in fast]
+        started = time.perf_counter()
+        await server.update_score(MATCH_ID, server.ScoreRequest(team="home", delta=1))
+        handler_times.append(time.perf_counter() - started)
+        while any(client.received == count for client, count in zip(fast, before)):
+            await asyncio.sleep(0)
+        delivery_times.append(time.perf_counter() - started)
+        await asyncio.sleep(0.005)
+
+    connected = len(server.connections.get(MATCH_ID, ()))
+    unsubscribe_all(server)
+    return {
+        "delivery_p50": percentile(delivery_times, 0.5) * 1000,
+        "delivery_p99": percentile(delivery_times, 0.99) * 1000,
+        "handler_p50": percentile(handler_times, 0.5) * 1000,
+        "handler_p99": percentile(handler_times, 0.99) * 1000,
+        "connected": connected
+    }
+
+
+def run(args):
+    server = load_main(args.run)
+
+    async def measure():
+        async with server.lifespan(server.app):
+            return await workload(server, args.subscribers, args.slow, args.updates)
+
+    report(asyncio.run(measure()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--before", help="git revisions to compare with the working tree (comma-separated)")
+    parser.add_argument("--subscribers", type=int, default=100)
+    parser.add_argument("--slow", type=int, default=5, help="subscribers taking 250 ms per send")
+    parser.add_argument("--updates", type=int, default=100)
+    parser.add_argument("--run", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.run:
+        run(args)
+        return
+
+    options = ["--subscribers", str(args.subscribers), "--slow", str(args.slow), "--updates", str(args.updates)]
+    print(f"{args.subscribers} subscribers ({args.slow} slow), {args.updates} score updates; milliseconds")
+    with tempfile.TemporaryDirectory(prefix="vmix-score-bench-") as directory:
+        for label, tree in make_trees(directory, args.before):
+            result = run_variant(__file__, tree, options)
+            print(f"{label:>12}: fast-subscriber delivery p50 {result['delivery_p50']:.2f}, "
+                  f"p99 {result['delivery_p99']:.2f}; handler p50 {result['handler_p50']:.2f}, "
+                  f"p99 {result['handler_p99']:.2f}; still connected {result['connected']}")
+
+
+if __name__ == "__main__":
+    main()
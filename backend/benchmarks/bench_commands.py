@@ -0,0 +1,108 @@
+"""
+Match commands: REST requests vs commands over the match WebSocket.
+
+Starts the server from a temporary copy of the tree (port 8000, so nothing
+else may listen there) with one overlay subscribed to the match, then sends
+score updates one after another, first as REST requests on a keep-alive
+connection and then as {"type": "command"} messages on a WebSocket. For each
+update it measures the time until the response or ack, and until the overlay
+has received the new score:
+
+    python benchmarks/bench_commands.py --updates 500
+
+The control panel and the server are same-origin, so no CORS preflight is
+involved in the REST numbers.
+"""
+
+import argparse
+import asyncio
+import http.client
+import json
+import re
+import tempfile
+import time
+
+import websockets
+
+from bench_workers import HOST, MATCH_ID, PORT, post, start_server, stop_server
+from common import make_tree, percentile
+
+SCORE = re.compile(r'"homeScore":(\d+)')
+
+
+async def measure(updates: int) -> dict:
+    url = f"ws://{HOST}:{PORT}/ws/match/{MATCH_ID}"
+    overlay = await websockets.connect(url, max_queue=None)
+    await overlay.recv()
+    received = {}
+
+    async def read_overlay():
+        async for message in overlay:
+            score = SCORE.search(message)
+            if score is not None:
+                received.setdefault(int(score.group(1)), time.perf_counter())
+
+    reader = asyncio.create_task(read_overlay())
+
+    async def wait_for_overlay(score: int):
+        while score not in received:
+            await asyncio.sleep(0)
+
+    rest_replies, rest_events = [], []
+    connection = http.client.HTTPConnection(HOST, PORT)
+    for score in range(1, updates + 1):
+        started = time.perf_counter()
+        # In a thread, so the overlay is read while the request is in flight
+        await asyncio.to_thread(post, connection, f"/api/match/{MATCH_ID}/score", {"team": "home", "delta": 1})
+        rest_replies.append(time.perf_counter() - started)
+        await wait_for_overlay(score)
+        rest_events.append(received[score] - started)
+    connection.close()
+
+    ws_replies, ws_events = [], []
+    control = await websockets.connect(url, max_queue=None)
+    await control.recv()
+    for score in range(updates + 1, 2 * updates + 1):
+        started = time.perf_counter()
+        await control.send(json.dumps({"type": "command", "id": score, "op": "score",
+                                       "args": {"team": "home", "delta": 1}}))
+        while True:
+            message = json.loads(await control.recv())
+            if message.get("type") == "ack" and message.get("id") == score:
+                break
+        if not message["ok"]:
+            raise RuntimeError(f"command failed: {message}")
+        ws_replies.append(time.perf_counter() - started)
+        await wait_for_overlay(score)
+        ws_events.append(received[score] - started)
+    await control.close()
+
+    reader.cancel()
+    await overlay.close()
+    return {
+        "REST": (rest_replies, rest_events),
+        "WebSocket": (ws_replies, ws_events)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--updates", type=int, default=500, help="score updates per transport")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="vmix-score-bench-") as directory:
+        server = start_server(make_tree(directory), 0)
+        try:
+            results = asyncio.run(measure(args.updates))
+        finally:
+            stop_server(server)
+
+    print(f"{args.updates} score updates per transport; milliseconds")
+    for label, (replies, events) in results.items():
+        print(f"{label:>10}: response/ack p50 {percentile(replies, 0.5) * 1000:.2f}, "
+              f"p99 {percentile(replies, 0.99) * 1000:.2f}; overlay event p50 {percentile(events, 0.5) * 1000:.2f}, "
+              f"p99 {percentile(events, 0.99) * 1000:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Overhead of the /metrics instrumentation on the mutation path.
+
+Runs the same workload with the instrumentation on and off, in alternating
+processes so that drift of the machine affects both alike:
+
+    python benchmarks/bench_metrics.py --rounds 5
+
+"off" removes MetricsMiddleware and turns every counter increment and
+histogram observation into a no-op. The workload is one match with 50
+WebSocket clients (they accept frames at once): score mutations called
+directly (run_match_commands, which includes the broadcast) and through the
+ASGI app (REST, with the middleware).
+
+Differences of a few percent between the variants are within run-to-run
+noise, so the "on" processes also time the instrumentation itself: one
+histogram observation with its two perf_counter() calls (once per mutation,
+in broadcast_event) and MetricsMiddleware around an empty ASGI app (once per
+request).
+"""
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+
+from common import FakeWebSocket, load_main, make_tree, report, run_variant, spread, subscribe, unsubscribe_all
+
+MATCH_ID = "bench"
+
+
+async def empty_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def instrumentation_costs(server, calls: int = 100000) -> dict:
+    """Microseconds per broadcast observation and per request through MetricsMiddleware"""
+    histogram = server.MetricHistogram("bench_seconds", "", server.METRICS_SECONDS_BUCKETS)
+    started = time.perf_counter()
+    for _ in range(calls):
+        histogram.observe(time.perf_counter() - time.perf_counter())
+    observe_us = (time.perf_counter() - started) / calls * 1e6
+
+    async def receive():
+        return {"type": "http.request"}
+
+    async def send(message):
+        pass
+
+    class Route:
+        path = "/api/match/{match_id}/score"
+
+    scope = {"type": "http", "method": "POST", "route": Route()}
+    costs = {}
+    for label, app in (("bare", empty_app), ("timed", server.MetricsMiddleware(empty_app))):
+        started = time.perf_counter()
+        for _ in range(calls):
+            await app(scope, receive, send)
+        costs[label] = (time.perf_counter() - started) / calls * 1e6
+    server.metrics_registry.remove(histogram)
+    return {"observe_us": observe_us, "middleware_us": costs["timed"] - costs["bare"]}
+
+
+def disable_metrics(server):
+    server.app.user_middleware = [entry for entry in server.app.user_middleware
+                                  if entry.cls is not server.MetricsMiddleware]
+    server.MetricCounter.inc = lambda self, *label_values, amount=1: None
+    server.MetricHistogram.observe = lambda self, value, *label_values: None
+
+
+async def workload(server, clients: int, direct: int, rest: int) -> dict:
+    import httpx
+
+    async with server.lifespan(server.app):
+        for _ in range(clients):
+            subscribe(server, MATCH_ID, FakeWebSocket())
+        commands = server.parse_match_commands([server.MatchCommand(op="score", args={"team": "away", "delta": 1})])
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            # Warm-up (payload encoders, route table, middleware stack)
+            for _ in range(50):
+                await server.run_match_commands(MATCH_ID, commands)
+                await client.post(f"/api/match/{MATCH_ID}/score", json={"team": "home", "delta": 1})
+
+            started = time.perf_counter()
+            for _ in range(direct):
+                await server.run_match_commands(MATCH_ID, commands)
+            direct_us = (time.perf_counter() - started) / direct * 1e6
+            await asyncio.sleep(0.05)
+
+            started = time.perf_counter()
+            for _ in range(rest):
+                await client.post(f"/api/match/{MATCH_ID}/score", json={"team": "home", "delta": 1})
+            rest_us = (time.perf_counter() - started) / rest * 1e6
+        unsubscribe_all(server)
+    return {"direct_us": direct_us, "rest_us": rest_us}
+
+
+async def run_workload(server, args) -> dict:
+    result = await workload(server, args.clients, args.direct, args.rest)
+    if args.metrics == "on":
+        result.update(await instrumentation_costs(server))
+    return result
+
+
+def run(args):
+    server = load_main(args.run)
+    if args.metrics == "off":
+        disable_metrics(server)
+    report(asyncio.run(run_workload(server, args)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=5, help="processes per variant")
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--direct", type=int, default=5000, help="direct mutations per process")
+    parser.add_argument("--rest", type=int, default=1000, help="REST mutations per process")
+    parser.add_argument("--run", help=argparse.SUPPRESS)
+    parser.add_argument("--metrics", default="on", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.run:
+        run(args)
+        return
+
+    options = ["--clients", str(args.clients), "--direct", str(args.direct), "--rest", str(args.rest)]
+    results = {"on": [], "off": []}
+    with tempfile.TemporaryDirectory(prefix="vmix-score-bench-") as directory:
+        tree = make_tree(directory)
+        for _ in range(args.rounds):
+            for variant in results:
+                results[variant].append(run_variant(__file__, tree, options + ["--metrics", variant]))
+
+    print(f"{args.clients} WebSocket clients, {args.rounds} processes per variant; "
+          f"microseconds per mutation, median (range)")
+    for key, label in (("direct_us", "direct"), ("rest_us", "REST")):
+        on = [result[key] for result in results["on"]]
+        off = [result[key] for result in results["off"]]
+        overhead = (statistics.median(on) / statistics.median(off) - 1) * 100
+        print(f"{label:>8}: metrics off {spread(off)}, on {spread(on)}, overhead {overhead:+.1f}%")
+    observe = [result["observe_us"] for result in results["on"]]
+    middleware = [result["middleware_us"] for result in results["on"]]
+    print(f"instrumentation: {spread(observe)} us per mutation (broadcast observation), "
+          f"{spread(middleware)} us per request (MetricsMiddleware)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Mutation throughput across concurrent matches.
+
+N matches, each with a running timer, 10 WebSocket subscribers (0.5 ms per
+send) and 4 tasks sending score updates through the REST handlers as fast
+as they are answered. Meanwhile one extra, otherwise quiet match gets a score
+tap every 20 ms, whose handler time shows how long a tap on one table waits
+behind the others:
+
+    python benchmarks/bench_mutations.py --matches 1,12,48 --before 9539b89
+
+--before takes git revisions to measure besides the working tree
+(comma-separated).
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+
+from common import FakeWebSocket, load_main, make_trees, percentile, report, run_variant, subscribe, unsubscribe_all
+
+QUIET_MATCH_ID = "quiet"
+
+
+async def workload(server, match_count: int, seconds: float) -> dict:
+    match_ids = [f"table{i}" for i in range(match_count)]
+    for match_id in match_ids + [QUIET_MATCH_ID]:
+        for _ in range(10):
+            subscribe(server, match_id, FakeWebSocket(0.0005))
+    for match_id in match_ids:
+        await server.set_timer(match_id, server.TimerSetRequest(seconds=3600))
+        await server.start_timer(match_id)
+
+    count = 0
+    deadline = time.perf_counter() + seconds
+
+    async def writer(match_id: str):
+        nonlocal count
+        while time.perf_counter() < deadline:
+            await server.update_score(match_id, server.ScoreRequest(team="home", delta=1))
+            count += 1
+            await asyncio.sleep(0)
+
+    taps = []
+
+    async def tapper():
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            await server.update_score(QUIET_MATCH_ID, server.ScoreRequest(team="away", delta=1))
+            taps.append(time.perf_counter() - started)
+            await asyncio.sleep(0.02)
+
+    await asyncio.gather(tapper(), *(writer(match_id) for match_id in match_ids for _ in range(4)))
+    for match_id in match_ids:
+        await server.stop_timer(match_id)
+    unsubscribe_all(server)
+    return {
+        "mutations_per_second": count / seconds,
+        "tap_p50": percentile(taps, 0.5) * 1000,
+        "tap_p99": percentile(taps, 0.99) * 1000
+    }
+
+
+def run(args):
+    server = load_main(args.run)
+
+    async def measure():
+        async with server.lifespan(server.app):
+            return {match_count: await workload(server, match_count, args.seconds)
+                    for match_count in [int(value) for value in args.matches.split(",")]}
+
+    report(asyncio.run(measure()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--before", help="git revisions to compare with the working tree (comma-separated)")
+    parser.add_argument("--matches", default="1,12,48", help="comma-separated numbers of busy matches")
+    parser.add_argument("--seconds", type=float, default=3.0, help="duration per number of matches")
+    parser.add_argument("--run", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.run:
+        run(args)
+        return
+
+    options = ["--matches", args.matches, "--seconds", str(args.seconds)]
+    print(f"Score updates through the REST handlers, {args.seconds:g} s per run; quiet-table tap in milliseconds")
+    with tempfile.TemporaryDirectory(prefix="vmix-score-bench-") as directory:
+        for label, tree in make_trees(directory, args.before):
+            for match_count, result in run_variant(__file__, tree, options).items():
+                print(f"{label:>12}, {int(match_count):>3} matches: {result['mutations_per_second']:>8,.0f} mutations/s, "
+                      f"quiet-table tap p50 {result['tap_p50']:.2f}, p99 {result['tap_p99']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Match journal: recovery time at startup and the cost of journaling a change.
+
+Fills the journal with a full day of changes (by default 24 tables and 57,600
+records, i.e. 10 hours at one change per table every 15 s) and measures how
+long recover_matches takes with the whole day in the journal, with a snapshot
+plus a tail just below the compaction threshold (the usual case), and with the
+snapshot alone:
+
+    python benchmarks/bench_recovery.py --before "dfa6f94^,dfa6f94"
+
+The score-update handler time is measured on every tree, so --before (git
+revisions, comma-separated) shows what journaling adds to a mutation; trees
+without a journal report no recovery times.
+"""
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+
+from common import load_main, make_trees, report, run_variant
+
+
+async def handler_ms(server, updates: int) -> float:
+    """Median milliseconds of a score update through the REST handler"""
+    latencies = []
+    for _ in range(updates):
+        started = time.perf_counter()
+        await server.update_score("tap", server.ScoreRequest(team="home", delta=1))
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(0)
+    return statistics.median(latencies) * 1000
+
+
+def recover_ms(server) -> float:
+    server.matches.clear()
+    started = time.perf_counter()
+    server.recover_matches()
+    return (time.perf_counter() - started) * 1000
+
+
+async def journal_changes(server, count: int, tables: int):
+    """Journal `count` changes spread over `tables` matches and write them"""
+    for n in range(count):
+        state = server.get_or_create_match(f"table{n % tables}")
+        state.homeScore += 1
+        state.rev += 1
+        server.journal_match(state)
+        if n % 200 == 0:
+            await asyncio.sleep(0)
+    await server.flush_journal()
+
+
+async def recovery(server, tables: int, records: int) -> dict:
+    # Compaction is triggered by hand below
+    server.JOURNAL_COMPACT_RECORDS = float("inf")
+    await journal_changes(server, records, tables)
+    result = {"journal_mb": server.get_journal_path().stat().st_size / 1e6,
+              "full_journal": recover_ms(server)}
+
+    await server.compact_journal()
+    await journal_changes(server, 4999, tables)
+    result["snapshot_and_tail"] = recover_ms(server)
+
+    await server.compact_journal()
+    result["snapshot"] = recover_ms(server)
+    return result
+
+
+def run(args):
+    server = load_main(args.run)
+
+    async def measure():
+        async with server.lifespan(server.app):
+            result = {"handler_ms": await handler_ms(server, args.updates)}
+            if hasattr(server, "recover_matches"):
+                result.update(await recovery(server, args.tables, args.records))
+            return result
+
+    report(asyncio.run(measure()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--before", help="git revisions to compare with the working tree (comma-separated)")
+    parser.add_argument("--tables", type=int, default=24)
+    parser.add_argument("--records", type=int, default=57600, help="journal records of the full day")
+    parser.add_argument("--updates", type=int, default=2000, help="score updates for the handler time")
+    parser.add_argument("--run", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.run:
+        run(args)
+        return
+
+    options = ["--tables", str(args.tables), "--records", str(args.records), "--updates", str(args.updates)]
+    print(f"{args.tables} tables, {args.records:,} journal records; milliseconds")
+    with tempfile.TemporaryDirectory(prefix="vmix-score-bench-") as directory:
+        for label, tree in make_trees(directory, args.before):
+            result = run_variant(__file__, tree, options)
+            line = f"{label:>12}: score update handler p50 {result['handler_ms']:.3f}"
+            if "full_journal" in result:
+                line += (f"; recovery from the whole day ({result['journal_mb']:.1f} MB) "
+                         f"{result['full_journal']:.0f}, snapshot + 4999-record tail "
+                         f"{result['snapshot_and_tail']:.0f}, snapshot alone {result['snapshot']:.1f}")
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Tournament storage: JSON file vs SQLite (WAL).
+
+For each backend and tournament size, measures what persisting one added
+player costs (building the document if the backend needs it, plus the write
+and its fsync), how long loading the data at startup takes, and how long the
+one-shot migration from tournaments.json to SQLite takes:
+
+    python benchmarks/bench_storage.py --sizes 10,1000,50000 --adds 30
+
+Each backend runs in its own process on a temporary copy of the server.
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+
+from common import load_main, make_tree, report, run_variant
+
+
+def fill(server, players: int):
+    """Replace tournaments_data with one tournament of `players` players"""
+    now = time.time()
+    tournament = server.Tournament(id="t1", name="Bench", created_at=now, players=[
+        server.Player(id=str(i), name=f"Player {i}", created_at=now) for i in range(players)
+    ])
+    server.tournaments_data = server.TournamentData(
+        tournaments={"t1": tournament}, current_tournament_id="t1",
+        tournament_id_counter=1, player_id_counter=players
+    )
+    return tournament
+
+
+def reset_data_directory(server):
+    server.tournament_storage = None
+    for path in server.get_data_directory().iterdir():
+        path.unlink()
+
+
+def add_player_ms(server, backend: str, players: int, adds: int) -> float:
+    """Median milliseconds to persist one added player"""
+    reset_data_directory(server)
+    if backend == "sqlite":
+        # The SQLite backend is used once the database exists
+        server.SQLiteTournamentStorage(server.get_tournaments_db_path()).close()
+    tournament = fill(server, players)
+    storage = server.get_tournament_storage()
+    storage.write_document(server.build_tournaments_document(server.tournaments_data))
+
+    latencies = []
+    for _ in range(adds):
+        server.tournaments_data.player_id_counter += 1
+        player = server.Player(id=str(server.tournaments_data.player_id_counter), name="New", created_at=time.time())
+        server.add_tournament_player(tournament, player)
+        started = time.perf_counter()
+        document = server.build_tournaments_document(server.tournaments_data) if storage.full_document else None
+        storage.write(document, [server.player_change("t1", player), server.meta_change()])
+        latencies.append(time.perf_counter() - started)
+    return statistics.median(latencies) * 1000
+
+
+def load_ms(server) -> float:
+    """Milliseconds to load and validate the stored data (as at startup)"""
+    server.tournament_storage = None
+    started = time.perf_counter()
+    server.load_tournaments_data()
+    return (time.perf_counter() - started) * 1000
+
+
+def migrate_ms(server, players: int) -> float:
+    """Milliseconds to migrate a tournaments.json of `players` players to SQLite"""
+    reset_data_directory(server)
+    fill(server, players)
+    server.JSONTournamentStorage(server.get_tournaments_file_path()).write_document(
+        server.build_tournaments_document(server.tournaments_data)
+    )
+    started = time.perf_counter()
+    server.migrate_tournaments_to_sqlite()
+    return (time.perf_counter() - started) * 1000
+
+
+def run(args):
+    server = load_main(args.run)
+    result = {}
+    for players in [int(value) for value in args.sizes.split(",")]:
+        entry = {"add_ms": add_player_ms(server, args.backend, players, args.adds), "load_ms": load_ms(server)}
+        if args.backend == "sqlite":
+            entry["migrate_ms"] = migrate_ms(server, players)
+        result[players] = entry
+    server.tournament_storage = None
+    report(result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10,1000,50000", help="comma-separated players per tournament")
+    parser.add_argument("--adds", type=int, default=30, help="players added (and persisted) per size")
+    parser.add_argument("--run", help=argparse.SUPPRESS)
+    parser.add_argument("--backend", default="json", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.run:
+        run(args)
+        return
+
+    options = ["--sizes", args.sizes, "--adds", str(args.adds)]
+    with tempfile.TemporaryDirectory(prefix="vmix-score-bench-") as directory:
+        tree = make_tree(directory)
+        results = {backend: run_variant(__file__, tree, options + ["--backend", backend])
+                   for backend in ("json", "sqlite")}
+
+    print(f"Median of {args.adds} player adds per size; milliseconds")
+    print(f"{'players':>8}  {'add json':>9}  {'add sqlite':>10}  {'load json':>9}  {'load sqlite':>11}  {'migrate':>8}")
+    for players in results["json"]:
+        json_entry, sqlite_entry = results["json"][players], results["sqlite"][players]
+        print(f"{int(players):>8,}  {json_entry['add_ms']:>9.2f}  {sqlite_entry['add_ms']:>10.2f}  "
+              f"{json_entry['load_ms']:>9.1f}  {sqlite_entry['load_ms']:>11.1f}  {sqlite_entry['migrate_ms']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+Fan-out benchmark for multi-process mode (python main.py --workers N).
+
+Starts the server from a temporary copy of the tree (port 8000, so nothing
+else may listen there), connects many WebSocket clients to one match from
+several client processes, sends score updates as fast as the server accepts
+them, and measures how long it takes until every client has seen the last
+update. Each server layout is measured in turn:
+
+    python benchmarks/bench_workers.py --workers 0,1,2,4 --clients 1000 --updates 300
+
+`0` is the default single-process server. Deliveries per second (clients x
+updates / time) should grow with the number of workers as long as there are
+free cores for them; on a machine with fewer cores than workers it cannot.
+CPU seconds per server process are read from /proc (Linux).
+"""
+
+import argparse
+import asyncio
+import http.client
+import json
+import multiprocessing
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import websockets
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+ROOT_DIR = BACKEND_DIR.parent
+HOST = "127.0.0.1"
+PORT = 8000
+MATCH_ID = "bench"
+
+
+def post(connection: http.client.HTTPConnection, path: str, body: dict):
+    connection.request("POST", path, json.dumps(body), {"Content-Type": "application/json"})
+    response = connection.getresponse()
+    response.read()
+    if response.status != 200:
+        raise RuntimeError(f"{path} answered {response.status}")
+
+
+def client_process(clients: int, target: int, results: multiprocessing.Queue):
+    """Connect `clients` WebSockets and report when all of them saw the target score"""
+    marker = f'"homeScore":{target},'
+
+    async def run():
+        sockets = []
+        for _ in range(clients):
+            websocket = await websockets.connect(f"ws://{HOST}:{PORT}/ws/match/{MATCH_ID}", max_queue=None)
+            await websocket.recv()
+            sockets.append(websocket)
+        results.put(("ready", None, None))
+
+        frames = 0
+
+        async def read(websocket):
+            nonlocal frames
+            while True:
+                message = await websocket.recv()
+                frames += 1
+                if marker in message:
+                    return
+
+        await asyncio.gather(*(read(websocket) for websocket in sockets))
+        results.put(("done", time.time(), frames))
+        for websocket in sockets:
+            await websocket.close()
+
+    asyncio.run(run())
+
+
+def server_cpu_seconds(server: subprocess.Popen) -> dict:
+    """CPU seconds (user + system) of the server process and its children, by pid"""
+    pids = [server.pid]
+    try:
+        children = subprocess.run(["pgrep", "-P", str(server.pid)], capture_output=True, text=True).stdout.split()
+    except FileNotFoundError:
+        children = []
+    pids += [int(pid) for pid in children]
+    cpu = {}
+    for pid in pids:
+        try:
+            fields = Path(f"/proc/{pid}/stat").read_text().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        cpu[pid] = (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    return cpu
+
+
+def start_server(tree: Path, workers: int) -> subprocess.Popen:
+    command = [sys.executable, "main.py"] + (["--workers", str(workers)] if workers else [])
+    server = subprocess.Popen(command, cwd=tree / "backend", stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection(HOST, PORT, timeout=1)
+            post(connection, f"/api/match/{MATCH_ID}/reset", {})
+            connection.close()
+            # Let every worker finish starting
+            time.sleep(1 + workers * 0.5)
+            return server
+        except (OSError, RuntimeError):
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError("server did not start")
+
+
+def stop_server(server: subprocess.Popen):
+    server.send_signal(signal.SIGINT)
+    try:
+        server.wait(30)
+    except subprocess.TimeoutExpired:
+        server.kill()
+        server.wait()
+
+
+def measure(tree: Path, workers: int, clients: int, updates: int, client_processes: int) -> dict:
+    server = start_server(tree, workers)
+    try:
+        results = multiprocessing.Queue()
+        share = [clients // client_processes + (i < clients % client_processes) for i in range(client_processes)]
+        processes = [
+            multiprocessing.Process(target=client_process, args=(count, updates, results), daemon=True)
+            for count in share if count
+        ]
+        for process in processes:
+            process.start()
+        for _ in processes:
+            results.get(timeout=120)
+
+        cpu_before = server_cpu_seconds(server)
+        connection = http.client.HTTPConnection(HOST, PORT)
+        started = time.time()
+        for _ in range(updates):
+            post(connection, f"/api/match/{MATCH_ID}/score", {"team": "home", "delta": 1})
+        sent = time.time()
+        connection.close()
+
+        finished = started
+        frames = 0
+        for _ in processes:
+            _, done_at, process_frames = results.get(timeout=300)
+            finished = max(finished, done_at)
+            frames += process_frames
+        cpu_after = server_cpu_seconds(server)
+        for process in processes:
+            process.join()
+    finally:
+        stop_server(server)
+
+    elapsed = finished - started
+    return {
+        "workers": workers,
+        "seconds": elapsed,
+        "send_seconds": sent - started,
+        "deliveries_per_second": clients * updates / elapsed,
+        "frames": frames,
+        "cpu": sorted(cpu_after.get(pid, 0) - cpu_before.get(pid, 0) for pid in cpu_after)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="0,2", help="comma-separated worker counts (0: single process)")
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--updates", type=int, default=200)
+    parser.add_argument("--client-processes", type=int, default=max(1, min(8, os.cpu_count() or 1)))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="vmix-score-bench-") as directory:
+        tree = Path(directory)
+        shutil.copytree(ROOT_DIR / "frontend", tree / "frontend")
+        (tree / "backend" / "data").mkdir(parents=True)
+        shutil.copy(BACKEND_DIR / "main.py", tree / "backend" / "main.py")
+
+        print(f"{os.cpu_count()} cores, {args.clients} WebSocket clients in {args.client_processes} processes, "
+              f"{args.updates} updates")
+        for workers in [int(value) for value in args.workers.split(",")]:
+            result = measure(tree, workers, args.clients, args.updates, args.client_processes)
+            label = f"--workers {workers}" if workers else "single process"
+            cpu = ", ".join(f"{seconds:.2f}" for seconds in result["cpu"] if seconds >= 0.01)
+            print(f"{label:>16}: all clients current after {result['seconds']:.2f} s "
+                  f"({result['deliveries_per_second']:.0f} deliveries/s, {result['frames']} frames), "
+                  f"server CPU s per process: {cpu}")
+
+
+if __name__ == "__main__":
+    main()
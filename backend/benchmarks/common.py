@@ -0,0 +1,117 @@
+"""
+Helpers shared by the benchmark scripts.
+
+A benchmark runs its workload in a fresh process per variant (a server tree
+and options), so variants never share module state. The tree is a temporary
+copy of frontend/ and backend/main.py, either from the working tree or from a
+git revision, which is how before/after numbers are taken:
+
+    python benchmarks/bench_broadcast.py --before 9539b89
+
+The workload process imports main.py of its tree; the server keeps its data
+in backend/data of that copy, so nothing in the working tree is touched.
+"""
+
+import asyncio
+import importlib.util
+import json
+import shutil
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+ROOT_DIR = BACKEND_DIR.parent
+
+
+def make_tree(directory: Path, revision: Optional[str] = None) -> Path:
+    """Copy the server into `directory`, from the working tree or a git revision"""
+    tree = Path(directory)
+    shutil.copytree(ROOT_DIR / "frontend", tree / "frontend")
+    (tree / "backend" / "data").mkdir(parents=True)
+    if revision is None:
+        shutil.copy(BACKEND_DIR / "main.py", tree / "backend" / "main.py")
+    else:
+        source = subprocess.run(["git", "show", f"{revision}:backend/main.py"], cwd=ROOT_DIR,
+                                capture_output=True, check=True).stdout
+        (tree / "backend" / "main.py").write_bytes(source)
+    return tree
+
+
+def make_trees(directory: Path, before: Optional[str]) -> List[Tuple[str, Path]]:
+    """(label, tree) for each revision in `before` (comma-separated), then the working tree"""
+    revisions = [revision for revision in (before or "").split(",") if revision]
+    trees = [(revision, make_tree(Path(directory) / f"rev{i}", revision)) for i, revision in enumerate(revisions)]
+    return trees + [("working tree", make_tree(Path(directory) / "working"))]
+
+
+def load_main(tree: Path):
+    """Import main.py of a tree (in the workload process)"""
+    backend = Path(tree) / "backend"
+    sys.path.insert(0, str(backend))
+    spec = importlib.util.spec_from_file_location("main", backend / "main.py")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["main"] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+class FakeWebSocket:
+    """WebSocket client stand-in: each send takes `delay` seconds and is counted"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.received = 0
+        self.last_message = None
+
+    async def send_text(self, message: str):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.received += 1
+        self.last_message = message
+
+    async def close(self):
+        pass
+
+
+def subscribe(server, match_id: str, websocket: FakeWebSocket):
+    """Register a fake client with the server (also on revisions before per-client queues)"""
+    server.get_or_create_match(match_id)
+    if hasattr(server, "add_connection"):
+        server.add_connection(match_id, websocket)
+    else:
+        server.connections[match_id].add(websocket)
+
+
+def unsubscribe_all(server):
+    for match_id in list(server.connections):
+        for websocket in list(server.connections[match_id]):
+            if hasattr(server, "remove_connection"):
+                server.remove_connection(match_id, websocket)
+    server.connections.clear()
+
+
+def run_variant(script: str, tree: Path, options: List[str]) -> dict:
+    """Run `script --run TREE OPTIONS` in a new process and return the JSON it prints last"""
+    result = subprocess.run([sys.executable, script, "--run", str(tree)] + options,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"workload failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def report(result: dict):
+    """Print the workload result of a --run process for run_variant"""
+    print(json.dumps(result))
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(0, int(len(ordered) * fraction) - 1)]
+
+
+def spread(values: List[float]) -> str:
+    """Median and range of repeated measurements, e.g. "183.2 (181.0-190.4)" """
+    return f"{statistics.median(values):.1f} ({min(values):.1f}-{max(values):.1f})"
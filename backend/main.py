@@ -4,22 +4,39 @@ Provides REST API and WebSocket endpoints for real-time score management.
 """
 
 import asyncio
+import base64
+import bisect
+import codecs
+import csv
+import io
 import json
 import time
 import sys
 import os
+import hashlib
+import http.client
+import math
+import re
+import shutil
+import socket
+import subprocess
+import sqlite3
+import tempfile
+import threading
+import urllib.parse
+import uuid
+from abc import ABC, abstractmethod
 from pathlib import Path
-from collections import defaultdict
-from typing import Dict, Set, Optional, List
+from collections import defaultdict, deque
+from typing import Dict, Set, Optional, List, Tuple
 from datetime import datetime
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Request, UploadFile, File, Form
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import RedirectResponse, Response
-from pydantic import BaseModel, Field, field_validator
-import base64
+from fastapi.responses import RedirectResponse, Response, FileResponse, StreamingResponse
+from pydantic import BaseModel, Field, ValidationError, field_validator
 
 # ============================================================================
 # Pydantic Models
@@ -70,6 +87,15 @@ class PeriodSetRequest(BaseModel):
     """Request model for setting period"""
     period: int = Field(..., ge=1, le=20)
 
+class MatchCommand(BaseModel):
+    """One operation of a command batch (op mirrors the REST path)"""
+    op: str = Field(..., description="e.g. 'score', 'match-score', 'period/set', 'timer/set'")
+    args: Dict = Field(default_factory=dict, description="Body of the matching REST request")
+
+class CommandBatchRequest(BaseModel):
+    """Request model for an atomic batch of match commands"""
+    commands: List[MatchCommand] = Field(..., min_length=1, max_length=50)
+
 class PlayerCreate(BaseModel):
     """Request model for creating a player"""
     name: str = Field(..., min_length=1, max_length=50, description="Player name")
@@ -117,10 +143,40 @@ class TournamentData(BaseModel):
 
 class WebSocketEvent(BaseModel):
     """WebSocket message structure"""
-    type: str  # "state" | "score_changed" | "fora_changed" | "timer_started" | "timer_stopped" | "period_changed" | "setup" | "reset"
+    type: str  # "state" | "score_changed" | "fora_changed" | "timer_started" | "timer_stopped" | "period_changed" | "setup" | "reset" | "batch"
     state: MatchState
     changed: Optional[Dict] = None  # Optional field with change details {field, team, delta}
     ts: int  # Unix timestamp in milliseconds
+    timer: Optional[Dict] = None  # Running timer {deadline: Unix ms, remainingMs} for local countdown
+
+class WebSocketPatchEvent(BaseModel):
+    """WebSocket message for delta protocol clients (only changed state fields)"""
+    type: str  # Same event types as WebSocketEvent
+    base_rev: int  # Revision the patch applies to
+    rev: int  # Revision after applying the patch
+    patch: Dict  # Changed MatchState fields
+    changed: Optional[Dict] = None
+    ts: int
+    timer: Optional[Dict] = None
+
+class VMixPushTarget(BaseModel):
+    """A vMix title input driven by one match (push mode)"""
+    match_id: str = Field(..., min_length=1)
+    input: str = Field(..., min_length=1, description="vMix input number, name or key")
+    fields: Dict[str, str] = Field(..., description="data.json field -> title field, e.g. {'balls_home': 'HomeBalls.Text'}")
+    
+    @field_validator('fields')
+    @classmethod
+    def validate_fields(cls, v: Dict[str, str]) -> Dict[str, str]:
+        for name in v:
+            if name not in DATA_FIELDS:
+                raise ValueError(f"Unknown field '{name}'")
+        return v
+
+class VMixPushConfig(BaseModel):
+    """Push mode configuration (data/vmix_push.json)"""
+    url: str = Field(default="http://127.0.0.1:8088/api/", description="vMix HTTP API URL")
+    targets: List[VMixPushTarget] = []
 
 # ============================================================================
 # Lifespan Events (Startup/Shutdown)
@@ -131,6 +187,14 @@ async def lifespan(app: FastAPI):
     """Manage application lifespan (startup and shutdown)"""
     global tournaments_data
     
+    if not state_bus.owns_state:
+        # Worker process (--workers): state and all writes belong to the owner process
+        await state_bus.start()
+        print(f"Worker {os.getpid()} replicating {len(matches)} matches from the owner process")
+        yield
+        await state_bus.stop()
+        return
+    
     # Startup code
     # Load tournaments data from JSON
     tournaments_data = load_tournaments_data()
@@ -153,20 +217,40 @@ async def lifespan(app: FastAPI):
         tournaments_data.current_tournament_id = first_tournament_id
         save_tournaments_data(tournaments_data)
     
+    # Rebuild match state from the journal (after a crash or restart)
+    started = time.perf_counter()
+    recovered = recover_matches()
+    start_vmix_files()
+    start_vmix_push()
+    
     print("=" * 60)
     print("vMix Russian Billiard Score Control Server")
     print("=" * 60)
+    if recovered:
+        print(f"Recovered {recovered} matches in {(time.perf_counter() - started) * 1000:.0f} ms")
     print(f"Server started on http://0.0.0.0:8000")
     print(f"Control Panel: http://localhost:8000/control")
     print(f"Overlay:       http://localhost:8000/overlay?matchId=1")
     print(f"JSON Data:     http://localhost:8000/api/match/1/data.json")
+    if vmix_files_enabled:
+        print(f"vMix Files:    {get_vmix_files_directory()}")
+    if vmix_push_config is not None:
+        print(f"vMix Push:     {vmix_push_config.url} ({len(vmix_push_config.targets)} inputs)")
     print("=" * 60)
     
+    # Replica processes connect once the owner listens (--workers)
+    await state_bus.start()
+    
     # Yield control to the application
     yield
     
-    # Shutdown code (if needed in the future)
-    pass
+    await state_bus.stop()
+    # Shutdown code: write pending tournament changes, the match journal and vMix files,
+    # and stop pushing to vMix
+    await stop_persistence()
+    await stop_journal()
+    await stop_vmix_files()
+    await stop_vmix_push()
 
 # ============================================================================
 # FastAPI App Setup
@@ -220,8 +304,13 @@ if OVERLAY_DIR.exists():
     app.mount("/overlay", StaticFiles(directory=str(OVERLAY_DIR), html=True), name="overlay")
 
 # ============================================================================
-# JSON Persistence for Tournaments
+# Tournament Storage (JSON file or SQLite)
 # ============================================================================
+#
+# tournaments_data lives in memory and is written behind by the persistence
+# task. The JSON file backend rewrites the whole document on every flush; the
+# SQLite backend (used once data/tournaments.db exists, see --migrate-sqlite)
+# applies only the changed rows in one WAL transaction.
 
 def get_data_directory() -> Path:
     """Get the data directory path (works with PyInstaller and dev mode)"""
@@ -237,64 +326,76 @@ def get_tournaments_file_path() -> Path:
     data_dir = get_data_directory()
     return data_dir / "tournaments.json"
 
-def load_tournaments_data() -> TournamentData:
-    """Load tournaments data from JSON file"""
-    file_path = get_tournaments_file_path()
-    
-    # Create data directory if it doesn't exist
-    file_path.parent.mkdir(parents=True, exist_ok=True)
-    
-    # Load data from file if exists
-    if file_path.exists():
+def get_tournaments_db_path() -> Path:
+    """Get the path to the SQLite tournaments database"""
+    return get_data_directory() / "tournaments.db"
+
+def get_journal_path() -> Path:
+    """Get the path to the match journal (append-only, one JSON record per line)"""
+    return get_data_directory() / "matches.journal"
+
+def get_journal_snapshot_path() -> Path:
+    """Get the path to the snapshot the match journal continues from"""
+    return get_data_directory() / "matches.snapshot.json"
+
+def get_assets_directory() -> Path:
+    """Get the directory of uploaded assets (content-addressed files)"""
+    return get_data_directory() / "assets"
+
+def parse_tournaments_document(data: dict) -> TournamentData:
+    """Parse a stored tournaments document (tournaments.json layout), skipping invalid entries"""
+    tournaments = {}
+    for tid, tdata in data.get('tournaments', {}).items():
+        # Parse players safely
+        players = []
+        for p in tdata.get('players', []):
+            try:
+                if isinstance(p, dict):
+                    # Ensure all required fields are present
+                    if 'id' in p and 'name' in p and 'created_at' in p:
+                        players.append(Player(
+                            id=str(p['id']),
+                            name=str(p['name']),
+                            created_at=float(p['created_at'])
+                        ))
+                elif isinstance(p, Player):
+                    players.append(p)
+            except Exception as e:
+                continue
+        
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                # Parse into TournamentData model
-                tournaments = {}
-                for tid, tdata in data.get('tournaments', {}).items():
-                    # Parse players safely
-                    players = []
-                    for p in tdata.get('players', []):
-                        try:
-                            if isinstance(p, dict):
-                                # Ensure all required fields are present
-                                if 'id' in p and 'name' in p and 'created_at' in p:
-                                    players.append(Player(
-                                        id=str(p['id']),
-                                        name=str(p['name']),
-                                        created_at=float(p['created_at'])
-                                    ))
-                            elif isinstance(p, Player):
-                                players.append(p)
-                        except Exception as e:
-                            continue
-                    
-                    try:
-                        # Parse text_areas if present
-                        text_areas = None
-                        if 'text_areas' in tdata and tdata['text_areas']:
-                            text_areas = tdata['text_areas']
-                        
-                        tournaments[tid] = Tournament(
-                            id=str(tdata.get('id', tid)),
-                            name=str(tdata.get('name', 'Unknown Tournament')),
-                            created_at=float(tdata.get('created_at', time.time())),
-                            players=players,
-                            text_areas=text_areas
-                        )
-                    except Exception as e:
-                        continue
-                
-                return TournamentData(
-                    tournaments=tournaments,
-                    current_tournament_id=data.get('current_tournament_id'),
-                    tournament_id_counter=data.get('tournament_id_counter', 0),
-                    player_id_counter=data.get('player_id_counter', 0)
-                )
+            # Parse text_areas if present
+            text_areas = None
+            if 'text_areas' in tdata and tdata['text_areas']:
+                text_areas = tdata['text_areas']
+            
+            tournaments[tid] = Tournament(
+                id=str(tdata.get('id', tid)),
+                name=str(tdata.get('name', 'Unknown Tournament')),
+                created_at=float(tdata.get('created_at', time.time())),
+                players=players,
+                text_areas=text_areas
+            )
         except Exception as e:
-            pass
+            continue
+    
+    return TournamentData(
+        tournaments=tournaments,
+        current_tournament_id=data.get('current_tournament_id'),
+        tournament_id_counter=data.get('tournament_id_counter', 0),
+        player_id_counter=data.get('player_id_counter', 0)
+    )
+
+def load_tournaments_data() -> TournamentData:
+    """Load tournaments data from the storage backend"""
+    try:
+        data = get_tournament_storage().load()
+        if data is not None:
+            return parse_tournaments_document(data)
+    except Exception as e:
+        print(f"Failed to load tournaments data: {e}")
     
-    # Return default empty data if file doesn't exist or loading failed
+    # Return default empty data if nothing is stored yet or loading failed
     return TournamentData(
         tournaments={},
         current_tournament_id=None,
@@ -302,41 +403,270 @@ def load_tournaments_data() -> TournamentData:
         player_id_counter=0
     )
 
-def save_tournaments_data(data: TournamentData):
-    """Save tournaments data to JSON file"""
-    file_path = get_tournaments_file_path()
+def build_tournaments_document(data: TournamentData) -> dict:
+    """Convert tournaments data to the dict stored in tournaments.json"""
+    return {
+        'tournaments': {
+            tid: {
+                'id': tournament.id,
+                'name': tournament.name,
+                'created_at': tournament.created_at,
+                'players': [p.model_dump() for p in tournament.players],
+                'text_areas': tournament.text_areas if tournament.text_areas else None
+            }
+            for tid, tournament in data.tournaments.items()
+        },
+        'current_tournament_id': data.current_tournament_id,
+        'tournament_id_counter': data.tournament_id_counter,
+        'player_id_counter': data.player_id_counter
+    }
+
+def tournament_change(tournament: Tournament) -> tuple:
+    """Row change for a created or updated tournament (without its players)"""
+    return ("tournament", {
+        'id': tournament.id,
+        'name': tournament.name,
+        'created_at': tournament.created_at,
+        'text_areas': tournament.text_areas if tournament.text_areas else None
+    })
+
+def player_change(tournament_id: str, player: Player) -> tuple:
+    """Row change for a player added to a tournament"""
+    return ("player", tournament_id, player.model_dump())
+
+def meta_change() -> tuple:
+    """Row change for the current tournament and the id counters"""
+    return ("meta", {
+        'current_tournament_id': tournaments_data.current_tournament_id,
+        'tournament_id_counter': tournaments_data.tournament_id_counter,
+        'player_id_counter': tournaments_data.player_id_counter
+    })
+
+class TournamentStorage(ABC):
+    """Storage backend for tournaments_data
     
-    # Create data directory if it doesn't exist
-    file_path.parent.mkdir(parents=True, exist_ok=True)
+    Methods other than load() are called from a worker thread; writes are
+    serialized with tournaments_write_lock.
+    """
     
-    try:
-        # Convert to dict for JSON serialization
-        json_data = {
-            'tournaments': {
-                tid: {
-                    'id': tournament.id,
-                    'name': tournament.name,
-                    'created_at': tournament.created_at,
-                    'players': [p.model_dump() for p in tournament.players],
-                    'text_areas': tournament.text_areas if tournament.text_areas else None
-                }
-                for tid, tournament in data.tournaments.items()
-            },
-            'current_tournament_id': data.current_tournament_id,
-            'tournament_id_counter': data.tournament_id_counter,
-            'player_id_counter': data.player_id_counter
-        }
+    # True if write() needs the whole document, False if row changes suffice
+    full_document = True
+    
+    @abstractmethod
+    def load(self) -> Optional[dict]:
+        """Read the stored document, or None if nothing is stored yet"""
+    
+    @abstractmethod
+    def write(self, document: Optional[dict], changes: List[tuple]):
+        """Persist pending changes (document is None unless full_document)"""
+    
+    @abstractmethod
+    def write_document(self, document: dict):
+        """Replace everything stored with a whole document"""
+    
+    def close(self):
+        pass
+
+class JSONTournamentStorage(TournamentStorage):
+    """tournaments.json, rewritten atomically on every flush"""
+    
+    def __init__(self, file_path: Path):
+        self.file_path = file_path
+    
+    def load(self) -> Optional[dict]:
+        if not self.file_path.exists():
+            return None
+        with open(self.file_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    def write(self, document: Optional[dict], changes: List[tuple]):
+        self.write_document(document)
+    
+    def write_document(self, document: dict):
+        # Create data directory if it doesn't exist
+        self.file_path.parent.mkdir(parents=True, exist_ok=True)
         
-        # Write to file atomically (using temporary file)
-        temp_path = file_path.with_suffix('.json.tmp')
-        with open(temp_path, 'w', encoding='utf-8') as f:
-            json.dump(json_data, f, indent=2, ensure_ascii=False)
+        with tournaments_write_lock:
+            # Write to file atomically (using temporary file)
+            temp_path = self.file_path.with_suffix('.json.tmp')
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(document, f, indent=2, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            
+            # Replace original file
+            temp_path.replace(self.file_path)
+
+class SQLiteTournamentStorage(TournamentStorage):
+    """SQLite database in WAL mode with one row per tournament, player and text area"""
+    
+    full_document = False
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS tournaments (
+            id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            created_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS players (
+            tournament_id TEXT NOT NULL,
+            id TEXT NOT NULL,
+            name TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            PRIMARY KEY (tournament_id, id)
+        );
+        CREATE TABLE IF NOT EXISTS text_areas (
+            tournament_id TEXT NOT NULL,
+            name TEXT NOT NULL,
+            area TEXT NOT NULL,
+            PRIMARY KEY (tournament_id, name)
+        );
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+    """
+    
+    def __init__(self, db_path: Path):
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(db_path), check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=FULL")
+        self.db.executescript(self.SCHEMA)
+    
+    def load(self) -> Optional[dict]:
+        meta = {key: json.loads(value) for key, value in self.db.execute("SELECT key, value FROM meta")}
+        if not meta:
+            return None
         
-        # Replace original file
-        temp_path.replace(file_path)
+        # Rows come back in insertion order (rowid), like the lists in tournaments.json
+        tournaments = {}
+        for tid, name, created_at in self.db.execute("SELECT id, name, created_at FROM tournaments ORDER BY rowid"):
+            tournaments[tid] = {'id': tid, 'name': name, 'created_at': created_at, 'players': [], 'text_areas': None}
+        for tid, pid, name, created_at in self.db.execute(
+                "SELECT tournament_id, id, name, created_at FROM players ORDER BY rowid"):
+            if tid in tournaments:
+                tournaments[tid]['players'].append({'id': pid, 'name': name, 'created_at': created_at})
+        for tid, name, area in self.db.execute("SELECT tournament_id, name, area FROM text_areas ORDER BY rowid"):
+            if tid in tournaments:
+                if tournaments[tid]['text_areas'] is None:
+                    tournaments[tid]['text_areas'] = {}
+                tournaments[tid]['text_areas'][name] = json.loads(area)
         
-    except Exception as e:
-        raise
+        return {**meta, 'tournaments': tournaments}
+    
+    def write(self, document: Optional[dict], changes: List[tuple]):
+        with tournaments_write_lock:
+            self.db.execute("BEGIN")
+            try:
+                for change in changes:
+                    self.apply_change(change)
+                self.db.execute("COMMIT")
+            except Exception:
+                self.db.execute("ROLLBACK")
+                raise
+    
+    def write_document(self, document: dict):
+        changes = [("meta", {
+            'current_tournament_id': document.get('current_tournament_id'),
+            'tournament_id_counter': document.get('tournament_id_counter', 0),
+            'player_id_counter': document.get('player_id_counter', 0)
+        })]
+        for tid, tdata in document.get('tournaments', {}).items():
+            changes.append(("tournament", tdata))
+            changes.extend(("player", tid, p) for p in tdata.get('players', []))
+        
+        with tournaments_write_lock:
+            self.db.execute("BEGIN")
+            try:
+                for table in ("tournaments", "players", "text_areas", "meta"):
+                    self.db.execute(f"DELETE FROM {table}")
+                for change in changes:
+                    self.apply_change(change)
+                self.db.execute("COMMIT")
+            except Exception:
+                self.db.execute("ROLLBACK")
+                raise
+    
+    def apply_change(self, change: tuple):
+        """Apply one row change (inside a transaction)"""
+        kind = change[0]
+        if kind == "meta":
+            self.db.executemany(
+                "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                [(key, json.dumps(value)) for key, value in change[1].items()]
+            )
+        elif kind == "tournament":
+            tdata = change[1]
+            self.db.execute(
+                "INSERT INTO tournaments (id, name, created_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET name = excluded.name, created_at = excluded.created_at",
+                (tdata['id'], tdata['name'], tdata['created_at'])
+            )
+            self.db.execute("DELETE FROM text_areas WHERE tournament_id = ?", (tdata['id'],))
+            self.db.executemany(
+                "INSERT INTO text_areas (tournament_id, name, area) VALUES (?, ?, ?)",
+                [(tdata['id'], name, json.dumps(area)) for name, area in (tdata.get('text_areas') or {}).items()]
+            )
+        elif kind == "delete_tournament":
+            for table, column in (("tournaments", "id"), ("players", "tournament_id"), ("text_areas", "tournament_id")):
+                self.db.execute(f"DELETE FROM {table} WHERE {column} = ?", (change[1],))
+        elif kind == "player":
+            tid, player = change[1], change[2]
+            self.db.execute(
+                "INSERT INTO players (tournament_id, id, name, created_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(tournament_id, id) DO UPDATE SET name = excluded.name, created_at = excluded.created_at",
+                (tid, player['id'], player['name'], player['created_at'])
+            )
+        elif kind == "delete_player":
+            self.db.execute("DELETE FROM players WHERE tournament_id = ? AND id = ?", (change[1], change[2]))
+        else:
+            raise ValueError(f"Unknown tournament change: {kind}")
+    
+    def close(self):
+        self.db.close()
+
+def get_tournament_storage() -> TournamentStorage:
+    """Get the storage backend, opening it on first use
+    
+    SQLite is used if data/tournaments.db exists, otherwise tournaments.json.
+    """
+    global tournament_storage
+    
+    if tournament_storage is None:
+        db_path = get_tournaments_db_path()
+        if db_path.exists():
+            tournament_storage = SQLiteTournamentStorage(db_path)
+        else:
+            tournament_storage = JSONTournamentStorage(get_tournaments_file_path())
+    return tournament_storage
+
+def migrate_tournaments_to_sqlite() -> int:
+    """One-shot migration of tournaments.json into data/tournaments.db
+    
+    tournaments.json is left in place as a backup. Returns the number of
+    migrated players.
+    """
+    db_path = get_tournaments_db_path()
+    if db_path.exists():
+        raise FileExistsError(f"Database already exists: {db_path}")
+    
+    # Parse and re-build the document so invalid entries are dropped like on load
+    document = JSONTournamentStorage(get_tournaments_file_path()).load() or {}
+    data = parse_tournaments_document(document)
+    storage = SQLiteTournamentStorage(db_path)
+    try:
+        storage.write_document(build_tournaments_document(data))
+    finally:
+        storage.close()
+    return sum(len(t.players) for t in data.tournaments.values())
+
+def save_tournaments_data(data: TournamentData):
+    """Write all tournaments data to the storage backend (blocking, for startup)
+    
+    Request handlers call mark_tournaments_dirty() instead.
+    """
+    get_tournament_storage().write_document(build_tournaments_document(data))
 
 # ============================================================================
 # State Management
@@ -348,17 +678,218 @@ matches: Dict[str, MatchState] = {}
 # Store GFX settings per match (can be extended to database)
 gfx_settings: Dict[str, dict] = {}
 
+# GFX settings version per match, bumped on every change
+gfx_settings_versions: Dict[str, int] = {}
+
 # Store tournaments data (loaded from JSON)
 tournaments_data: TournamentData = TournamentData()
 
-# WebSocket connections per match
-connections: Dict[str, Set[WebSocket]] = defaultdict(set)
+# WebSocket connections per match, each with its own outbound queue
+connections: Dict[str, Dict[WebSocket, "ClientOutbox"]] = defaultdict(dict)
+
+# Encoded payloads for the current revision of each match:
+# match_id -> (rev, revision timestamp in ms, {payload format: encoded payload})
+payload_cache: Dict[str, tuple] = {}
+
+# Encoded all-matches data.json for the last seen revision vector: (etag, payload)
+all_matches_payload_cache: Optional[tuple] = None
+
+# Data source encoders per (format, ?fields= value), and encoded all-matches
+# documents per encoder: encoder key -> (etag, payload)
+data_encoders: Dict[tuple, "DataEncoder"] = {}
+all_matches_data_cache: Dict[tuple, tuple] = {}
+
+# Changes feed: match_id -> (sequence number, time.time() of the change, removed),
+# kept in sequence order (an entry is moved to the end on every change). The
+# sequence starts at the current time in ms, so a cursor from before a
+# restart is older than every change after it.
+match_changes: Dict[str, tuple] = {}
+change_seq = int(time.time() * 1000)
+
+# ?active=true in the changes feed: matches with a running timer or changed
+# within this many seconds
+MATCH_ACTIVE_SECONDS = 900
+
+# Last revision of removed matches, so a re-created match never reuses a rev
+retired_revs: Dict[str, int] = {}
+
+# Seconds a single WebSocket send may take before the client is dropped
+WS_SEND_TIMEOUT = 2.0
+
+# Maximum number of frames waiting in one client's outbound queue
+WS_QUEUE_LIMIT = 8
+
+# Value of the ?protocol= WebSocket parameter for the delta (patch) protocol
+WS_PROTOCOL_DELTA = "2"
+
+# Last state sent to delta clients, per stream: match_id -> {stream: (rev, state dict)}
+# Kept only while a match has delta clients
+delta_bases: Dict[str, Dict[str, tuple]] = {}
+
+# Delta streams: every frame, or without timer ticks (deadline timer clients)
+DELTA_STREAM_ALL = "all"
+DELTA_STREAM_SYNC = "sync"
+
+# State fields changed by timer ticks (always sent in the sync stream)
+TICK_FIELDS = ("timerSecondsRemaining", "timerRunning")
+
+# Running timers: match_id -> time.monotonic() deadline at which the timer hits 0
+timer_deadlines: Dict[str, float] = {}
+
+# The single task that ticks all running timers
+timer_scheduler_task: Optional[asyncio.Task] = None
+
+# Set to wake the scheduler early (a timer was started)
+timer_wakeup = asyncio.Event()
+
+# Ticks due within this many seconds of each other are sent as one batch
+TIMER_BATCH_WINDOW = 0.005
+
+# Clients using the deadline timer protocol get a tick only every N seconds
+TIMER_RESYNC_SECONDS = 60
+
+# Long-poll waiters: match_id -> event set (and dropped) on the next revision
+revision_events: Dict[str, asyncio.Event] = {}
+
+# Seconds a data.json?since_rev= request waits for a new revision by default / at most
+LONG_POLL_DEFAULT_TIMEOUT = 25.0
+LONG_POLL_MAX_TIMEOUT = 60.0
+
+# Server-Sent Events streams per match, and streams of all matches
+sse_streams: Dict[str, Set["SSEStream"]] = defaultdict(set)
+sse_all_streams: Set["SSEStream"] = set()
+
+# Recent SSE frames for Last-Event-ID replay: match_id -> deque of (rev, frame)
+# Kept from the first stream of a match until the match is removed while no stream is open
+sse_history: Dict[str, deque] = {}
+
+# Recent frames of the all-matches stream: deque of (sequence number, frame)
+sse_all_history: Optional[deque] = None
+sse_all_seq = 0
+
+# Frames kept for replay, and frames queued per SSE client before it is
+# switched to a fresh snapshot
+SSE_HISTORY_LIMIT = 64
+SSE_QUEUE_LIMIT = 32
+
+# Seconds between keep-alive comments on an idle SSE stream
+SSE_KEEPALIVE_SECONDS = 15.0
+
+# Write-behind persistence of tournaments_data: handlers only mark it dirty and
+# a background task writes the latest snapshot at most every PERSIST_INTERVAL
+tournaments_dirty = False
+pending_tournament_changes: List[tuple] = []
+persist_task: Optional[asyncio.Task] = None
+persist_wakeup = asyncio.Event()
+PERSIST_INTERVAL = 0.5
+
+# Serializes storage writes from the worker thread and the final flush
+tournaments_write_lock = threading.Lock()
+
+# Storage backend of tournaments_data (see get_tournament_storage)
+tournament_storage: Optional["TournamentStorage"] = None
+
+# Player lookup structures per tournament: tournament_id -> PlayerIndex
+player_indexes: Dict[str, "PlayerIndex"] = {}
+
+# Match journal: encoded records waiting for the next batched write + fsync,
+# the last record sequence number, and records in the file since the snapshot
+journal_buffer: List[bytes] = []
+journal_seq = 0
+journal_records = 0
+journal_task: Optional[asyncio.Task] = None
+journal_wakeup = asyncio.Event()
+
+# Seconds between journal writes (changes in this window share one fsync)
+JOURNAL_FLUSH_INTERVAL = 0.05
+
+# Records after which the journal is folded into a new snapshot
+JOURNAL_COMPACT_RECORDS = 5000
+
+# Serializes journal and snapshot writes from the worker thread and shutdown
+journal_write_lock = threading.Lock()
+
+# vMix file output (see start_vmix_files): match ids to write, the rev last
+# written per match, the match owning each file name (casefolded) and the
+# matches refused a name another match owns
+vmix_files_enabled = False
+vmix_files_dirty: Set[str] = set()
+vmix_files_written: Dict[str, int] = {}
+vmix_file_owners: Dict[str, str] = {}
+vmix_file_conflicts: Set[str] = set()
+vmix_files_task: Optional[asyncio.Task] = None
+vmix_files_wakeup = asyncio.Event()
+
+# Seconds in which changes are coalesced into one write of the vMix files
+VMIX_FILES_WINDOW = 0.1
+
+# vMix file with all matches (next to the match_{id}.json files)
+VMIX_ALL_MATCHES_FILE = "matches.json"
 
-# Timer task references (to track if timer is running for a match)
-timer_tasks: Dict[str, asyncio.Task] = {}
+# vMix push mode (see start_vmix_push): configuration, HTTP connections,
+# targets per match, value last accepted per (input, title field), and counters
+vmix_push_config: Optional["VMixPushConfig"] = None
+vmix_push_pool: Optional["VMixHTTPPool"] = None
+vmix_push_targets: Dict[str, List["VMixPushTarget"]] = {}
+vmix_push_sent: Dict[tuple, str] = {}
+vmix_push_dirty: Set[str] = set()
+vmix_push_task: Optional[asyncio.Task] = None
+vmix_push_wakeup = asyncio.Event()
+vmix_push_stats: Dict = {"calls": 0, "failures": 0, "last_error": None}
 
-# Lock for state updates (not strictly needed with asyncio but good practice)
-state_lock = asyncio.Lock()
+# Seconds after a push round in which further changes are collected for the next one
+VMIX_PUSH_WINDOW = 0.02
+
+# Parallel requests to vMix, seconds one request may take, and retry backoff bounds
+VMIX_PUSH_CONNECTIONS = 4
+VMIX_PUSH_TIMEOUT = 2.0
+VMIX_PUSH_RETRY_MIN = 0.5
+VMIX_PUSH_RETRY_MAX = 10.0
+
+# Multi-process mode (see State Bus): environment variables that give a process
+# its role ("owner" or "replica") and the Unix socket paths, set by run_multiprocess
+BUS_ROLE_ENV = "VMIX_SCORE_BUS_ROLE"
+BUS_SOCKET_ENV = "VMIX_SCORE_BUS_SOCKET"
+BUS_OWNER_SOCKET_ENV = "VMIX_SCORE_OWNER_SOCKET"
+
+# Messages queued for one replica before it is dropped (it reconnects and resyncs)
+BUS_QUEUE_LIMIT = 10000
+
+# Longest bus line (the hello carries all matches), seconds a replica waits for
+# the owner (at startup and for a command result), and its reconnect delay
+BUS_LINE_LIMIT = 64 * 1024 * 1024
+BUS_CONNECT_TIMEOUT = 30.0
+BUS_RECONNECT_DELAY = 0.5
+
+# GET paths a replica answers from its own state; other /api/ requests go to the owner
+REPLICA_READ_PATHS = re.compile(
+    r"^/api/(match/[^/]+/(state|data\.(json|xml|csv)|gfx-settings)|matches/(data\.(json|xml|csv)|changes))$"
+)
+
+# Connection-level headers that are not forwarded between processes
+HOP_BY_HOP_HEADERS = {"connection", "keep-alive", "transfer-encoding", "content-length", "upgrade", "te", "trailer"}
+
+# Metric families served on /metrics, in output order (see Metrics)
+metrics_registry: List = []
+
+# Histogram buckets: seconds for latencies and durations, bytes for flush sizes
+METRICS_SECONDS_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+METRICS_BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864)
+
+# Locks for state updates, one per match: match_id -> [lock, number of users]
+match_locks: Dict[str, list] = {}
+
+# Unique id of this server run, mixed into ETags so that revisions from a
+# previous run (rev restarts at 0 after a restart) never match a cached copy
+SERVER_INSTANCE_ID = uuid.uuid4().hex[:8]
+
+# Headers for polled vMix data: clients may keep a copy but must revalidate it
+# (If-None-Match) on every request
+DATA_CACHE_HEADERS = {
+    "Cache-Control": "no-cache, must-revalidate",
+    "Pragma": "no-cache",
+    "Expires": "0"
+}
 
 # ============================================================================
 # Helper Functions
@@ -375,8 +906,14 @@ def format_timer(seconds: int) -> str:
     else:
         return f"{minutes:02d}:{secs:02d}"
 
-def get_match_data_dict(state: MatchState) -> Dict:
-    """Convert match state to dictionary format for JSON output"""
+def get_match_data_dict(state: MatchState, timestamp: Optional[int] = None) -> Dict:
+    """Convert match state to dictionary format for JSON output
+    
+    `timestamp` defaults to the current time in milliseconds.
+    """
+    if timestamp is None:
+        timestamp = int(time.time() * 1000)
+    
     home_match_score = getattr(state, 'homeMatchScore', 0)
     away_match_score = getattr(state, 'awayMatchScore', 0)
     
@@ -402,443 +939,2808 @@ def get_match_data_dict(state: MatchState) -> Dict:
         "timer_seconds": state.timerSecondsRemaining,
         "timer_running": state.timerRunning,
         "timer_formatted": format_timer(state.timerSecondsRemaining),
-        "timestamp": int(time.time() * 1000),
+        "timestamp": timestamp,
         "rev": state.rev,
         "fora_home": state.foraHome,
         "fora_away": state.foraAway,
     }
 
-def save_match_data_to_file(match_id: str, state: MatchState):
-    """Save match data to JSON file for vMix Title file access"""
-    data_dir = get_data_directory() / "vmix"
-    data_dir.mkdir(parents=True, exist_ok=True)
+# ============================================================================
+# Metrics (Prometheus)
+# ============================================================================
+#
+# GET /metrics serves counters and histograms of the real-time paths in the
+# Prometheus text format. The hot paths only add to a dict or a list slot;
+# gauges (connections, queue depths, settings sizes) are computed when scraped.
+# In multi-process mode a worker answers with its own samples plus those of
+# the owner process, told apart by a "process" label.
+
+def escape_metric_label(value: str) -> str:
+    """Escape a label value for the Prometheus text format"""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def format_metric_labels(names: tuple, values: tuple, process: Optional[str]) -> str:
+    """Format a label set, e.g. {match_id="1",le="0.5"}"""
+    pairs = [f'{name}="{escape_metric_label(str(value))}"' for name, value in zip(names, values)]
+    if process is not None:
+        pairs.insert(0, f'process="{process}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Metric(ABC):
+    """One metric family on /metrics"""
     
-    file_path = data_dir / f"match_{match_id}.json"
+    kind = "untyped"
     
-    data = get_match_data_dict(state)
+    def __init__(self, name: str, help_text: str, labels: tuple = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        metrics_registry.append(self)
     
-    try:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-    except Exception as e:
-        pass
+    @abstractmethod
+    def samples(self, process: Optional[str]) -> List[str]:
+        """Sample lines of the family"""
 
-async def broadcast_event(match_id: str, event_type: str, state: MatchState, changed: Optional[Dict] = None):
-    """Broadcast an event to all WebSocket connections for a match"""
-    if match_id not in connections:
-        return
+class MetricCounter(Metric):
+    """Counter per label values"""
     
-    event = WebSocketEvent(
-        type=event_type,
-        state=state,
-        changed=changed,
-        ts=int(time.time() * 1000)
-    )
+    kind = "counter"
     
-    message = event.model_dump_json()
+    def __init__(self, name: str, help_text: str, labels: tuple = ()):
+        super().__init__(name, help_text, labels)
+        self.values: Dict[tuple, float] = defaultdict(int)
     
-    # Send to all connected clients
-    disconnected = set()
-    for ws in connections[match_id]:
-        try:
-            await ws.send_text(message)
-        except Exception:
-            disconnected.add(ws)
+    def inc(self, *label_values, amount: float = 1):
+        self.values[label_values] += amount
+    
+    def samples(self, process: Optional[str]) -> List[str]:
+        return [
+            f"{self.name}{format_metric_labels(self.labels, values, process)} {value}"
+            for values, value in self.values.items()
+        ]
+
+class MetricHistogram(Metric):
+    """Histogram per label values
+    
+    Each series is a list of counts per bucket (the last slot counts values
+    above every bucket) followed by the sum; buckets are made cumulative only
+    when scraped.
+    """
     
-    # Remove disconnected clients
-    connections[match_id] -= disconnected
+    kind = "histogram"
     
-    # Save JSON to file for vMix Title file access (optional)
-    # Uncomment the line below if you want to save JSON files to disk
-    # save_match_data_to_file(match_id, state)
+    def __init__(self, name: str, help_text: str, buckets: tuple, labels: tuple = ()):
+        super().__init__(name, help_text, labels)
+        self.buckets = buckets
+        self.series: Dict[tuple, list] = {}
+    
+    def observe(self, value: float, *label_values):
+        series = self.series.get(label_values)
+        if series is None:
+            series = self.series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+    
+    def samples(self, process: Optional[str]) -> List[str]:
+        lines = []
+        for values, series in self.series.items():
+            count = 0
+            for bound, bucket_count in zip(self.buckets + ("+Inf",), series):
+                count += bucket_count
+                labels = format_metric_labels(self.labels + ("le",), values + (bound,), process)
+                lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = format_metric_labels(self.labels, values, process)
+            lines.append(f"{self.name}_sum{labels} {series[-1]}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
 
-def get_or_create_match(match_id: str) -> MatchState:
-    """Get existing match or create a new one"""
-    if match_id not in matches:
-        matches[match_id] = MatchState(match_id=match_id)
-    return matches[match_id]
+class MetricGauge(Metric):
+    """Gauge computed when scraped: collect() returns {label values: value}"""
+    
+    kind = "gauge"
+    
+    def __init__(self, name: str, help_text: str, labels: tuple, collect):
+        super().__init__(name, help_text, labels)
+        self.collect = collect
+    
+    def samples(self, process: Optional[str]) -> List[str]:
+        return [
+            f"{self.name}{format_metric_labels(self.labels, values, process)} {value}"
+            for values, value in self.collect().items()
+        ]
 
-def get_current_tournament() -> Optional[Tournament]:
-    """Get the current selected tournament"""
-    try:
-        if not hasattr(tournaments_data, 'current_tournament_id') or not tournaments_data.current_tournament_id:
-            return None
+def observe_flush(store: str, started: float, size: Optional[int] = None):
+    """Record a successful persistence flush that began at perf_counter() `started`"""
+    metric_flush_seconds.observe(time.perf_counter() - started, store)
+    if size is not None:
+        metric_flush_bytes.observe(size, store)
+
+def collect_ws_queue_depths(aggregate) -> Dict[tuple, int]:
+    """Aggregate (max or sum) of the queued frames of the clients of each match"""
+    return {
+        (match_id,): aggregate(len(outbox.frames) for outbox in clients.values())
+        for match_id, clients in connections.items()
+    }
+
+metric_http_seconds = MetricHistogram(
+    "vmix_score_http_request_duration_seconds",
+    "Time from request to response start, per route",
+    METRICS_SECONDS_BUCKETS, ("method", "route", "status")
+)
+metric_data_requests = MetricCounter(
+    "vmix_score_data_requests_total",
+    "Polls of the vMix data endpoints (status 304: unchanged since the client's ETag)",
+    ("scope", "format", "status")
+)
+metric_ws_connections = MetricGauge(
+    "vmix_score_ws_connections",
+    "Connected WebSocket clients per match",
+    ("match_id",), lambda: {(match_id,): len(clients) for match_id, clients in connections.items()}
+)
+metric_ws_queue_depth_max = MetricGauge(
+    "vmix_score_ws_queue_depth_max",
+    "Frames queued for the most lagging WebSocket client of each match",
+    ("match_id",), lambda: collect_ws_queue_depths(max)
+)
+metric_ws_queued_frames = MetricGauge(
+    "vmix_score_ws_queued_frames",
+    "Frames queued for all WebSocket clients of each match",
+    ("match_id",), lambda: collect_ws_queue_depths(sum)
+)
+metric_broadcast_seconds = MetricHistogram(
+    "vmix_score_broadcast_duration_seconds",
+    "Time to encode a match event and queue it for every WebSocket and SSE client",
+    METRICS_SECONDS_BUCKETS
+)
+metric_ws_dropped = MetricCounter(
+    "vmix_score_ws_dropped_clients_total",
+    "WebSocket clients dropped by the server",
+    ("reason",)
+)
+metric_ws_overflows = MetricCounter(
+    "vmix_score_ws_queue_overflows_total",
+    "Frames dropped (or collapsed into a snapshot) because a client queue was full"
+)
+metric_sse_overflows = MetricCounter(
+    "vmix_score_sse_queue_overflows_total",
+    "SSE clients that fell too far behind and were sent a snapshot instead"
+)
+metric_timer_tick_delay = MetricHistogram(
+    "vmix_score_timer_tick_delay_seconds",
+    "How late timer ticks run after the second they display starts",
+    METRICS_SECONDS_BUCKETS
+)
+metric_flush_seconds = MetricHistogram(
+    "vmix_score_persistence_flush_duration_seconds",
+    "Duration of writes to disk, per store",
+    METRICS_SECONDS_BUCKETS, ("store",)
+)
+metric_flush_bytes = MetricHistogram(
+    "vmix_score_persistence_flush_bytes",
+    "Bytes written per flush, per store",
+    METRICS_BYTES_BUCKETS, ("store",)
+)
+metric_flush_failures = MetricCounter(
+    "vmix_score_persistence_flush_failures_total",
+    "Failed writes to disk (retried in the next round), per store",
+    ("store",)
+)
+metric_gfx_settings_bytes = MetricGauge(
+    "vmix_score_gfx_settings_bytes",
+    "Size of the encoded gfxSettings frame per match",
+    ("match_id",), lambda: {(match_id,): len(get_gfx_settings_message(match_id)) for match_id in gfx_settings}
+)
+metric_matches = MetricGauge(
+    "vmix_score_matches",
+    "Matches held in memory",
+    (), lambda: {(): len(matches)}
+)
+
+class MetricsMiddleware:
+    """ASGI middleware that times each HTTP request until its response starts
+    
+    Routes are labelled by their path template; requests outside the API
+    routes (static files, 404s) share the route "other".
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
         
-        if tournaments_data.current_tournament_id not in tournaments_data.tournaments:
-            return None
+        started = time.perf_counter()
         
-        return tournaments_data.tournaments[tournaments_data.current_tournament_id]
-    except Exception as e:
-        return None
+        async def send_timed(message):
+            if message["type"] == "http.response.start":
+                route = getattr(scope.get("route"), "path", "other")
+                metric_http_seconds.observe(time.perf_counter() - started, scope["method"], route, message["status"])
+            await send(message)
+        
+        await self.app(scope, receive, send_timed)
 
-def get_or_create_current_tournament() -> Tournament:
-    """Get current tournament or create default if none exists"""
-    tournament = get_current_tournament()
-    if tournament is None:
-        # Create default tournament
-        tournament_id = f"tournament_{tournaments_data.tournament_id_counter + 1}"
-        tournaments_data.tournament_id_counter += 1
-        tournament = Tournament(
-            id=tournament_id,
-            name="Default Tournament",
-            created_at=time.time(),
-            players=[]
-        )
-        tournaments_data.tournaments[tournament_id] = tournament
-        tournaments_data.current_tournament_id = tournament_id
-        save_tournaments_data(tournaments_data)
-    return tournament
+app.add_middleware(MetricsMiddleware)
+
+def get_metrics_process() -> Optional[str]:
+    """Value of the "process" label in multi-process mode, None otherwise"""
+    role = os.environ.get(BUS_ROLE_ENV)
+    if role == "replica":
+        return f"worker-{os.getpid()}"
+    return role
+
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus metrics of this process (and of the owner process in multi-process mode)"""
+    process = get_metrics_process()
+    samples = {metric.name: metric.samples(process) for metric in metrics_registry}
+    
+    if not state_bus.owns_state:
+        try:
+            status, _, content = await owner_request("GET", "/metrics", [], b"")
+        except OSError:
+            status = None
+        if status == 200:
+            # Both processes run this code, so the owner has the same families
+            family = None
+            for line in content.decode('utf-8').splitlines():
+                if line.startswith("# TYPE "):
+                    family = line.split()[2]
+                elif line and not line.startswith("#") and family in samples:
+                    samples[family].append(line)
+    
+    lines = []
+    for metric in metrics_registry:
+        lines.append(f"# HELP {metric.name} {metric.help_text}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(samples[metric.name])
+    return Response(content="\n".join(lines) + "\n", media_type="text/plain; version=0.0.4; charset=utf-8")
 
 # ============================================================================
-# Timer Task
+# Payload Cache
 # ============================================================================
+#
+# Every revision of a match is encoded at most once per format and the result
+# is shared by all pollers and WebSocket clients. Entries are keyed by
+# (match_id, rev, format): a mutation bumps rev, so the next read or broadcast
+# replaces the entry. Only the current revision of each match is kept.
+#
+# Timestamp policy: `timestamp` in data.json and `ts` in the cached "state"
+# frame are the time the revision was produced (its first broadcast or first
+# read), not the time of the request. They therefore stay stable for a rev.
 
-async def timer_loop(match_id: str):
-    """Background task that decrements timer every second"""
-    while True:
-        await asyncio.sleep(1)
-        
-        async with state_lock:
-            if match_id not in matches:
-                break
-            
-            state = matches[match_id]
-            
-            # Only decrement if timer is running
-            if not state.timerRunning:
-                continue
-            
-            # Decrement timer
-            if state.timerSecondsRemaining > 0:
-                state.timerSecondsRemaining -= 1
-                state.rev += 1
-                matches[match_id] = state
-                
-                # Broadcast state update
-                await broadcast_event(match_id, "state", state)
-            else:
-                # Timer reached 0, stop it
-                state.timerRunning = False
-                state.rev += 1
-                matches[match_id] = state
-                await broadcast_event(match_id, "timer_stopped", state)
-                break
+PAYLOAD_DATA_ITEM = "data_item"  # One data.json object (bytes, no array brackets)
+PAYLOAD_DATA_JSON = "data.json"  # data.json array for vMix (bytes)
+PAYLOAD_STATE = "state"  # /state response (bytes)
+PAYLOAD_WS_STATE = "ws_state"  # WebSocket "state" event frame (str, sent as text)
 
-def start_timer_task(match_id: str):
-    """Start the timer task for a match if not already running"""
-    if match_id in timer_tasks and not timer_tasks[match_id].done():
-        return
+def get_revision_entry(state: MatchState, ts: Optional[int] = None) -> tuple:
+    """Get the cache entry for the current revision of a match, creating it if needed"""
+    entry = payload_cache.get(state.match_id)
+    if entry is None or entry[0] != state.rev:
+        entry = (state.rev, ts if ts is not None else int(time.time() * 1000), {})
+        payload_cache[state.match_id] = entry
+    return entry
+
+def encode_payload(state: MatchState, payload_format: str, ts: int):
+    """Encode a match state revision in the given payload format"""
+    if payload_format == PAYLOAD_DATA_ITEM:
+        return json.dumps(get_match_data_dict(state, ts), ensure_ascii=False).encode('utf-8')
+    if payload_format == PAYLOAD_DATA_JSON:
+        return b"[" + get_cached_payload(state, PAYLOAD_DATA_ITEM) + b"]"
+    if payload_format == PAYLOAD_STATE:
+        return state.model_dump_json().encode('utf-8')
+    if payload_format == PAYLOAD_WS_STATE:
+        return WebSocketEvent(type="state", state=state, ts=ts, timer=get_timer_info(state.match_id)).model_dump_json()
+    raise ValueError(f"Unknown payload format: {payload_format}")
+
+def get_cached_payload(state: MatchState, payload_format: str):
+    """Get the encoded payload for the current revision of a match"""
+    rev, ts, payloads = get_revision_entry(state)
+    payload = payloads.get(payload_format)
+    if payload is None:
+        payload = encode_payload(state, payload_format, ts)
+        payloads[payload_format] = payload
+    return payload
+
+def get_all_matches_payload(states: List[MatchState], etag: Optional[str] = None) -> tuple:
+    """Get (etag, encoded data.json array) for a list of matches, cached per revision vector"""
+    global all_matches_payload_cache
     
-    task = asyncio.create_task(timer_loop(match_id))
-    timer_tasks[match_id] = task
+    if etag is None:
+        etag = make_matches_etag(states)
+    if all_matches_payload_cache is None or all_matches_payload_cache[0] != etag:
+        # vMix requires JSON as an array of objects
+        items = [get_cached_payload(state, PAYLOAD_DATA_ITEM) for state in states]
+        all_matches_payload_cache = (etag, b"[" + b", ".join(items) + b"]")
+    return all_matches_payload_cache
 
-def stop_timer_task(match_id: str):
-    """Stop the timer task for a match"""
-    if match_id in timer_tasks and not timer_tasks[match_id].done():
-        timer_tasks[match_id].cancel()
-        del timer_tasks[match_id]
+def evict_match(match_id: str):
+    """Remove a match together with its cached payloads"""
+    state = matches.pop(match_id, None)
+    if state is not None:
+        retired_revs[match_id] = state.rev
+        if state_bus.owns_state:
+            append_journal({"d": match_id, "r": state.rev})
+    payload_cache.pop(match_id, None)
+    delta_bases.pop(match_id, None)
+    if match_id in sse_streams:
+        # Open streams stay subscribed: frames of the removed match can no
+        # longer be replayed, and each stream is sent a fresh snapshot
+        sse_history[match_id].clear()
+        for stream in sse_streams[match_id]:
+            stream.resync()
+    else:
+        sse_history.pop(match_id, None)
+    stop_timer_task(match_id)
+    record_match_change(match_id, removed=True)
+    if state is not None:
+        state_bus.publish_removed(match_id, state.rev)
+    notify_revision(match_id)
+    mark_vmix_file_dirty(match_id)
+    mark_vmix_push_dirty(match_id)
 
-# ============================================================================
-# REST API Endpoints
-# ============================================================================
+def make_match_etag(state: MatchState) -> str:
+    """Build a strong ETag for a single match from its revision"""
+    return f'"{SERVER_INSTANCE_ID}-{state.match_id}-{state.rev}"'
 
-@app.get("/api/match/{match_id}/state")
-async def get_match_state(match_id: str):
-    """Get current match state"""
-    state = get_or_create_match(match_id)
-    return state.model_dump()
+def make_matches_etag(states: List[MatchState]) -> str:
+    """Build a strong ETag for a list of matches from their revision vector"""
+    digest = hashlib.sha1()
+    for state in states:
+        digest.update(f"{state.match_id}\x00{state.rev}\x00".encode('utf-8'))
+    return f'"{SERVER_INSTANCE_ID}-{len(states)}-{digest.hexdigest()[:16]}"'
 
-@app.post("/api/match/{match_id}/setup")
-async def setup_match(match_id: str, request: SetupRequest):
-    """Set up match with team names, period, and initial timer"""
-    async with state_lock:
-        state = get_or_create_match(match_id)
-        
-        # Update names only if provided (otherwise keep current values)
-        if request.homeName is not None:
-            state.homeName = request.homeName
-        # If homeName is None and state has no name, use default
-        elif not state.homeName or state.homeName == "Home":
-            state.homeName = "Player 1"
-        
-        if request.awayName is not None:
-            state.awayName = request.awayName
-        # If awayName is None and state has no name, use default
-        elif not state.awayName or state.awayName == "Away":
-            state.awayName = "Player 2"
-        
-        state.period = request.period
-        state.timerSecondsRemaining = request.timerSeconds
-        state.timerRunning = False
-        if request.foraHome is not None:
-            state.foraHome = request.foraHome
-        if request.foraAway is not None:
-            state.foraAway = request.foraAway
-        # Match scores default to 0 if not set
-        if not hasattr(state, 'homeMatchScore'):
-            state.homeMatchScore = 0
-        if not hasattr(state, 'awayMatchScore'):
-            state.awayMatchScore = 0
-        state.rev += 1
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check whether the request's If-None-Match header matches the ETag"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        # If-None-Match uses weak comparison, so ignore a W/ prefix
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+def not_modified_response(etag: str) -> Response:
+    """Build a bodyless 304 response for a matching ETag"""
+    return Response(status_code=304, headers={**DATA_CACHE_HEADERS, "ETag": etag})
+
+# Outbound frame kinds (decide how queued frames are coalesced)
+FRAME_STATE = "state"  # Plain state snapshot, superseded by any newer match frame
+FRAME_TICK = "tick"  # Per-second timer tick, skipped for deadline protocol clients
+FRAME_EVENT = "event"  # Discrete event (score_changed, ...), kept for animations
+FRAME_SETTINGS = "settings"  # Full gfxSettings, supersedes queued settings frames (None: encoded when sent)
+FRAME_SETTINGS_PATCH = "settings_patch"  # gfxSettingsPatch, needs every earlier patch
+FRAME_SNAPSHOT = "snapshot"  # Full state, encoded when sent (message is None)
+FRAME_REPLY = "reply"  # Command ack for this client only, never coalesced or dropped
+
+def encode_snapshot(state: MatchState, fresh_timer: bool = False) -> str:
+    """Encode a full "state" frame for a client that needs a snapshot
+    
+    With fresh_timer the frame is encoded now, so remainingMs of a running
+    timer is exact for deadline timer clients.
+    """
+    if fresh_timer and state.timerRunning:
+        event = WebSocketEvent(
+            type="state",
+            state=state,
+            ts=int(time.time() * 1000),
+            timer=get_timer_info(state.match_id)
+        )
+        return event.model_dump_json()
+    return get_cached_payload(state, PAYLOAD_WS_STATE)
+
+class ClientOutbox:
+    """Bounded outbound queue and writer task for one WebSocket client
+    
+    Every full match frame carries the full state, so a lagging client never
+    needs the backlog: queued "state" frames are replaced by the newest one,
+    and when the queue is full the oldest match frames are dropped.
+    
+    Delta clients need every patch, so their queued patches are replaced by
+    one snapshot instead when the queue overflows.
+    
+    Command acks are kept in order; a client that stops reading them is
+    dropped.
+    """
+    
+    def __init__(self, match_id: str, websocket: WebSocket, skip_ticks: bool = False, delta: bool = False):
+        self.match_id = match_id
+        self.websocket = websocket
+        self.skip_ticks = skip_ticks  # Client counts the timer down locally
+        self.delta = delta  # Client applies patches (delta protocol)
+        self.frames: deque = deque()  # (kind, message)
+        self.wakeup = asyncio.Event()
+        self.closed = False
+        self.task = asyncio.create_task(self.run())
+    
+    def put(self, message: Optional[str], kind: str):
+        """Queue a frame, coalescing superseded frames"""
+        if kind == FRAME_TICK and self.skip_ticks:
+            return
+        
+        if kind in (FRAME_SETTINGS, FRAME_SETTINGS_PATCH):
+            self.put_settings(message, kind)
+            return
+        
+        if kind == FRAME_REPLY:
+            if sum(1 for frame in self.frames if frame[0] == FRAME_REPLY) >= WS_QUEUE_LIMIT:
+                metric_ws_dropped.inc("reply_backlog")
+                drop_connection(self.match_id, self.websocket)
+                return
+            self.frames.append((kind, message))
+            self.wakeup.set()
+            return
+        
+        if self.delta:
+            if kind == FRAME_SNAPSHOT or len(self.frames) >= WS_QUEUE_LIMIT:
+                if kind != FRAME_SNAPSHOT:
+                    metric_ws_overflows.inc()
+                # A snapshot makes queued patches redundant; queued settings
+                # patches collapse into one full settings frame
+                settings = any(frame[0] in (FRAME_SETTINGS, FRAME_SETTINGS_PATCH) for frame in self.frames)
+                self.frames = deque(frame for frame in self.frames if frame[0] == FRAME_REPLY)
+                if settings:
+                    self.frames.append((FRAME_SETTINGS, None))
+                kind, message = FRAME_SNAPSHOT, None
+            self.frames.append((kind, message))
+            self.wakeup.set()
+            return
+        
+        superseded = {FRAME_STATE, FRAME_TICK, FRAME_SNAPSHOT}
+        if any(queued_kind in superseded for queued_kind, _ in self.frames):
+            self.frames = deque(frame for frame in self.frames if frame[0] not in superseded)
+        
+        self.frames.append((kind, message))
+        
+        # Over the limit: drop the oldest match frames (newer ones carry their state)
+        while len(self.frames) > WS_QUEUE_LIMIT:
+            for frame in self.frames:
+                if frame[0] not in (FRAME_SETTINGS, FRAME_SETTINGS_PATCH, FRAME_REPLY):
+                    self.frames.remove(frame)
+                    metric_ws_overflows.inc()
+                    break
+            else:
+                break
+        
+        self.wakeup.set()
+    
+    def put_settings(self, message: Optional[str], kind: str):
+        """Queue a GFX settings frame
+        
+        Patches are kept in order; a full settings frame replaces everything
+        queued before it, and too many patches collapse into one full frame.
+        """
+        queued = [frame for frame in self.frames if frame[0] in (FRAME_SETTINGS, FRAME_SETTINGS_PATCH)]
+        if kind == FRAME_SETTINGS_PATCH and (
+            any(frame[0] == FRAME_SETTINGS for frame in queued) or len(queued) >= WS_QUEUE_LIMIT
+        ):
+            kind, message = FRAME_SETTINGS, None
+        
+        if kind == FRAME_SETTINGS and queued:
+            self.frames = deque(frame for frame in self.frames if frame[0] not in (FRAME_SETTINGS, FRAME_SETTINGS_PATCH))
+        
+        self.frames.append((kind, message))
+        self.wakeup.set()
+    
+    async def run(self):
+        """Send queued frames in order until the client fails or is removed"""
+        while not self.closed:
+            await self.wakeup.wait()
+            self.wakeup.clear()
+            while self.frames and not self.closed:
+                kind, message = self.frames.popleft()
+                if message is None and kind == FRAME_SETTINGS:
+                    message = get_gfx_settings_message(self.match_id)
+                elif message is None:
+                    state = matches.get(self.match_id)
+                    if state is None:
+                        continue
+                    message = encode_snapshot(state, fresh_timer=self.skip_ticks)
+                try:
+                    await asyncio.wait_for(self.websocket.send_text(message), WS_SEND_TIMEOUT)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    metric_ws_dropped.inc("send_timeout" if isinstance(e, asyncio.TimeoutError) else "send_error")
+                    drop_connection(self.match_id, self.websocket)
+                    return
+    
+    def stop(self):
+        """Stop the writer task and discard queued frames"""
+        # The flag also ends the loop if wait_for swallowed the cancellation
+        self.closed = True
+        self.frames.clear()
+        self.wakeup.set()
+        if self.task is not asyncio.current_task():
+            self.task.cancel()
+
+def add_connection(match_id: str, ws: WebSocket, skip_ticks: bool = False, delta: bool = False) -> ClientOutbox:
+    """Register a client for a match and start its writer task"""
+    if delta and match_id not in delta_bases:
+        # First delta client: patches start from the current state
+        state = get_or_create_match(match_id)
+        snapshot = state.model_dump()
+        delta_bases[match_id] = {
+            DELTA_STREAM_ALL: (state.rev, snapshot),
+            DELTA_STREAM_SYNC: (state.rev, snapshot)
+        }
+    
+    outbox = ClientOutbox(match_id, ws, skip_ticks, delta)
+    connections[match_id][ws] = outbox
+    return outbox
+
+def remove_connection(match_id: str, ws: WebSocket):
+    """Unregister a client and stop its writer task"""
+    if match_id not in connections:
+        return
+    outbox = connections[match_id].pop(ws, None)
+    if outbox is not None:
+        outbox.stop()
+    if not any(other.delta for other in connections[match_id].values()):
+        delta_bases.pop(match_id, None)
+    if not connections[match_id]:
+        del connections[match_id]
+
+def drop_connection(match_id: str, ws: WebSocket):
+    """Remove a slow or dead client and close its socket in the background"""
+    remove_connection(match_id, ws)
+    
+    async def close():
+        try:
+            await asyncio.wait_for(ws.close(), WS_SEND_TIMEOUT)
+        except Exception:
+            pass
+    
+    asyncio.create_task(close())
+
+def broadcast_message(match_id: str, message: str, kind: str = FRAME_EVENT):
+    """Queue a message for all WebSocket connections of a match
+    
+    Each client's writer task sends it, so callers holding a match lock never
+    wait for clients, and a slow client only delays its own frames.
+    """
+    for outbox in list(connections.get(match_id, {}).values()):
+        outbox.put(message, kind)
+
+def build_patch_messages(match_id: str, event_type: str, state: MatchState, changed: Optional[Dict],
+                         ts: int, timer: Optional[Dict], kind: str) -> Dict[str, str]:
+    """Encode the patch frame of each delta stream and advance the stream bases"""
+    bases = delta_bases.get(match_id)
+    if bases is None:
+        return {}
+    
+    snapshot = state.model_dump()
+    messages = {}
+    for stream, (base_rev, base_state) in bases.items():
+        if kind == FRAME_TICK and stream == DELTA_STREAM_SYNC:
+            continue
+        
+        patch = {key: value for key, value in snapshot.items() if key != "rev" and base_state.get(key) != value}
+        if stream == DELTA_STREAM_SYNC:
+            # Ticks since the base are not in this stream, so always carry the timer
+            for key in TICK_FIELDS:
+                patch[key] = snapshot[key]
+        
+        messages[stream] = WebSocketPatchEvent(
+            type=event_type,
+            base_rev=base_rev,
+            rev=state.rev,
+            patch=patch,
+            changed=changed,
+            ts=ts,
+            timer=timer
+        ).model_dump_json()
+    
+    bases[DELTA_STREAM_ALL] = (state.rev, snapshot)
+    if kind != FRAME_TICK:
+        bases[DELTA_STREAM_SYNC] = (state.rev, snapshot)
+    return messages
+
+async def broadcast_event(match_id: str, event_type: str, state: MatchState, changed: Optional[Dict] = None,
+                          kind: Optional[str] = None, journal: bool = True):
+    """Broadcast an event to all WebSocket connections for a match
+    
+    The frame is encoded once here; sending happens in a background fan-out.
+    `kind` overrides the frame kind (e.g. FRAME_TICK for timer ticks).
+    The new state is also journaled unless `journal` is False.
+    """
+    if journal:
+        journal_match(state)
+    record_match_change(match_id)
+    state_bus.publish_event(match_id, event_type, state, changed, kind)
+    notify_revision(match_id)
+    mark_vmix_file_dirty(match_id)
+    mark_vmix_push_dirty(match_id)
+    
+    sse = match_id in sse_streams or match_id in sse_history or sse_all_history is not None
+    if match_id not in connections and not sse:
+        return
+    
+    started = time.perf_counter()
+    # The event starts a new revision, so its ts becomes the revision timestamp
+    rev, ts, payloads = get_revision_entry(state, int(time.time() * 1000))
+    timer = get_timer_info(match_id)
+    if kind is None:
+        kind = FRAME_STATE if event_type == "state" else FRAME_EVENT
+    
+    if event_type == "state" and changed is None:
+        message = get_cached_payload(state, PAYLOAD_WS_STATE)
+    else:
+        event = WebSocketEvent(
+            type=event_type,
+            state=state,
+            changed=changed,
+            ts=ts,
+            timer=timer
+        )
+        message = event.model_dump_json()
+    
+    if sse:
+        publish_sse(match_id, state.rev, message)
+    
+    patches = build_patch_messages(match_id, event_type, state, changed, ts, timer, kind)
+    
+    for outbox in list(connections.get(match_id, {}).values()):
+        if outbox.delta:
+            patch_message = patches.get(DELTA_STREAM_SYNC if outbox.skip_ticks else DELTA_STREAM_ALL)
+            if patch_message is not None:
+                outbox.put(patch_message, kind)
+        else:
+            outbox.put(message, kind)
+    metric_broadcast_seconds.observe(time.perf_counter() - started)
+
+def notify_revision(match_id: str):
+    """Wake all requests waiting for the next revision of a match"""
+    event = revision_events.pop(match_id, None)
+    if event is not None:
+        event.set()
+
+async def wait_for_revision(match_id: str, since_rev: int, timeout: float) -> Optional[MatchState]:
+    """Wait until the rev of a match differs from since_rev
+    
+    Returns the state, or None if nothing changed within `timeout` seconds.
+    A since_rev ahead of the match (e.g. from before a restart) returns at once.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        state = get_or_create_match(match_id)
+        if state.rev != since_rev:
+            return state
+        
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+        
+        # All waiters of a match share one event, so idle waiters cost no work
+        event = revision_events.get(match_id)
+        if event is None:
+            event = asyncio.Event()
+            revision_events[match_id] = event
+        try:
+            await asyncio.wait_for(event.wait(), remaining)
+        except asyncio.TimeoutError:
+            return None
+
+@asynccontextmanager
+async def match_lock(match_id: str):
+    """Hold the state lock of one match
+    
+    Locks are created on demand and removed from the registry once the match
+    is gone and no task holds or waits for its lock.
+    """
+    entry = match_locks.get(match_id)
+    if entry is None:
+        entry = [asyncio.Lock(), 0]
+        match_locks[match_id] = entry
+    
+    entry[1] += 1
+    try:
+        async with entry[0]:
+            yield
+    finally:
+        entry[1] -= 1
+        if entry[1] == 0 and match_id not in matches and match_locks.get(match_id) is entry:
+            del match_locks[match_id]
+
+def get_or_create_match(match_id: str) -> MatchState:
+    """Get existing match or create a new one
+    
+    Only the owner creates matches: a replica returns the state the owner would
+    create without storing it (see ensure_match).
+    """
+    if match_id not in matches:
+        # A re-created match continues after its last rev so ETags never repeat
+        state = MatchState(match_id=match_id, rev=retired_revs.get(match_id, -1) + 1)
+        if not state_bus.owns_state:
+            return state
+        retired_revs.pop(match_id, None)
         matches[match_id] = state
+        record_match_change(match_id)
+        state_bus.publish_created(match_id, state)
+    return matches[match_id]
+
+async def ensure_match(match_id: str) -> MatchState:
+    """Get existing match or create a new one, on the owner if this is a replica
+    
+    Entry points that create unknown matches (data reads, WebSocket, SSE) use
+    this, so every worker sees the same set of matches.
+    """
+    if match_id not in matches and not state_bus.owns_state:
+        await state_bus.create_match(match_id)
+    return get_or_create_match(match_id)
+
+def record_match_change(match_id: str, removed: bool = False):
+    """Give a changed (or removed) match the next sequence number of the changes feed"""
+    global change_seq
+    
+    change_seq += 1
+    match_changes.pop(match_id, None)
+    match_changes[match_id] = (change_seq, time.time(), removed)
+
+def get_current_tournament() -> Optional[Tournament]:
+    """Get the current selected tournament"""
+    try:
+        if not hasattr(tournaments_data, 'current_tournament_id') or not tournaments_data.current_tournament_id:
+            return None
+        
+        if tournaments_data.current_tournament_id not in tournaments_data.tournaments:
+            return None
+        
+        return tournaments_data.tournaments[tournaments_data.current_tournament_id]
+    except Exception as e:
+        return None
+
+def get_or_create_current_tournament() -> Tournament:
+    """Get current tournament or create default if none exists"""
+    tournament = get_current_tournament()
+    if tournament is None:
+        # Create default tournament
+        tournament_id = f"tournament_{tournaments_data.tournament_id_counter + 1}"
+        tournaments_data.tournament_id_counter += 1
+        tournament = Tournament(
+            id=tournament_id,
+            name="Default Tournament",
+            created_at=time.time(),
+            players=[]
+        )
+        tournaments_data.tournaments[tournament_id] = tournament
+        tournaments_data.current_tournament_id = tournament_id
+        mark_tournaments_dirty(tournament_change(tournament), meta_change())
+    return tournament
+
+# ============================================================================
+# Tournament Persistence
+# ============================================================================
+
+def mark_tournaments_dirty(*changes: tuple):
+    """Schedule a write of tournaments_data (coalesced, off the event loop)
+    
+    `changes` are the modified rows (tournament_change(), player_change(), ...)
+    for backends that write rows instead of the whole document.
+    """
+    global tournaments_dirty, persist_task
+    
+    tournaments_dirty = True
+    pending_tournament_changes.extend(changes)
+    if persist_task is None or persist_task.done():
+        persist_task = asyncio.create_task(persistence_worker())
+    else:
+        persist_wakeup.set()
+
+async def flush_tournaments_data():
+    """Write the current tournaments_data in a thread if it has changed"""
+    global tournaments_dirty, pending_tournament_changes
+    
+    if not tournaments_dirty:
+        return
+    
+    # The snapshot is taken on the event loop, so it is consistent
+    storage = get_tournament_storage()
+    tournaments_dirty = False
+    changes, pending_tournament_changes = pending_tournament_changes, []
+    document = build_tournaments_document(tournaments_data) if storage.full_document else None
+    started = time.perf_counter()
+    try:
+        await asyncio.to_thread(storage.write, document, changes)
+        observe_flush("tournaments", started)
+    except Exception as e:
+        metric_flush_failures.inc("tournaments")
+        # Keep the data dirty so the next round retries
+        tournaments_dirty = True
+        pending_tournament_changes = changes + pending_tournament_changes
+        print(f"Failed to save tournaments data: {e}")
+
+async def persistence_worker():
+    """Background task that flushes tournaments_data at most every PERSIST_INTERVAL"""
+    while True:
+        persist_wakeup.clear()
+        await flush_tournaments_data()
+        await asyncio.sleep(PERSIST_INTERVAL)
+        if not tournaments_dirty:
+            await persist_wakeup.wait()
+
+async def stop_persistence():
+    """Stop the persistence task and write any pending changes"""
+    global persist_task
+    
+    if persist_task is not None:
+        persist_task.cancel()
+        try:
+            await persist_task
+        except asyncio.CancelledError:
+            pass
+        persist_task = None
+    
+    # The write lock also waits for a write still running in the worker thread
+    await flush_tournaments_data()
+    if tournament_storage is not None:
+        tournament_storage.close()
+
+# ============================================================================
+# Match Journal
+# ============================================================================
+#
+# Every match mutation appends the full new state of the match to
+# matches.journal; GFX settings changes and match removals are journaled too.
+# Records are one JSON object per line with a sequence number "q":
+#   {"q": 7, "m": match_id, "t": timer deadline (Unix ms, if running), "s": state}
+#   {"q": 8, "d": match_id, "r": last rev}                (match removed)
+#   {"q": 9, "g": match_id, "v": version, "s": settings}  (GFX settings)
+# On startup the state is rebuilt from matches.snapshot.json plus the records
+# after its sequence number. Compaction writes a new snapshot and empties the
+# journal.
+
+def append_journal(fields: dict, state_payload: Optional[bytes] = None):
+    """Queue a journal record for the next batched write"""
+    global journal_seq, journal_task
+    
+    journal_seq += 1
+    record = json.dumps({"q": journal_seq, **fields}, ensure_ascii=False, separators=(",", ":")).encode('utf-8')
+    if state_payload is not None:
+        # Reuse the encoded state of the revision instead of encoding it again
+        record = record[:-1] + b',"s":' + state_payload + b'}'
+    journal_buffer.append(record + b"\n")
+    
+    if journal_task is None or journal_task.done():
+        journal_task = asyncio.create_task(journal_writer())
+    else:
+        journal_wakeup.set()
+
+def journal_match(state: MatchState):
+    """Journal the current state of a match"""
+    fields = {"m": state.match_id}
+    timer = get_timer_info(state.match_id)
+    if timer is not None:
+        fields["t"] = timer["deadline"]
+    append_journal(fields, get_cached_payload(state, PAYLOAD_STATE))
+
+def write_journal_lines(lines: List[bytes]):
+    """Append records to the journal file and fsync it (blocking)"""
+    path = get_journal_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with journal_write_lock:
+        with open(path, 'ab') as f:
+            f.write(b"".join(lines))
+            f.flush()
+            os.fsync(f.fileno())
+
+def write_journal_snapshot(snapshot: dict) -> int:
+    """Atomically replace the snapshot, then empty the journal (blocking)
+    
+    Returns the size of the snapshot file.
+    """
+    path = get_journal_snapshot_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with journal_write_lock:
+        temp_path = path.with_suffix('.json.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, ensure_ascii=False, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+            size = os.fstat(f.fileno()).st_size
+        temp_path.replace(path)
+        
+        # Records already in the file are covered by the snapshot ("seq")
+        with open(get_journal_path(), 'wb') as f:
+            os.fsync(f.fileno())
+    return size
+
+def build_journal_snapshot() -> dict:
+    """Snapshot of all matches and GFX settings up to the last journal record"""
+    snapshot_matches = {}
+    for match_id, state in matches.items():
+        timer = get_timer_info(match_id)
+        snapshot_matches[match_id] = {
+            "s": state.model_dump(),
+            "t": timer["deadline"] if timer is not None else None
+        }
+    return {
+        "seq": journal_seq,
+        "matches": snapshot_matches,
+        "gfx": {
+            match_id: {"v": gfx_settings_versions.get(match_id, 0), "s": settings}
+            for match_id, settings in gfx_settings.items()
+        },
+        "retired": dict(retired_revs)
+    }
+
+async def flush_journal():
+    """Write queued journal records in a thread"""
+    global journal_buffer, journal_records
+    
+    if not journal_buffer:
+        return
+    
+    lines, journal_buffer = journal_buffer, []
+    started = time.perf_counter()
+    try:
+        await asyncio.to_thread(write_journal_lines, lines)
+        journal_records += len(lines)
+        observe_flush("journal", started, sum(map(len, lines)))
+    except Exception as e:
+        metric_flush_failures.inc("journal")
+        # Keep the records so the next round retries
+        journal_buffer = lines + journal_buffer
+        print(f"Failed to write match journal: {e}")
+
+async def compact_journal():
+    """Fold the journal into a new snapshot"""
+    global journal_records
+    
+    await flush_journal()
+    # Records queued from here on have higher sequence numbers than the snapshot
+    snapshot = build_journal_snapshot()
+    started = time.perf_counter()
+    try:
+        size = await asyncio.to_thread(write_journal_snapshot, snapshot)
+        journal_records = 0
+        observe_flush("snapshot", started, size)
+    except Exception as e:
+        metric_flush_failures.inc("snapshot")
+        print(f"Failed to compact match journal: {e}")
+
+async def journal_writer():
+    """Background task that writes the journal in batches and compacts it"""
+    while True:
+        journal_wakeup.clear()
+        await flush_journal()
+        if journal_records >= JOURNAL_COMPACT_RECORDS:
+            await compact_journal()
+        await asyncio.sleep(JOURNAL_FLUSH_INTERVAL)
+        if not journal_buffer:
+            await journal_wakeup.wait()
+
+async def stop_journal():
+    """Stop the journal task and leave a fresh snapshot with an empty journal"""
+    global journal_task
+    
+    if journal_task is not None:
+        journal_task.cancel()
+        try:
+            await journal_task
+        except asyncio.CancelledError:
+            pass
+        journal_task = None
+    
+    if journal_buffer or journal_records:
+        await compact_journal()
+
+# Start of a journal record: sequence number, record kind and match id
+JOURNAL_RECORD_HEADER = re.compile(rb'\{"q":(\d+),"([mdg])":("(?:[^"\\]|\\.)*")')
+
+def read_journal() -> tuple:
+    """Read the snapshot and the journal records that still matter (blocking)
+    
+    The journal is scanned from the end and only the latest match and GFX
+    settings record of each match is decoded. A torn last line from a crash
+    during a write is ignored and cut off, so the next record starts on a line
+    of its own. Returns (snapshot, records in journal order, number of records
+    in the file).
+    """
+    snapshot = {}
+    snapshot_path = get_journal_snapshot_path()
+    if snapshot_path.exists():
+        with open(snapshot_path, 'r', encoding='utf-8') as f:
+            snapshot = json.load(f)
+    
+    journal_path = get_journal_path()
+    if not journal_path.exists():
+        return snapshot, [], 0
+    with open(journal_path, 'rb') as f:
+        data = f.read()
+    if data and not data.endswith(b"\n"):
+        with journal_write_lock:
+            with open(journal_path, 'r+b') as f:
+                f.truncate(data.rfind(b"\n") + 1)
+                os.fsync(f.fileno())
+    lines = data.split(b"\n")
+    
+    records = []
+    seen = set()
+    for line in reversed(lines):
+        header = JOURNAL_RECORD_HEADER.match(line)
+        if header is None:
+            continue
+        # Match ("m") and removal ("d") records of a match supersede each other
+        key = (b"g" if header.group(2) == b"g" else b"m", header.group(3))
+        if key in seen:
+            continue
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            continue
+        seen.add(key)
+    records.reverse()
+    return snapshot, records, sum(1 for line in lines if line)
+
+def recover_matches() -> int:
+    """Rebuild matches and GFX settings from the snapshot and the journal tail
+    
+    Running timers continue from their recorded deadline. Returns the number of
+    recovered matches.
+    """
+    global journal_seq, journal_records
+    
+    snapshot, records, record_count = read_journal()
+    seq = snapshot.get("seq", 0)
+    
+    # Latest raw state and timer deadline per match; models are built once at the end
+    states = {}
+    deadlines = {}
+    for match_id, entry in snapshot.get("matches", {}).items():
+        states[match_id] = entry["s"]
+        deadlines[match_id] = entry.get("t")
+    for match_id, entry in snapshot.get("gfx", {}).items():
+        gfx_settings[match_id] = entry["s"]
+        gfx_settings_versions[match_id] = entry["v"]
+    retired_revs.update(snapshot.get("retired", {}))
+    
+    for record in records:
+        if record.get("q", 0) <= seq:
+            continue
+        seq = record["q"]
+        if "m" in record:
+            states[record["m"]] = record["s"]
+            deadlines[record["m"]] = record.get("t")
+            retired_revs.pop(record["m"], None)
+        elif "d" in record:
+            states.pop(record["d"], None)
+            deadlines.pop(record["d"], None)
+            retired_revs[record["d"]] = record["r"]
+        elif "g" in record:
+            gfx_settings[record["g"]] = record["s"]
+            gfx_settings_versions[record["g"]] = record["v"]
+    
+    for match_id, state in states.items():
+        matches[match_id] = MatchState(**state)
+        record_match_change(match_id)
+    journal_seq = seq
+    journal_records = record_count
+    
+    # Restart running timers from their deadlines (stopped if already expired)
+    now_ms = time.time() * 1000
+    for match_id, state in matches.items():
+        if not state.timerRunning:
+            continue
+        deadline = deadlines.get(match_id)
+        remaining = max(0, math.ceil((deadline - now_ms) / 1000)) if deadline is not None else 0
+        # Timer ticks are not journaled: skip past every rev they may have used
+        state.rev += max(0, state.timerSecondsRemaining - remaining) + 1
+        state.timerSecondsRemaining = remaining
+        if remaining > 0:
+            start_timer_task(match_id)
+        else:
+            state.timerRunning = False
+    
+    return len(matches)
+
+# ============================================================================
+# vMix File Output
+# ============================================================================
+#
+# Optional sink for vMix installs that read Title data from local files instead
+# of HTTP. Enabled when data/vmix exists (created by --vmix-files): every match
+# is written to data/vmix/match_{id}.json and all matches to matches.json, in
+# the data.json format. Files are rewritten only when a match rev changes, at
+# most every VMIX_FILES_WINDOW, via a temporary file and a rename in a worker
+# thread, so vMix never reads a partly written file.
+
+def get_vmix_files_directory() -> Path:
+    """Get the directory of the vMix data files"""
+    return get_data_directory() / "vmix"
+
+def get_vmix_file_name(match_id: str) -> str:
+    """Get the file name of a match (ids come from URLs, so keep them path-safe)"""
+    return f"match_{re.sub(r'[^A-Za-z0-9_.-]', '_', match_id)}.json"
+
+def claim_vmix_file(match_id: str, name: str) -> bool:
+    """Reserve the vMix file name of a match; False if another match owns it
+    
+    Different ids can sanitize to the same name, and Windows file names ignore
+    case, so the first match keeps the file and the others are not written.
+    """
+    owner = vmix_file_owners.setdefault(name.casefold(), match_id)
+    if owner == match_id:
+        return True
+    if match_id not in vmix_file_conflicts:
+        vmix_file_conflicts.add(match_id)
+        print(f"vMix file {name} belongs to match '{owner}'; match '{match_id}' is not written to a file")
+    return False
+
+def release_vmix_file(match_id: str, name: str) -> bool:
+    """Give up the file name of a removed match; False if it did not own it"""
+    vmix_file_conflicts.discard(match_id)
+    key = name.casefold()
+    if vmix_file_owners.get(key) != match_id:
+        return False
+    del vmix_file_owners[key]
+    # A match refused the name gets it in the next round
+    for other in list(vmix_file_conflicts):
+        if get_vmix_file_name(other).casefold() == key:
+            vmix_file_conflicts.discard(other)
+            vmix_files_dirty.add(other)
+    return True
+
+def mark_vmix_file_dirty(match_id: str):
+    """Schedule a write of the vMix file of a match (coalesced, off the event loop)"""
+    global vmix_files_task
+    
+    if not vmix_files_enabled:
+        return
+    vmix_files_dirty.add(match_id)
+    if vmix_files_task is None or vmix_files_task.done():
+        vmix_files_task = asyncio.create_task(vmix_files_writer())
+    else:
+        vmix_files_wakeup.set()
+
+def write_vmix_files(directory: Path, files: Dict[str, Optional[bytes]]):
+    """Replace (or remove, for None) vMix data files atomically (blocking)"""
+    directory.mkdir(parents=True, exist_ok=True)
+    for name, content in files.items():
+        path = directory / name
+        if content is None:
+            path.unlink(missing_ok=True)
+            continue
+        temp_path = path.with_name(name + ".tmp")
+        with open(temp_path, 'wb') as f:
+            f.write(content)
+        temp_path.replace(path)
+
+async def flush_vmix_files():
+    """Write the files of matches whose rev changed since their last write"""
+    global vmix_files_dirty
+    
+    if not vmix_files_dirty:
+        return
+    
+    # Payloads are taken on the event loop, so each file is one consistent revision
+    dirty, vmix_files_dirty = vmix_files_dirty, set()
+    files = {}
+    revs = {}
+    for match_id in dirty:
+        state = matches.get(match_id)
+        name = get_vmix_file_name(match_id)
+        if state is None:
+            if release_vmix_file(match_id, name):
+                files[name] = None
+        elif vmix_files_written.get(match_id) != state.rev and claim_vmix_file(match_id, name):
+            files[name] = get_cached_payload(state, PAYLOAD_DATA_JSON)
+            revs[match_id] = state.rev
+    if not files:
+        return
+    files[VMIX_ALL_MATCHES_FILE] = get_all_matches_payload(list(matches.values()))[1]
+    
+    started = time.perf_counter()
+    try:
+        await asyncio.to_thread(write_vmix_files, get_vmix_files_directory(), files)
+    except Exception as e:
+        metric_flush_failures.inc("vmix_files")
+        # E.g. vMix holding a file open on Windows: retry in the next round
+        vmix_files_dirty |= dirty
+        print(f"Failed to write vMix files: {e}")
+        return
+    observe_flush("vmix_files", started, sum(len(content) for content in files.values() if content is not None))
+    
+    for match_id in dirty:
+        if match_id in revs:
+            vmix_files_written[match_id] = revs[match_id]
+        else:
+            vmix_files_written.pop(match_id, None)
+
+async def vmix_files_writer():
+    """Background task that writes vMix files at most every VMIX_FILES_WINDOW"""
+    while True:
+        vmix_files_wakeup.clear()
+        await flush_vmix_files()
+        await asyncio.sleep(VMIX_FILES_WINDOW)
+        if not vmix_files_dirty:
+            await vmix_files_wakeup.wait()
+
+def start_vmix_files():
+    """Enable the vMix file sink if its directory exists and write every match once"""
+    global vmix_files_enabled
+    
+    vmix_files_enabled = get_vmix_files_directory().is_dir()
+    for match_id in list(matches):
+        mark_vmix_file_dirty(match_id)
+
+async def stop_vmix_files():
+    """Stop the vMix file task and write any pending changes"""
+    global vmix_files_task
+    
+    if vmix_files_task is not None:
+        vmix_files_task.cancel()
+        try:
+            await vmix_files_task
+        except asyncio.CancelledError:
+            pass
+        vmix_files_task = None
+    
+    await flush_vmix_files()
+
+# ============================================================================
+# vMix Push Mode
+# ============================================================================
+#
+# Instead of waiting for vMix to poll, changed fields are sent to title inputs
+# through the vMix HTTP Function API (SetText). Enabled when
+# data/vmix_push.json exists (see VMixPushConfig, or PUT /api/vmix-push).
+# broadcast_event marks configured matches dirty; one task compares the mapped
+# fields of the current revision with the values vMix last accepted and sends
+# only the differences. Changes arriving while a round is in flight are
+# coalesced into the next round, and failed calls are retried with backoff.
+
+def get_vmix_push_config_path() -> Path:
+    """Get the path to the push mode configuration"""
+    return get_data_directory() / "vmix_push.json"
+
+class VMixHTTPPool:
+    """Keep-alive HTTP connections to the vMix API, used from worker threads"""
+    
+    def __init__(self, url: str, size: int):
+        parts = urllib.parse.urlsplit(url)
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 80
+        self.path = parts.path or "/api/"
+        self.idle: List[http.client.HTTPConnection] = []
+        self.idle_lock = threading.Lock()
+        self.slots = asyncio.Semaphore(size)
+    
+    def request(self, query: str) -> int:
+        """Send one GET request and return the status (blocking)"""
+        with self.idle_lock:
+            connection = self.idle.pop() if self.idle else None
+        reused = connection is not None
+        while True:
+            if connection is None:
+                connection = http.client.HTTPConnection(self.host, self.port, timeout=VMIX_PUSH_TIMEOUT)
+            try:
+                connection.request("GET", f"{self.path}?{query}")
+                response = connection.getresponse()
+                response.read()
+                break
+            except (ConnectionError, http.client.HTTPException):
+                connection.close()
+                if not reused:
+                    raise
+                # vMix closed an idle keep-alive connection: retry once on a new one
+                connection, reused = None, False
+            except Exception:
+                connection.close()
+                raise
+        
+        with self.idle_lock:
+            self.idle.append(connection)
+        return response.status
+    
+    async def call(self, params: Dict[str, str]):
+        """Call a vMix function, e.g. {"Function": "SetText", ...}"""
+        async with self.slots:
+            status = await asyncio.to_thread(self.request, urllib.parse.urlencode(params))
+        if status != 200:
+            raise RuntimeError(f"vMix API answered {status} to {params.get('Function')}")
+    
+    def close(self):
+        """Close the idle connections"""
+        with self.idle_lock:
+            for connection in self.idle:
+                connection.close()
+            self.idle.clear()
+
+def mark_vmix_push_dirty(match_id: str):
+    """Schedule a push of the changed fields of a match to vMix"""
+    global vmix_push_task
+    
+    if match_id not in vmix_push_targets:
+        return
+    vmix_push_dirty.add(match_id)
+    if vmix_push_task is None or vmix_push_task.done():
+        vmix_push_task = asyncio.create_task(vmix_push_worker())
+    else:
+        vmix_push_wakeup.set()
+
+async def push_vmix_changes():
+    """Send the title fields that differ from what vMix last accepted
+    
+    Raises on failure; the affected matches stay dirty for the retry.
+    """
+    global vmix_push_dirty
+    
+    dirty, vmix_push_dirty = vmix_push_dirty, set()
+    calls = []
+    for match_id in dirty:
+        state = matches.get(match_id)
+        if state is None:
+            continue
+        data = get_cached_data_dict(state)
+        for target in vmix_push_targets.get(match_id, ()):
+            for name, title_field in target.fields.items():
+                value = format_data_value(data[name])
+                key = (target.input, title_field)
+                if vmix_push_sent.get(key) != value:
+                    calls.append((match_id, key, value))
+    if not calls:
+        return
+    
+    pool = vmix_push_pool
+    results = await asyncio.gather(*(
+        pool.call({"Function": "SetText", "Input": key[0], "SelectedName": key[1], "Value": value})
+        for match_id, key, value in calls
+    ), return_exceptions=True)
+    
+    error = None
+    for (match_id, key, value), result in zip(calls, results):
+        vmix_push_stats["calls"] += 1
+        if isinstance(result, BaseException):
+            vmix_push_stats["failures"] += 1
+            vmix_push_dirty.add(match_id)
+            error = result
+        else:
+            vmix_push_sent[key] = value
+    if error is not None:
+        raise error
+
+async def vmix_push_worker():
+    """Background task that pushes changes to vMix, retrying with backoff"""
+    backoff = VMIX_PUSH_RETRY_MIN
+    while True:
+        vmix_push_wakeup.clear()
+        try:
+            await push_vmix_changes()
+        except Exception as e:
+            if backoff == VMIX_PUSH_RETRY_MIN:
+                print(f"vMix push failed (retrying): {e}")
+            vmix_push_stats["last_error"] = str(e)
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, VMIX_PUSH_RETRY_MAX)
+            continue
+        
+        backoff = VMIX_PUSH_RETRY_MIN
+        await asyncio.sleep(VMIX_PUSH_WINDOW)
+        if not vmix_push_dirty:
+            await vmix_push_wakeup.wait()
+
+def configure_vmix_push(config: Optional[VMixPushConfig]):
+    """Apply a push configuration (None disables push mode) and push every target once"""
+    global vmix_push_config, vmix_push_pool
+    
+    if vmix_push_pool is not None:
+        vmix_push_pool.close()
+    vmix_push_config = config
+    vmix_push_pool = VMixHTTPPool(config.url, VMIX_PUSH_CONNECTIONS) if config is not None else None
+    vmix_push_targets.clear()
+    vmix_push_sent.clear()
+    vmix_push_dirty.clear()
+    if config is None:
+        return
+    
+    for target in config.targets:
+        vmix_push_targets.setdefault(target.match_id, []).append(target)
+        get_or_create_match(target.match_id)
+        mark_vmix_push_dirty(target.match_id)
+
+def start_vmix_push():
+    """Enable push mode if data/vmix_push.json exists"""
+    config_path = get_vmix_push_config_path()
+    if not config_path.exists():
+        return
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            config = VMixPushConfig.model_validate(json.load(f))
+    except Exception as e:
+        print(f"Invalid {config_path.name}, push mode disabled: {e}")
+        return
+    configure_vmix_push(config)
+
+async def stop_vmix_push():
+    """Stop the push task and close the vMix connections"""
+    global vmix_push_task
+    
+    if vmix_push_task is not None:
+        vmix_push_task.cancel()
+        try:
+            await vmix_push_task
+        except asyncio.CancelledError:
+            pass
+        vmix_push_task = None
+    if vmix_push_pool is not None:
+        vmix_push_pool.close()
+
+def write_vmix_push_config(config_path: Path, document: dict):
+    """Write the push configuration atomically (blocking)"""
+    config_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = config_path.with_suffix('.json.tmp')
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(document, f, indent=2, ensure_ascii=False)
+    temp_path.replace(config_path)
+
+@app.get("/api/vmix-push")
+async def get_vmix_push():
+    """Get the push mode configuration and counters"""
+    return {
+        "enabled": vmix_push_config is not None,
+        "config": vmix_push_config.model_dump() if vmix_push_config is not None else None,
+        "stats": vmix_push_stats
+    }
+
+@app.put("/api/vmix-push")
+async def put_vmix_push(config: VMixPushConfig):
+    """Replace the push mode configuration (saved to data/vmix_push.json)"""
+    await asyncio.to_thread(write_vmix_push_config, get_vmix_push_config_path(), config.model_dump())
+    configure_vmix_push(config)
+    return {"status": "ok", "config": config.model_dump()}
+
+@app.delete("/api/vmix-push")
+async def delete_vmix_push():
+    """Disable push mode (removes data/vmix_push.json)"""
+    await asyncio.to_thread(get_vmix_push_config_path().unlink, missing_ok=True)
+    configure_vmix_push(None)
+    return {"status": "ok"}
+
+# ============================================================================
+# State Bus (multi-process mode)
+# ============================================================================
+#
+# By default one process owns everything. With `python main.py --workers N`
+# (see run_multiprocess) a single owner process holds the authoritative
+# matches, runs the timers, the journal, persistence and the vMix outputs, and
+# serves its API on a private Unix socket. N uvicorn worker processes hold read
+# replicas: the owner streams every state change to them over a second Unix
+# socket (newline-delimited JSON), and each worker feeds the changes to its own
+# WebSocket, SSE and long-poll clients and answers data reads locally. All
+# other requests, including every mutation, are forwarded to the owner.
+#
+# Bus messages (owner -> replica):
+#   {"t": "hello", "instance", "seq", "matches", "timers", "gfx", "changes"}  (on connect)
+#   {"t": "m", "id", "e": event type, "c": changed, "k": frame kind, "ts", "d": timer deadline (Unix ms), "q": change seq, "s": state}
+#   {"t": "c", "id", "ts", "q": change seq, "s": state}                       (match created)
+#   {"t": "d", "id", "r": last rev, "q": change seq}                          (match removed)
+#   {"t": "g", "id", "v": version, "s": settings, "p": patch}                (GFX settings)
+
+def is_replica_read_path(path: str) -> bool:
+    """Whether a GET to this path is answered by a replica (not forwarded to the owner)"""
+    return not path.startswith("/api/") or REPLICA_READ_PATHS.match(path) is not None
+
+class StateBus:
+    """State backend of a single process: it owns the matches, nothing is published"""
+    
+    owns_state = True
+    
+    async def start(self):
+        pass
+    
+    async def stop(self):
+        pass
+    
+    def publish_event(self, match_id: str, event_type: str, state: MatchState, changed: Optional[Dict],
+                      kind: Optional[str]):
+        pass
+    
+    def publish_created(self, match_id: str, state: MatchState):
+        pass
+    
+    def publish_removed(self, match_id: str, rev: int):
+        pass
+    
+    def publish_gfx_settings(self, match_id: str, settings: dict, patch: dict, version: int):
+        pass
+
+class StateBusOwner(StateBus):
+    """Owner process: streams every state change to the replica processes"""
+    
+    def __init__(self, socket_path: str):
+        self.socket_path = socket_path
+        self.replicas: Dict[asyncio.StreamWriter, asyncio.Queue] = {}
+        self.server: Optional[asyncio.AbstractServer] = None
+    
+    async def start(self):
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self.server = await asyncio.start_unix_server(self.serve_replica, path=self.socket_path)
+    
+    async def stop(self):
+        if self.server is not None:
+            self.server.close()
+        for writer in list(self.replicas):
+            writer.close()
+    
+    def build_hello(self) -> bytes:
+        """Encode the full state a replica starts from"""
+        timers = {}
+        for match_id in timer_deadlines:
+            timer = get_timer_info(match_id)
+            timers[match_id] = timer["deadline"]
+        return json.dumps({
+            "t": "hello",
+            "instance": SERVER_INSTANCE_ID,
+            "seq": change_seq,
+            "matches": {match_id: state.model_dump() for match_id, state in matches.items()},
+            "timers": timers,
+            "gfx": {match_id: {"s": settings, "v": gfx_settings_versions.get(match_id, 0)}
+                    for match_id, settings in gfx_settings.items()},
+            "changes": [[match_id, seq, changed_at, removed]
+                        for match_id, (seq, changed_at, removed) in match_changes.items()]
+        }, ensure_ascii=False, separators=(",", ":")).encode('utf-8') + b"\n"
+    
+    async def serve_replica(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Send the hello and then every published message to one replica"""
+        # Registered together with the hello, so no change falls in between
+        queue = asyncio.Queue()
+        queue.put_nowait(self.build_hello())
+        self.replicas[writer] = queue
+        try:
+            while True:
+                chunks = [await queue.get()]
+                while not queue.empty():
+                    chunks.append(queue.get_nowait())
+                writer.write(b"".join(chunks))
+                await writer.drain()
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self.replicas.pop(writer, None)
+            writer.close()
+    
+    def send(self, message: bytes):
+        """Queue an encoded message for every replica (a stuck replica is dropped and resyncs)"""
+        for writer, queue in list(self.replicas.items()):
+            if queue.qsize() >= BUS_QUEUE_LIMIT:
+                self.replicas.pop(writer, None)
+                writer.close()
+                continue
+            queue.put_nowait(message)
+    
+    def publish_event(self, match_id: str, event_type: str, state: MatchState, changed: Optional[Dict],
+                      kind: Optional[str]):
+        if not self.replicas:
+            return
+        rev, ts, payloads = get_revision_entry(state, int(time.time() * 1000))
+        timer = get_timer_info(match_id)
+        head = json.dumps({
+            "t": "m", "id": match_id, "e": event_type, "c": changed, "k": kind, "ts": ts,
+            "d": timer["deadline"] if timer is not None else None, "q": change_seq
+        }, ensure_ascii=False, separators=(",", ":")).encode('utf-8')
+        # Reuse the encoded state of the revision
+        self.send(head[:-1] + b',"s":' + get_cached_payload(state, PAYLOAD_STATE) + b"}\n")
+    
+    def publish_created(self, match_id: str, state: MatchState):
+        if self.replicas:
+            rev, ts, payloads = get_revision_entry(state, int(time.time() * 1000))
+            self.send(json.dumps({"t": "c", "id": match_id, "ts": ts, "q": change_seq, "s": state.model_dump()},
+                                 ensure_ascii=False, separators=(",", ":")).encode('utf-8') + b"\n")
+    
+    def publish_removed(self, match_id: str, rev: int):
+        if self.replicas:
+            self.send(json.dumps({"t": "d", "id": match_id, "r": rev, "q": change_seq},
+                                 ensure_ascii=False).encode('utf-8') + b"\n")
+    
+    def publish_gfx_settings(self, match_id: str, settings: dict, patch: dict, version: int):
+        if self.replicas:
+            self.send(json.dumps({"t": "g", "id": match_id, "v": version, "s": settings, "p": patch},
+                                 ensure_ascii=False).encode('utf-8') + b"\n")
+
+class StateBusReplica(StateBus):
+    """Worker process: mirrors the owner's state and forwards mutations to it"""
+    
+    owns_state = False
+    
+    def __init__(self, socket_path: str, owner_path: str):
+        self.socket_path = socket_path
+        self.owner_path = owner_path
+        self.ready = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+    
+    async def start(self):
+        self.task = asyncio.create_task(self.run())
+        await asyncio.wait_for(self.ready.wait(), BUS_CONNECT_TIMEOUT)
+    
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+    
+    async def run(self):
+        """Follow the owner's message stream, reconnecting (and resyncing) when it breaks"""
+        while True:
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.socket_path, limit=BUS_LINE_LIMIT)
+            except OSError:
+                await asyncio.sleep(BUS_RECONNECT_DELAY)
+                continue
+            try:
+                while True:
+                    line = await reader.readline()
+                    if not line:
+                        break
+                    await self.apply(json.loads(line))
+                    self.ready.set()
+            except (ConnectionError, OSError, ValueError) as e:
+                print(f"State bus error: {e}")
+            finally:
+                writer.close()
+            print("State bus connection lost, reconnecting")
+            await asyncio.sleep(BUS_RECONNECT_DELAY)
+    
+    async def apply(self, message: dict):
+        """Apply one owner message to the local replica and notify local clients"""
+        global change_seq
         
-        await broadcast_event(match_id, "setup", state, {"field": "setup"})
+        kind = message["t"]
+        if kind == "m":
+            match_id = message["id"]
+            state = MatchState(**message["s"])
+            matches[match_id] = state
+            retired_revs.pop(match_id, None)
+            set_replica_timer(match_id, message["d"])
+            # Same revision timestamp and change sequence number as the owner
+            get_revision_entry(state, message["ts"])
+            change_seq = message["q"] - 1
+            await broadcast_event(match_id, message["e"], state, message["c"], kind=message["k"], journal=False)
+        elif kind == "c":
+            match_id = message["id"]
+            state = MatchState(**message["s"])
+            matches[match_id] = state
+            retired_revs.pop(match_id, None)
+            get_revision_entry(state, message["ts"])
+            change_seq = message["q"] - 1
+            record_match_change(match_id)
+            notify_revision(match_id)
+        elif kind == "d":
+            change_seq = message["q"] - 1
+            evict_match(message["id"])
+            retired_revs[message["id"]] = message["r"]
+        elif kind == "g":
+            apply_gfx_settings(message["id"], message["s"], message["p"], message["v"])
+        elif kind == "hello":
+            await self.apply_hello(message)
     
-    return {"status": "ok", "state": state.model_dump()}
+    async def apply_hello(self, message: dict):
+        """Replace the replica with the owner's full state (first connect or resync)"""
+        global SERVER_INSTANCE_ID, change_seq
+        
+        SERVER_INSTANCE_ID = message["instance"]
+        for match_id in list(matches):
+            if match_id not in message["matches"]:
+                evict_match(match_id)
+        
+        gfx_settings.clear()
+        gfx_settings_versions.clear()
+        for match_id, entry in message["gfx"].items():
+            gfx_settings[match_id] = entry["s"]
+            gfx_settings_versions[match_id] = entry["v"]
+        
+        for match_id, data in message["matches"].items():
+            state = MatchState(**data)
+            matches[match_id] = state
+            set_replica_timer(match_id, message["timers"].get(match_id))
+            # Connected clients get the current state (delta clients a patch from their base)
+            await broadcast_event(match_id, "state", state, journal=False)
+            for outbox in list(connections.get(match_id, {}).values()):
+                outbox.put(None, FRAME_SETTINGS)
+        
+        match_changes.clear()
+        for match_id, seq, changed_at, removed in message["changes"]:
+            match_changes[match_id] = (seq, changed_at, removed)
+        change_seq = message["seq"]
+    
+    async def run_commands(self, match_id: str, commands: List[MatchCommand]) -> int:
+        """Run validated commands on the owner and wait until the replica has the result
+        
+        Returns the resulting rev; errors from the owner raise HTTPException
+        (503 if the owner is unreachable or its answer cannot be read).
+        """
+        body = json.dumps({"commands": [command.model_dump() for command in commands]}).encode('utf-8')
+        try:
+            status, headers, content = await owner_request(
+                "POST", f"/api/match/{urllib.parse.quote(match_id, safe='')}/commands",
+                [("content-type", "application/json")], body
+            )
+            result = json.loads(content)
+        except (OSError, ValueError):
+            raise HTTPException(status_code=503, detail="Owner process unavailable")
+        if status != 200:
+            raise HTTPException(status_code=status, detail=result.get("detail"))
+        
+        # The ack must follow the command's event, which arrives over the bus
+        rev = result["rev"]
+        deadline = time.monotonic() + BUS_CONNECT_TIMEOUT
+        while get_or_create_match(match_id).rev < rev and time.monotonic() < deadline:
+            await wait_for_revision(match_id, get_or_create_match(match_id).rev, deadline - time.monotonic())
+        return rev
+    
+    async def create_match(self, match_id: str):
+        """Have the owner create a match and wait until it arrives over the bus
+        
+        Raises HTTPException (503) if the owner cannot be reached.
+        """
+        try:
+            await owner_request("GET", f"/api/match/{urllib.parse.quote(match_id, safe='')}/state", [], b"")
+        except (OSError, ValueError):
+            raise HTTPException(status_code=503, detail="Owner process unavailable")
+        
+        deadline = time.monotonic() + BUS_CONNECT_TIMEOUT
+        while match_id not in matches:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            event = revision_events.get(match_id)
+            if event is None:
+                event = asyncio.Event()
+                revision_events[match_id] = event
+            try:
+                await asyncio.wait_for(event.wait(), remaining)
+            except asyncio.TimeoutError:
+                return
 
-@app.post("/api/match/{match_id}/score")
-async def update_score(match_id: str, request: ScoreRequest):
-    """Update score for home or away team"""
-    async with state_lock:
-        state = get_or_create_match(match_id)
+def set_replica_timer(match_id: str, deadline: Optional[int]):
+    """Mirror the owner's timer deadline (Unix ms) for the timer info of local frames"""
+    if deadline is None:
+        timer_deadlines.pop(match_id, None)
+    else:
+        timer_deadlines[match_id] = time.monotonic() + (deadline / 1000 - time.time())
+
+async def owner_request(method: str, target: str, headers: List[Tuple[str, str]], body: bytes) -> tuple:
+    """Send an HTTP request to the owner process over its Unix socket
+    
+    Returns (status, headers, body). HTTP/1.0 without keep-alive, so the body
+    simply ends when the owner closes the connection. Raises OSError if the
+    owner cannot be reached and ValueError for a malformed response.
+    """
+    reader, writer = await asyncio.open_unix_connection(state_bus.owner_path, limit=BUS_LINE_LIMIT)
+    try:
+        lines = [f"{method} {target} HTTP/1.0"]
+        for name, value in headers:
+            if name.lower() not in HOP_BY_HOP_HEADERS:
+                lines.append(f"{name}: {value}")
+        lines.append(f"Content-Length: {len(body)}")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode('latin-1') + body)
+        await writer.drain()
         
-        if request.team == "home":
-            new_score = max(0, state.homeScore + request.delta)
-            state.homeScore = new_score
+        status_line = (await reader.readline()).split()
+        if len(status_line) < 2:
+            raise ConnectionError("Owner process closed the connection")
+        status = int(status_line[1])
+        response_headers = []
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode('latin-1').partition(":")
+            response_headers.append((name.strip(), value.strip()))
+        return status, response_headers, await reader.read()
+    finally:
+        writer.close()
+
+class OwnerProxyMiddleware:
+    """ASGI middleware of replica processes: forwards requests they cannot answer to the owner"""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or (scope["method"] in ("GET", "HEAD") and is_replica_read_path(scope["path"])):
+            await self.app(scope, receive, send)
+            return
+        
+        request = Request(scope, receive)
+        target = scope["path"] + ("?" + scope["query_string"].decode('latin-1') if scope["query_string"] else "")
+        try:
+            status, headers, content = await owner_request(
+                scope["method"], target, list(request.headers.items()), await request.body()
+            )
+        except (OSError, ValueError):
+            response = Response(status_code=503, content="Owner process unavailable")
         else:
-            new_score = max(0, state.awayScore + request.delta)
-            state.awayScore = new_score
+            response = Response(content=content, status_code=status, headers={
+                name: value for name, value in headers if name.lower() not in HOP_BY_HOP_HEADERS
+            })
+        await response(scope, receive, send)
+
+def create_state_bus() -> StateBus:
+    """Create the state bus of this process from the environment set by run_multiprocess"""
+    role = os.environ.get(BUS_ROLE_ENV)
+    if role == "owner":
+        return StateBusOwner(os.environ[BUS_SOCKET_ENV])
+    if role == "replica":
+        return StateBusReplica(os.environ[BUS_SOCKET_ENV], os.environ[BUS_OWNER_SOCKET_ENV])
+    return StateBus()
+
+state_bus = create_state_bus()
+if not state_bus.owns_state:
+    app.add_middleware(OwnerProxyMiddleware)
+
+def run_multiprocess(workers: int, host: str, port: int):
+    """Run an owner process and `workers` uvicorn worker processes (Linux/macOS)"""
+    import uvicorn
+    
+    if not hasattr(socket, "AF_UNIX"):
+        print("--workers needs Unix domain sockets (Linux or macOS)")
+        sys.exit(1)
+    if getattr(sys, 'frozen', False):
+        # The owner and the workers are started from main.py, which a bundle does not contain
+        print("--workers is not available in the packaged executable; run python main.py --workers N")
+        sys.exit(1)
+    
+    run_dir = tempfile.mkdtemp(prefix="vmix-score-")
+    bus_path = os.path.join(run_dir, "bus.sock")
+    owner_path = os.path.join(run_dir, "owner.sock")
+    env = {**os.environ, BUS_SOCKET_ENV: bus_path, BUS_OWNER_SOCKET_ENV: owner_path}
+    
+    owner = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--bus-owner"],
+                             env={**env, BUS_ROLE_ENV: "owner"})
+    try:
+        # Workers start once the owner has loaded its state and listens
+        while not os.path.exists(owner_path):
+            if owner.poll() is not None:
+                sys.exit(1)
+            time.sleep(0.05)
+        os.environ.update({**env, BUS_ROLE_ENV: "replica"})
+        uvicorn.run("main:app", host=host, port=port, workers=workers,
+                    app_dir=os.path.dirname(os.path.abspath(__file__)))
+    finally:
+        owner.terminate()
+        owner.wait()
+        shutil.rmtree(run_dir, ignore_errors=True)
+
+# ============================================================================
+# Timer Task
+# ============================================================================
+
+def get_timer_info(match_id: str) -> Optional[Dict]:
+    """Deadline of a running timer for clients that count down locally"""
+    if match_id not in timer_deadlines:
+        return None
+    remaining_ms = max(0, int((timer_deadlines[match_id] - time.monotonic()) * 1000))
+    return {
+        "deadline": int(time.time() * 1000) + remaining_ms,
+        "remainingMs": remaining_ms
+    }
+
+def get_timer_remaining(match_id: str, now: float) -> int:
+    """Whole seconds left on a running timer (rounded up, as displayed)"""
+    return max(0, math.ceil(timer_deadlines[match_id] - now))
+
+def get_next_tick_time(match_id: str) -> float:
+    """Monotonic time at which the displayed seconds of a timer change next"""
+    state = matches.get(match_id)
+    displayed = state.timerSecondsRemaining if state is not None else 0
+    return timer_deadlines[match_id] - max(0, displayed - 1)
+
+async def tick_timer(match_id: str, now: float):
+    """Bring the displayed seconds of one running timer up to date"""
+    async with match_lock(match_id):
+        state = matches.get(match_id)
+        if match_id not in timer_deadlines:
+            return
+        if state is None or not state.timerRunning:
+            del timer_deadlines[match_id]
+            return
         
+        remaining = get_timer_remaining(match_id, now)
+        if remaining == state.timerSecondsRemaining and remaining > 0:
+            return
+        
+        state.timerSecondsRemaining = remaining
         state.rev += 1
-        matches[match_id] = state
         
-        await broadcast_event(
-            match_id,
-            "score_changed",
-            state,
-            {"field": "score", "team": request.team, "delta": request.delta}
-        )
+        if remaining > 0:
+            # Broadcast state update (a full resync for deadline clients every N seconds)
+            kind = FRAME_STATE if remaining % TIMER_RESYNC_SECONDS == 0 else FRAME_TICK
+            # Not journaled: recovery recomputes the remaining time from the deadline
+            await broadcast_event(match_id, "state", state, kind=kind, journal=False)
+        else:
+            # Timer reached 0, stop it
+            state.timerRunning = False
+            del timer_deadlines[match_id]
+            await broadcast_event(match_id, "timer_stopped", state)
+
+async def timer_scheduler():
+    """Background task that ticks every running timer at its deadlines
     
-    return {"status": "ok", "state": state.model_dump()}
+    Remaining time is derived from time.monotonic(), so ticks never drift
+    however late the task wakes up.
+    """
+    while timer_deadlines:
+        timer_wakeup.clear()
+        next_tick = min(get_next_tick_time(match_id) for match_id in timer_deadlines)
+        delay = next_tick - time.monotonic()
+        if delay > 0:
+            try:
+                await asyncio.wait_for(timer_wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+            continue
+        
+        # Tick every timer due now (or within the batch window) in one pass
+        now = time.monotonic() + TIMER_BATCH_WINDOW
+        due = [match_id for match_id in timer_deadlines if get_next_tick_time(match_id) <= now]
+        for match_id in due:
+            # Ticks taken early within the batch window count as on time
+            metric_timer_tick_delay.observe(max(0.0, time.monotonic() - get_next_tick_time(match_id)))
+            await tick_timer(match_id, now)
 
-@app.post("/api/match/{match_id}/reset")
-async def reset_match(match_id: str):
-    """Reset match to initial state"""
-    async with state_lock:
-        state = get_or_create_match(match_id)
-        state.homeScore = 0
-        state.awayScore = 0
+def start_timer_task(match_id: str):
+    """Schedule the timer of a match from its current remaining seconds
+    
+    A deadline left from an earlier run of the timer is replaced.
+    """
+    global timer_scheduler_task
+    
+    state = get_or_create_match(match_id)
+    timer_deadlines[match_id] = time.monotonic() + state.timerSecondsRemaining
+    
+    if timer_scheduler_task is None or timer_scheduler_task.done():
+        timer_scheduler_task = asyncio.create_task(timer_scheduler())
+    else:
+        timer_wakeup.set()
+
+def stop_timer_task(match_id: str):
+    """Remove the timer of a match from the scheduler"""
+    timer_deadlines.pop(match_id, None)
+
+# ============================================================================
+# Match Commands
+# ============================================================================
+
+def apply_setup(state: MatchState, request: SetupRequest) -> Optional[Tuple[str, Optional[Dict]]]:
+    """Set up match with team names, period, and initial timer"""
+    # Update names only if provided (otherwise keep current values)
+    if request.homeName is not None:
+        state.homeName = request.homeName
+    # If homeName is None and state has no name, use default
+    elif not state.homeName or state.homeName == "Home":
+        state.homeName = "Player 1"
+    
+    if request.awayName is not None:
+        state.awayName = request.awayName
+    # If awayName is None and state has no name, use default
+    elif not state.awayName or state.awayName == "Away":
+        state.awayName = "Player 2"
+    
+    state.period = request.period
+    state.timerSecondsRemaining = request.timerSeconds
+    state.timerRunning = False
+    stop_timer_task(state.match_id)
+    if request.foraHome is not None:
+        state.foraHome = request.foraHome
+    if request.foraAway is not None:
+        state.foraAway = request.foraAway
+    # Match scores default to 0 if not set
+    if not hasattr(state, 'homeMatchScore'):
         state.homeMatchScore = 0
+    if not hasattr(state, 'awayMatchScore'):
         state.awayMatchScore = 0
-        state.foraHome = 0
-        state.foraAway = 0
-        state.period = 1
-        state.timerSecondsRemaining = 0
-        state.timerRunning = False
-        state.rev += 1
-        matches[match_id] = state
-        
-        # Stop timer task if running
-        stop_timer_task(match_id)
-        
-        await broadcast_event(match_id, "reset", state, {"field": "reset"})
+    return "setup", {"field": "setup"}
+
+def apply_score(state: MatchState, request: ScoreRequest) -> Optional[Tuple[str, Optional[Dict]]]:
+    """Update score for home or away team"""
+    if request.team == "home":
+        state.homeScore = max(0, state.homeScore + request.delta)
+    else:
+        state.awayScore = max(0, state.awayScore + request.delta)
+    return "score_changed", {"field": "score", "team": request.team, "delta": request.delta}
+
+def apply_reset(state: MatchState, request: None) -> Optional[Tuple[str, Optional[Dict]]]:
+    """Reset match to initial state"""
+    state.homeScore = 0
+    state.awayScore = 0
+    state.homeMatchScore = 0
+    state.awayMatchScore = 0
+    state.foraHome = 0
+    state.foraAway = 0
+    state.period = 1
+    state.timerSecondsRemaining = 0
+    state.timerRunning = False
     
-    return {"status": "ok", "state": state.model_dump()}
+    # Stop timer task if running
+    stop_timer_task(state.match_id)
+    return "reset", {"field": "reset"}
 
-@app.post("/api/match/{match_id}/match-score")
-async def update_match_score(match_id: str, request: ScoreRequest):
+def apply_match_score(state: MatchState, request: ScoreRequest) -> Optional[Tuple[str, Optional[Dict]]]:
     """Update overall match score (games won) for home or away team"""
-    async with state_lock:
+    if request.team == "home":
+        state.homeMatchScore = max(0, state.homeMatchScore + request.delta)
+    else:
+        state.awayMatchScore = max(0, state.awayMatchScore + request.delta)
+    return "match_score_changed", {"field": "match_score", "team": request.team, "delta": request.delta}
+
+def apply_timer_start(state: MatchState, request: None) -> Optional[Tuple[str, Optional[Dict]]]:
+    """Start the timer (no change if already running or at 0)"""
+    if state.timerRunning or state.timerSecondsRemaining <= 0:
+        return None
+    state.timerRunning = True
+    start_timer_task(state.match_id)
+    return "timer_started", None
+
+def apply_timer_stop(state: MatchState, request: None) -> Optional[Tuple[str, Optional[Dict]]]:
+    """Stop the timer (no change if not running)"""
+    if not state.timerRunning:
+        return None
+    state.timerRunning = False
+    stop_timer_task(state.match_id)
+    return "timer_stopped", None
+
+def apply_timer_set(state: MatchState, request: TimerSetRequest) -> Optional[Tuple[str, Optional[Dict]]]:
+    """Set timer to specific seconds (stops timer if running)"""
+    state.timerSecondsRemaining = request.seconds
+    state.timerRunning = False
+    
+    # Stop timer task if running
+    stop_timer_task(state.match_id)
+    return "state", {"field": "timer", "seconds": request.seconds}
+
+def apply_fora(state: MatchState, request: ScoreRequest) -> Optional[Tuple[str, Optional[Dict]]]:
+    """Update fora (handicap) for home or away team"""
+    if request.team == "home":
+        state.foraHome = max(0, min(999, state.foraHome + request.delta))
+    else:
+        state.foraAway = max(0, min(999, state.foraAway + request.delta))
+    return "fora_changed", {"field": "fora", "team": request.team, "delta": request.delta}
+
+def apply_period_set(state: MatchState, request: PeriodSetRequest) -> Optional[Tuple[str, Optional[Dict]]]:
+    """Set period number"""
+    state.period = request.period
+    return "period_changed", {"field": "period", "period": request.period}
+
+# op -> (request model or None, apply function); op names mirror the REST paths
+MATCH_COMMANDS = {
+    "setup": (SetupRequest, apply_setup),
+    "score": (ScoreRequest, apply_score),
+    "reset": (None, apply_reset),
+    "match-score": (ScoreRequest, apply_match_score),
+    "timer/start": (None, apply_timer_start),
+    "timer/stop": (None, apply_timer_stop),
+    "timer/set": (TimerSetRequest, apply_timer_set),
+    "fora": (ScoreRequest, apply_fora),
+    "period/set": (PeriodSetRequest, apply_period_set),
+}
+
+def parse_match_commands(commands: List[MatchCommand]) -> List[Tuple]:
+    """Validate every command of a batch against its REST request model
+    
+    Raises HTTPException(422) naming the first invalid command, so nothing is
+    applied unless the whole batch is valid.
+    """
+    parsed = []
+    for index, command in enumerate(commands):
+        entry = MATCH_COMMANDS.get(command.op)
+        if entry is None:
+            raise HTTPException(
+                status_code=422,
+                detail={"index": index, "op": command.op, "error": f"Unknown command '{command.op}'"}
+            )
+        model, apply = entry
+        request = None
+        if model is not None:
+            try:
+                request = model.model_validate(command.args)
+            except ValidationError as e:
+                raise HTTPException(
+                    status_code=422,
+                    detail={"index": index, "op": command.op,
+                            "error": e.errors(include_url=False, include_context=False)}
+                )
+        parsed.append((apply, request))
+    return parsed
+
+async def run_match_commands(match_id: str, commands: List[Tuple], idle_event: Optional[str] = None) -> MatchState:
+    """Apply parsed commands under one lock acquisition with a single rev bump
+    
+    One command broadcasts its own event; several are combined into one
+    "batch" event listing each change in order. If nothing changed, no rev
+    is spent and only `idle_event` (if any) is broadcast.
+    """
+    async with match_lock(match_id):
         state = get_or_create_match(match_id)
+        events = []
+        for apply, request in commands:
+            event = apply(state, request)
+            if event is not None:
+                events.append(event)
         
-        if request.team == "home":
-            new_score = max(0, state.homeMatchScore + request.delta)
-            state.homeMatchScore = new_score
-        else:
-            new_score = max(0, state.awayMatchScore + request.delta)
-            state.awayMatchScore = new_score
+        if not events:
+            if idle_event is not None:
+                await broadcast_event(match_id, idle_event, state)
+            return state
         
         state.rev += 1
         matches[match_id] = state
         
-        await broadcast_event(
-            match_id,
-            "match_score_changed",
-            state,
-            {"field": "match_score", "team": request.team, "delta": request.delta}
-        )
+        if len(events) == 1:
+            event_type, changed = events[0]
+        else:
+            event_type = "batch"
+            changed = {
+                "field": "batch",
+                "events": [{"type": t, "changed": c} for t, c in events]
+            }
+        await broadcast_event(match_id, event_type, state, changed)
+    
+    return state
+
+# ============================================================================
+# REST API Endpoints
+# ============================================================================
+
+@app.get("/api/match/{match_id}/state")
+async def get_match_state(match_id: str):
+    """Get current match state"""
+    state = await ensure_match(match_id)
+    return Response(
+        content=get_cached_payload(state, PAYLOAD_STATE),
+        media_type="application/json"
+    )
+
+@app.delete("/api/match/{match_id}")
+async def delete_match(match_id: str):
+    """Remove a match and free its cached data"""
+    async with match_lock(match_id):
+        if match_id not in matches:
+            raise HTTPException(status_code=404, detail="Match not found")
+        evict_match(match_id)
     
+    return {"status": "ok", "message": "Match deleted"}
+
+@app.post("/api/match/{match_id}/setup")
+async def setup_match(match_id: str, request: SetupRequest):
+    """Set up match with team names, period, and initial timer"""
+    state = await run_match_commands(match_id, [(apply_setup, request)])
+    return {"status": "ok", "state": state.model_dump()}
+
+@app.post("/api/match/{match_id}/score")
+async def update_score(match_id: str, request: ScoreRequest):
+    """Update score for home or away team"""
+    state = await run_match_commands(match_id, [(apply_score, request)])
+    return {"status": "ok", "state": state.model_dump()}
+
+@app.post("/api/match/{match_id}/reset")
+async def reset_match(match_id: str):
+    """Reset match to initial state"""
+    state = await run_match_commands(match_id, [(apply_reset, None)])
+    return {"status": "ok", "state": state.model_dump()}
+
+@app.post("/api/match/{match_id}/match-score")
+async def update_match_score(match_id: str, request: ScoreRequest):
+    """Update overall match score (games won) for home or away team"""
+    state = await run_match_commands(match_id, [(apply_match_score, request)])
     return {"status": "ok", "state": state.model_dump()}
 
 @app.post("/api/match/{match_id}/timer/start")
 async def start_timer(match_id: str):
     """Start the timer"""
-    async with state_lock:
-        state = get_or_create_match(match_id)
-        
-        if not state.timerRunning:
-            state.timerRunning = True
-            state.rev += 1
-            matches[match_id] = state
-            
-            # Start timer task
-            start_timer_task(match_id)
-            
-            await broadcast_event(match_id, "timer_started", state)
-        else:
-            # Already running, just broadcast current state
-            await broadcast_event(match_id, "state", state)
-    
+    # Already running: just broadcast current state
+    state = await run_match_commands(match_id, [(apply_timer_start, None)], idle_event="state")
     return {"status": "ok", "state": state.model_dump()}
 
 @app.post("/api/match/{match_id}/timer/stop")
 async def stop_timer(match_id: str):
     """Stop the timer"""
-    async with state_lock:
-        state = get_or_create_match(match_id)
-        
-        if state.timerRunning:
-            state.timerRunning = False
-            state.rev += 1
-            matches[match_id] = state
-            
-            # Stop timer task
-            stop_timer_task(match_id)
-            
-            await broadcast_event(match_id, "timer_stopped", state)
-    
+    state = await run_match_commands(match_id, [(apply_timer_stop, None)])
     return {"status": "ok", "state": state.model_dump()}
 
 @app.post("/api/match/{match_id}/timer/set")
 async def set_timer(match_id: str, request: TimerSetRequest):
     """Set timer to specific seconds (stops timer if running)"""
-    async with state_lock:
-        state = get_or_create_match(match_id)
-        state.timerSecondsRemaining = request.seconds
-        state.timerRunning = False
-        state.rev += 1
-        matches[match_id] = state
-        
-        # Stop timer task if running
-        stop_timer_task(match_id)
-        
-        await broadcast_event(match_id, "state", state, {"field": "timer", "seconds": request.seconds})
-    
+    state = await run_match_commands(match_id, [(apply_timer_set, request)])
     return {"status": "ok", "state": state.model_dump()}
 
 @app.post("/api/match/{match_id}/fora")
 async def update_fora(match_id: str, request: ScoreRequest):
     """Update fora (handicap) for home or away team"""
-    async with state_lock:
-        state = get_or_create_match(match_id)
-        
-        if request.team == "home":
-            new_fora = max(0, min(999, state.foraHome + request.delta))
-            state.foraHome = new_fora
-        else:
-            new_fora = max(0, min(999, state.foraAway + request.delta))
-            state.foraAway = new_fora
-        
-        state.rev += 1
-        matches[match_id] = state
-        
-        await broadcast_event(
-            match_id,
-            "fora_changed",
-            state,
-            {"field": "fora", "team": request.team, "delta": request.delta}
-        )
-    
+    state = await run_match_commands(match_id, [(apply_fora, request)])
     return {"status": "ok", "state": state.model_dump()}
 
 @app.post("/api/match/{match_id}/period/set")
 async def set_period(match_id: str, request: PeriodSetRequest):
     """Set period number"""
-    async with state_lock:
-        state = get_or_create_match(match_id)
-        state.period = request.period
-        state.rev += 1
-        matches[match_id] = state
-        
-        await broadcast_event(match_id, "period_changed", state, {"field": "period", "period": request.period})
+    state = await run_match_commands(match_id, [(apply_period_set, request)])
+    return {"status": "ok", "state": state.model_dump()}
+
+@app.post("/api/match/{match_id}/commands")
+async def run_commands(match_id: str, request: CommandBatchRequest):
+    """Apply an ordered list of commands atomically (one rev, one event)"""
+    commands = parse_match_commands(request.commands)
+    state = await run_match_commands(match_id, commands)
+    return {"status": "ok", "rev": state.rev, "state": state.model_dump()}
+
+# ============================================================================
+# Data Source Encoders (JSON, XML, CSV)
+# ============================================================================
+#
+# vMix Data Sources read JSON, XML and CSV. Each combination of format and
+# ?fields= projection gets a DataEncoder with its tags or header prepared once.
+# Encoded rows are cached per match revision in payload_cache like the other
+# payloads, so a revision is encoded at most once per combination.
+
+DATA_FORMAT_JSON = "json"
+DATA_FORMAT_XML = "xml"
+DATA_FORMAT_CSV = "csv"
+
+DATA_MEDIA_TYPES = {
+    DATA_FORMAT_JSON: "application/json",
+    DATA_FORMAT_XML: "application/xml",
+    DATA_FORMAT_CSV: "text/csv; charset=utf-8",
+}
+
+# Fields of a data.json object, in output order
+DATA_FIELDS = tuple(get_match_data_dict(MatchState(match_id=""), 0))
+
+# Encoders kept at most (a ?fields= value is chosen by the client)
+DATA_ENCODER_LIMIT = 64
+
+PAYLOAD_DATA_DICT = "data_dict"  # get_match_data_dict() of the revision (dict, shared by encoders)
+
+CSV_QUOTE_CHARS = re.compile(r'[",\r\n]|^\s|\s$')
+
+def format_data_value(value) -> str:
+    """Format a data field for XML and CSV (booleans as in JSON)"""
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    if value is None:
+        return ""
+    return str(value)
+
+def escape_xml(text: str) -> str:
+    """Escape text for an XML element"""
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+def quote_csv(text: str) -> str:
+    """Quote a CSV value if it needs it (RFC 4180)"""
+    if CSV_QUOTE_CHARS.search(text):
+        return '"' + text.replace('"', '""') + '"'
+    return text
+
+def parse_data_fields(fields: Optional[str]) -> Tuple[str, ...]:
+    """Parse a comma-separated ?fields= value (all fields if empty)"""
+    if not fields:
+        return DATA_FIELDS
+    
+    selected = []
+    for name in fields.split(","):
+        name = name.strip()
+        if not name or name in selected:
+            continue
+        if name not in DATA_FIELDS:
+            raise HTTPException(status_code=400, detail=f"Unknown field '{name}'")
+        selected.append(name)
+    return tuple(selected) or DATA_FIELDS
+
+class DataEncoder:
+    """Encoder of vMix data in one format, limited to the selected fields"""
+    
+    def __init__(self, data_format: str, fields: Tuple[str, ...]):
+        self.data_format = data_format
+        self.fields = fields
+        self.key = ("data", data_format, fields)  # payload_cache key of one encoded row
+        self.document_key = ("document", data_format, fields)  # ... and of a one-match document
+        # Full JSON rows are the data.json payloads cached as PAYLOAD_DATA_ITEM
+        self.full_json = data_format == DATA_FORMAT_JSON and fields == DATA_FIELDS
+        if data_format == DATA_FORMAT_XML:
+            self.tags = [(name, f"<{name}>", f"</{name}>") for name in fields]
+        elif data_format == DATA_FORMAT_CSV:
+            self.header = (",".join(fields) + "\r\n").encode('utf-8')
+    
+    def encode_row(self, data: Dict) -> bytes:
+        """Encode the data of one match"""
+        if self.data_format == DATA_FORMAT_JSON:
+            return json.dumps({name: data[name] for name in self.fields}, ensure_ascii=False).encode('utf-8')
+        if self.data_format == DATA_FORMAT_XML:
+            elements = "".join(
+                open_tag + escape_xml(format_data_value(data[name])) + close_tag
+                for name, open_tag, close_tag in self.tags
+            )
+            return f"<match>{elements}</match>".encode('utf-8')
+        # Only text can contain separators or quotes
+        row = ",".join(
+            quote_csv(value) if isinstance(value, str) else format_data_value(value)
+            for value in (data[name] for name in self.fields)
+        )
+        return (row + "\r\n").encode('utf-8')
+    
+    def encode_document(self, rows: List[bytes]) -> bytes:
+        """Wrap encoded rows into a complete response body"""
+        if self.data_format == DATA_FORMAT_JSON:
+            # vMix requires JSON as an array of objects
+            return b"[" + b", ".join(rows) + b"]"
+        if self.data_format == DATA_FORMAT_XML:
+            return b'<?xml version="1.0" encoding="utf-8"?>\n<matches>' + b"".join(rows) + b"</matches>"
+        return self.header + b"".join(rows)
+
+def get_data_encoder(data_format: str, fields: Optional[str]) -> DataEncoder:
+    """Get the encoder for a format and raw ?fields= value"""
+    encoder = data_encoders.get((data_format, fields))
+    if encoder is None:
+        encoder = DataEncoder(data_format, parse_data_fields(fields))
+        if len(data_encoders) >= DATA_ENCODER_LIMIT:
+            data_encoders.clear()
+            all_matches_data_cache.clear()
+        data_encoders[(data_format, fields)] = encoder
+    return encoder
+
+def get_cached_data_dict(state: MatchState) -> Dict:
+    """Get get_match_data_dict() of the current revision of a match (do not modify)"""
+    rev, ts, payloads = get_revision_entry(state)
+    data = payloads.get(PAYLOAD_DATA_DICT)
+    if data is None:
+        data = get_match_data_dict(state, ts)
+        payloads[PAYLOAD_DATA_DICT] = data
+    return data
+
+def get_cached_data_row(state: MatchState, encoder: DataEncoder) -> bytes:
+    """Get the encoded row of the current revision of a match"""
+    if encoder.full_json:
+        return get_cached_payload(state, PAYLOAD_DATA_ITEM)
     
-    return {"status": "ok", "state": state.model_dump()}
+    rev, ts, payloads = get_revision_entry(state)
+    row = payloads.get(encoder.key)
+    if row is None:
+        row = encoder.encode_row(get_cached_data_dict(state))
+        payloads[encoder.key] = row
+    return row
+
+def get_match_data_document(state: MatchState, encoder: DataEncoder) -> bytes:
+    """Get the response body for one match"""
+    if encoder.full_json:
+        return get_cached_payload(state, PAYLOAD_DATA_JSON)
+    
+    rev, ts, payloads = get_revision_entry(state)
+    document = payloads.get(encoder.document_key)
+    if document is None:
+        document = encoder.encode_document([get_cached_data_row(state, encoder)])
+        payloads[encoder.document_key] = document
+    return document
+
+def get_all_matches_data_document(states: List[MatchState], etag: str, encoder: DataEncoder) -> bytes:
+    """Get the response body for a list of matches, cached per revision vector"""
+    if encoder.full_json:
+        return get_all_matches_payload(states, etag)[1]
+    
+    cached = all_matches_data_cache.get(encoder.key)
+    if cached is None or cached[0] != etag:
+        rows = [get_cached_data_row(state, encoder) for state in states]
+        cached = (etag, encoder.encode_document(rows))
+        all_matches_data_cache[encoder.key] = cached
+    return cached[1]
 
 # ============================================================================
-# JSON Data Endpoints for vMix Title
+# Data Endpoints for vMix Title (JSON, XML, CSV)
 # ============================================================================
 
+async def match_data_response(match_id: str, request: Request, data_format: str, fields: Optional[str],
+                              since_rev: Optional[int], timeout: float) -> Response:
+    """Build the data response of one match (see get_match_data_json)"""
+    encoder = get_data_encoder(data_format, fields)
+    await ensure_match(match_id)
+    if since_rev is not None:
+        timeout = min(max(timeout, 0.0), LONG_POLL_MAX_TIMEOUT)
+        state = await wait_for_revision(match_id, since_rev, timeout)
+        if state is None:
+            metric_data_requests.inc("match", data_format, "304")
+            return not_modified_response(make_match_etag(get_or_create_match(match_id)))
+    else:
+        state = get_or_create_match(match_id)
+    etag = make_match_etag(state)
+    if etag_matches(request, etag):
+        metric_data_requests.inc("match", data_format, "304")
+        return not_modified_response(etag)
+    
+    metric_data_requests.inc("match", data_format, "200")
+    return Response(
+        content=get_match_data_document(state, encoder),
+        media_type=DATA_MEDIA_TYPES[data_format],
+        headers={**DATA_CACHE_HEADERS, "ETag": etag}
+    )
+
+def all_matches_data_response(request: Request, data_format: str, fields: Optional[str]) -> Response:
+    """Build the data response of all matches (see get_all_matches_data_json)"""
+    encoder = get_data_encoder(data_format, fields)
+    states = list(matches.values())
+    etag = make_matches_etag(states)
+    if etag_matches(request, etag):
+        metric_data_requests.inc("all", data_format, "304")
+        return not_modified_response(etag)
+    
+    metric_data_requests.inc("all", data_format, "200")
+    return Response(
+        content=get_all_matches_data_document(states, etag, encoder),
+        media_type=DATA_MEDIA_TYPES[data_format],
+        headers={**DATA_CACHE_HEADERS, "ETag": etag}
+    )
+
 @app.get("/api/match/{match_id}/data.json")
-async def get_match_data_json(match_id: str):
+async def get_match_data_json(match_id: str, request: Request, since_rev: Optional[int] = None,
+                              timeout: float = LONG_POLL_DEFAULT_TIMEOUT, fields: Optional[str] = None):
     """Get match data in JSON format for vMix Title (returns array of objects)
     
     This endpoint always returns current data from server state.
     No WebSocket connection required - vMix can poll this endpoint periodically.
-    """
-    state = get_or_create_match(match_id)
-    data = get_match_data_dict(state)
+    Supports If-None-Match: returns 304 without a body while rev is unchanged.
     
-    # vMix requires JSON as an array of objects
-    data_array = [data]
+    Long-poll: with ?since_rev=N the response is held until rev differs from N
+    (at most `timeout` seconds, then 304).
     
-    return Response(
-        content=json.dumps(data_array, ensure_ascii=False),
-        media_type="application/json",
-        headers={
-            "Cache-Control": "no-cache, no-store, must-revalidate",
-            "Pragma": "no-cache",
-            "Expires": "0"
-        }
-    )
+    ?fields=balls_home,balls_away limits the output to the listed fields.
+    """
+    return await match_data_response(match_id, request, DATA_FORMAT_JSON, fields, since_rev, timeout)
+
+@app.get("/api/match/{match_id}/data.xml")
+async def get_match_data_xml(match_id: str, request: Request, since_rev: Optional[int] = None,
+                             timeout: float = LONG_POLL_DEFAULT_TIMEOUT, fields: Optional[str] = None):
+    """Get match data as XML for a vMix XML data source (same options as data.json)"""
+    return await match_data_response(match_id, request, DATA_FORMAT_XML, fields, since_rev, timeout)
+
+@app.get("/api/match/{match_id}/data.csv")
+async def get_match_data_csv(match_id: str, request: Request, since_rev: Optional[int] = None,
+                             timeout: float = LONG_POLL_DEFAULT_TIMEOUT, fields: Optional[str] = None):
+    """Get match data as CSV with a header row (same options as data.json)"""
+    return await match_data_response(match_id, request, DATA_FORMAT_CSV, fields, since_rev, timeout)
 
 @app.get("/api/matches/data.json")
-async def get_all_matches_data_json():
+async def get_all_matches_data_json(request: Request, fields: Optional[str] = None):
     """Get all matches data in JSON format (returns array of objects)
     
     This endpoint always returns current data from server state.
     No WebSocket connection required - vMix can poll this endpoint periodically.
+    The ETag is derived from the revisions of all matches.
     """
-    # vMix requires JSON as an array of objects
-    matches_array = []
-    for match_id, state in matches.items():
-        matches_array.append(get_match_data_dict(state))
+    return all_matches_data_response(request, DATA_FORMAT_JSON, fields)
+
+@app.get("/api/matches/data.xml")
+async def get_all_matches_data_xml(request: Request, fields: Optional[str] = None):
+    """Get all matches data as XML (one <match> element per match)"""
+    return all_matches_data_response(request, DATA_FORMAT_XML, fields)
+
+@app.get("/api/matches/data.csv")
+async def get_all_matches_data_csv(request: Request, fields: Optional[str] = None):
+    """Get all matches data as CSV (one row per match)"""
+    return all_matches_data_response(request, DATA_FORMAT_CSV, fields)
+
+@app.get("/api/matches/changes")
+async def get_matches_changes(since: int = 0, ids: Optional[str] = None, active: bool = False,
+                              fields: Optional[str] = None):
+    """Get the matches changed after a sequence number (incremental all-matches feed)
     
-    return Response(
-        content=json.dumps(matches_array, ensure_ascii=False),
-        media_type="application/json",
-        headers={
-            "Cache-Control": "no-cache, no-store, must-revalidate",
-            "Pragma": "no-cache",
-            "Expires": "0"
-        }
+    Returns {"seq": cursor for the next call, "full": bool, "matches": [data.json
+    rows in change order], "removed": [match ids]}. Only the changed entries
+    are visited. With since=0, or a cursor from the future, every match is
+    listed and "full" is true. ?ids=1,2 limits the feed to those matches,
+    ?active=true to matches with a running timer or changed in the last
+    MATCH_ACTIVE_SECONDS, ?fields= works as on data.json.
+    """
+    encoder = get_data_encoder(DATA_FORMAT_JSON, fields)
+    full = since <= 0 or since > change_seq
+    if full:
+        since = 0
+    selected = {match_id.strip() for match_id in ids.split(",")} if ids else None
+    active_after = time.time() - MATCH_ACTIVE_SECONDS
+    
+    changed = []
+    removed = []
+    for match_id, (seq, changed_at, is_removed) in reversed(match_changes.items()):
+        if seq <= since:
+            break
+        if selected is not None and match_id not in selected:
+            continue
+        if is_removed:
+            if not full:
+                removed.append(match_id)
+            continue
+        state = matches.get(match_id)
+        if state is None:
+            continue
+        if active and changed_at < active_after and not state.timerRunning:
+            continue
+        changed.append(state)
+    changed.reverse()
+    removed.reverse()
+    
+    rows = b",".join(get_cached_data_row(state, encoder) for state in changed)
+    content = (
+        f'{{"seq":{change_seq},"full":{"true" if full else "false"},"matches":['.encode('utf-8')
+        + rows + b'],"removed":' + json.dumps(removed, ensure_ascii=False).encode('utf-8') + b"}"
     )
+    return Response(content=content, media_type="application/json", headers=DATA_CACHE_HEADERS)
 
 # ============================================================================
 # WebSocket Endpoint
 # ============================================================================
 
+async def run_ws_command(match_id: str, message: Dict) -> str:
+    """Run a {"type": "command"} message from a WebSocket client and encode its ack
+    
+    The message carries one command ("op" and "args") or a batch ("commands"),
+    validated like the REST request bodies. The ack echoes the client's "id"
+    and carries the resulting "rev", or "status" and "detail" on failure.
+    It is queued after the command's own event, so the client has already
+    seen the new state when the ack arrives.
+    """
+    reply = {"type": "ack", "id": message.get("id")}
+    try:
+        if "commands" in message:
+            commands = CommandBatchRequest.model_validate({"commands": message["commands"]}).commands
+        else:
+            commands = [MatchCommand.model_validate({key: message[key] for key in ("op", "args") if key in message})]
+        parsed = parse_match_commands(commands)
+        if state_bus.owns_state:
+            rev = (await run_match_commands(match_id, parsed)).rev
+        else:
+            rev = await state_bus.run_commands(match_id, commands)
+    except ValidationError as e:
+        reply.update(ok=False, status=422, detail=e.errors(include_url=False, include_context=False))
+    except HTTPException as e:
+        reply.update(ok=False, status=e.status_code, detail=e.detail)
+    else:
+        reply.update(ok=True, rev=rev)
+    return json.dumps(reply)
+
 @app.websocket("/ws/match/{match_id}")
 async def websocket_endpoint(websocket: WebSocket, match_id: str):
-    """WebSocket endpoint for real-time match state updates"""
-    await websocket.accept()
+    """WebSocket endpoint for real-time match state updates
     
-    # Add to connections
-    connections[match_id].add(websocket)
+    With ?timer=deadline the client counts running timers down locally from the
+    `timer` field of events and gets a timer tick only every TIMER_RESYNC_SECONDS.
     
-    # Send initial state
-    state = get_or_create_match(match_id)
-    initial_event = WebSocketEvent(
-        type="state",
-        state=state,
-        ts=int(time.time() * 1000)
-    )
-    await websocket.send_text(initial_event.model_dump_json())
+    With ?protocol=2 events are WebSocketPatchEvent frames with only the changed
+    fields. The client gets a full "state" frame on connect and whenever it
+    sends {"type": "resync"} (e.g. after noticing a gap in base_rev).
+    
+    Clients may also send match commands ({"type": "command", ...}, see
+    run_ws_command) instead of REST requests; each one gets an "ack" frame.
+    """
+    try:
+        await ensure_match(match_id)
+    except HTTPException:
+        await websocket.close(code=1011)
+        return
+    await websocket.accept()
+    deadline_timer = websocket.query_params.get("timer") == "deadline"
+    delta = websocket.query_params.get("protocol") == WS_PROTOCOL_DELTA
+    
+    # Add to connections and queue initial state ahead of any broadcast
+    get_or_create_match(match_id)
+    outbox = add_connection(match_id, websocket, skip_ticks=deadline_timer, delta=delta)
+    outbox.put(None, FRAME_SNAPSHOT)
+    if match_id in gfx_settings:
+        # Current settings and version, so later patches apply
+        outbox.put(None, FRAME_SETTINGS)
     
     try:
         # Keep connection alive and handle incoming messages
         while True:
             data = await websocket.receive_text()
-            # Optionally handle client messages here (ping/pong, etc.)
-            # For now, just keep connection alive
+            try:
+                message = json.loads(data)
+            except ValueError:
+                continue
+            if isinstance(message, dict) and message.get("type") == "resync":
+                outbox.put(None, FRAME_SNAPSHOT)
+            elif isinstance(message, dict) and message.get("type") == "resyncSettings":
+                outbox.put(None, FRAME_SETTINGS)
+            elif isinstance(message, dict) and message.get("type") == "command":
+                outbox.put(await run_ws_command(match_id, message), FRAME_REPLY)
     except WebSocketDisconnect:
         pass
     except Exception:
         pass
     finally:
         # Remove from connections
-        connections[match_id].discard(websocket)
-        if not connections[match_id]:
-            del connections[match_id]
+        remove_connection(match_id, websocket)
+
+# ============================================================================
+# Server-Sent Events
+# ============================================================================
+#
+# /sse/match/{match_id} sends the same events as the WebSocket (full-state
+# protocol) with `id: rev`; /sse/matches sends the events of all matches with a
+# server-wide sequence number as id. Each frame is encoded once and shared by
+# every stream. A reconnect with Last-Event-ID replays the missed frames from a
+# short history, or starts with a fresh snapshot if they are no longer kept.
+
+def encode_sse_frame(event_id: int, message: str) -> bytes:
+    """Encode one SSE frame (the message is single-line JSON)"""
+    return f"id: {event_id}\ndata: {message}\n\n".encode('utf-8')
+
+def encode_match_snapshot_frame(state: MatchState, event_id: Optional[int] = None) -> bytes:
+    """Encode the current "state" event of a match as an SSE frame"""
+    return encode_sse_frame(state.rev if event_id is None else event_id,
+                            get_cached_payload(state, PAYLOAD_WS_STATE))
+
+class SSEStream:
+    """Bounded outbound buffer of one SSE client
+    
+    A client that falls SSE_QUEUE_LIMIT frames behind loses its queued frames
+    and gets a snapshot instead, so a stalled reader cannot grow server memory.
+    """
+    
+    def __init__(self):
+        self.frames: deque = deque()
+        self.snapshot = False
+        self.wakeup = asyncio.Event()
+    
+    def put(self, frame: bytes):
+        if self.snapshot:
+            return
+        if len(self.frames) >= SSE_QUEUE_LIMIT:
+            metric_sse_overflows.inc()
+            self.frames.clear()
+            self.snapshot = True
+        else:
+            self.frames.append(frame)
+        self.wakeup.set()
+    
+    def resync(self):
+        """Replace the queued frames with a snapshot"""
+        self.frames.clear()
+        self.snapshot = True
+        self.wakeup.set()
+
+def publish_sse(match_id: str, rev: int, message: str):
+    """Queue a match event for its SSE streams and the all-matches streams"""
+    global sse_all_seq
+    
+    streams = sse_streams.get(match_id)
+    history = sse_history.get(match_id)
+    if streams or history is not None:
+        frame = encode_sse_frame(rev, message)
+        if history is not None:
+            history.append((rev, frame))
+        for stream in streams or ():
+            stream.put(frame)
+    
+    if sse_all_history is not None:
+        sse_all_seq += 1
+        frame = encode_sse_frame(sse_all_seq, message)
+        sse_all_history.append((sse_all_seq, frame))
+        for stream in sse_all_streams:
+            stream.put(frame)
+
+def get_replay_frames(history: deque, last_id: int, current_id: int) -> Optional[List[bytes]]:
+    """Get the frames after last_id from a history, or None if some are missing"""
+    if last_id == current_id:
+        return []
+    if last_id > current_id:
+        return None
+    
+    missed = [(event_id, frame) for event_id, frame in history if event_id > last_id]
+    # Usable only if the history still reaches back to the first missed frame
+    if not missed or missed[0][0] != last_id + 1:
+        return None
+    return [frame for _, frame in missed]
+
+def parse_last_event_id(request: Request) -> Optional[int]:
+    """Read the Last-Event-ID header of an SSE reconnect"""
+    try:
+        return int(request.headers["last-event-id"])
+    except (KeyError, ValueError):
+        return None
+
+async def stream_sse(stream: SSEStream, initial: List[bytes], snapshot):
+    """Write the frames of one SSE client, with keep-alive comments while idle"""
+    yield b"retry: 1000\n\n"
+    for frame in initial:
+        yield frame
+    
+    while True:
+        if not stream.frames and not stream.snapshot:
+            stream.wakeup.clear()
+            try:
+                await asyncio.wait_for(stream.wakeup.wait(), SSE_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield b": keep-alive\n\n"
+                continue
+        
+        if stream.snapshot:
+            stream.snapshot = False
+            for frame in snapshot():
+                yield frame
+        while stream.frames:
+            yield stream.frames.popleft()
+
+def sse_response(generator) -> StreamingResponse:
+    """Build the streaming response of an SSE endpoint"""
+    return StreamingResponse(
+        generator,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/sse/match/{match_id}")
+async def sse_match(match_id: str, request: Request):
+    """Server-Sent Events stream of one match (`id` is the match rev)"""
+    last_id = parse_last_event_id(request)
+    await ensure_match(match_id)
+    
+    def snapshot():
+        return [encode_match_snapshot_frame(get_or_create_match(match_id))]
+    
+    async def generate():
+        # Register and pick the first frames in one step, so no event falls between
+        state = get_or_create_match(match_id)
+        if match_id not in sse_history:
+            sse_history[match_id] = deque(maxlen=SSE_HISTORY_LIMIT)
+        stream = SSEStream()
+        sse_streams[match_id].add(stream)
+        
+        initial = None
+        if last_id is not None:
+            initial = get_replay_frames(sse_history[match_id], last_id, state.rev)
+        if initial is None:
+            initial = snapshot()
+        try:
+            async for chunk in stream_sse(stream, initial, snapshot):
+                yield chunk
+        finally:
+            streams = sse_streams.get(match_id)
+            if streams is not None:
+                streams.discard(stream)
+                if not streams:
+                    del sse_streams[match_id]
+    
+    return sse_response(generate())
+
+@app.get("/sse/matches")
+async def sse_all_matches(request: Request):
+    """Server-Sent Events stream of all matches (`id` is a server-wide sequence number)"""
+    last_id = parse_last_event_id(request)
+    
+    def snapshot():
+        return [encode_match_snapshot_frame(state, sse_all_seq) for state in list(matches.values())]
+    
+    async def generate():
+        global sse_all_history
+        
+        # Register and pick the first frames in one step, so no event falls between
+        if sse_all_history is None:
+            sse_all_history = deque(maxlen=SSE_HISTORY_LIMIT)
+        stream = SSEStream()
+        sse_all_streams.add(stream)
+        
+        initial = None
+        if last_id is not None:
+            initial = get_replay_frames(sse_all_history, last_id, sse_all_seq)
+        if initial is None:
+            initial = snapshot()
+        try:
+            async for chunk in stream_sse(stream, initial, snapshot):
+                yield chunk
+        finally:
+            sse_all_streams.discard(stream)
+    
+    return sse_response(generate())
 
 # ============================================================================
 # Root endpoint
@@ -848,80 +3750,395 @@ async def websocket_endpoint(websocket: WebSocket, match_id: str):
 # GFX Settings API
 # ============================================================================
 
+def merge_patch(target, patch):
+    """Apply an RFC 7386 JSON merge patch (returns a new value)"""
+    if not isinstance(patch, dict):
+        return patch
+    
+    result = dict(target) if isinstance(target, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = merge_patch(result.get(key), value)
+    return result
+
+def make_merge_patch(old, new) -> dict:
+    """Build the RFC 7386 merge patch that turns one settings dict into another"""
+    patch = {}
+    for key in old:
+        if key not in new:
+            patch[key] = None
+    for key, value in new.items():
+        if key not in old:
+            patch[key] = value
+        elif isinstance(value, dict) and isinstance(old[key], dict):
+            nested = make_merge_patch(old[key], value)
+            if nested:
+                patch[key] = nested
+        elif old[key] != value:
+            patch[key] = value
+    return patch
+
+def has_null_values(settings) -> bool:
+    """Whether a settings dict holds a null value at any depth
+    
+    A merge patch cannot carry such a value (null means delete).
+    """
+    return isinstance(settings, dict) and any(
+        value is None or has_null_values(value) for value in settings.values()
+    )
+
+def get_gfx_settings_message(match_id: str) -> str:
+    """Encode the full gfxSettings WebSocket frame for a match"""
+    return json.dumps({
+        "type": "gfxSettings",
+        "settings": gfx_settings.get(match_id, {}),
+        "version": gfx_settings_versions.get(match_id, 0)
+    })
+
+def make_gfx_settings_etag(match_id: str) -> str:
+    """Build a strong ETag for the GFX settings of a match from their version"""
+    return f'"{SERVER_INSTANCE_ID}-gfx-{match_id}-{gfx_settings_versions.get(match_id, 0)}"'
+
+def update_gfx_settings(match_id: str, settings: dict, patch: dict) -> int:
+    """Store new GFX settings, bump the version and broadcast the patch"""
+    if not patch:
+        return gfx_settings_versions.get(match_id, 0)
+    
+    version = gfx_settings_versions.get(match_id, 0) + 1
+    append_journal({"g": match_id, "v": version, "s": settings})
+    state_bus.publish_gfx_settings(match_id, settings, patch, version)
+    apply_gfx_settings(match_id, settings, patch, version)
+    return version
+
+def apply_gfx_settings(match_id: str, settings: dict, patch: dict, version: int):
+    """Store a GFX settings version and send its patch to connected clients"""
+    gfx_settings[match_id] = settings
+    gfx_settings_versions[match_id] = version
+    
+    # Broadcast settings update to connected overlays via WebSocket
+    if match_id in connections and has_null_values(settings):
+        # Settings POSTed with null values: the patch would delete them, so send them in full
+        broadcast_message(match_id, None, FRAME_SETTINGS)
+    elif match_id in connections:
+        message = json.dumps({
+            "type": "gfxSettingsPatch",
+            "patch": patch,
+            "base_version": version - 1,
+            "version": version
+        })
+        broadcast_message(match_id, message, FRAME_SETTINGS_PATCH)
+
 @app.get("/api/match/{match_id}/gfx-settings")
-async def get_gfx_settings(match_id: str):
-    """Get GFX settings for a match"""
-    if match_id in gfx_settings:
-        return gfx_settings[match_id]
-    return {}
+async def get_gfx_settings(match_id: str, request: Request):
+    """Get GFX settings for a match
+    
+    Supports If-None-Match against the settings version.
+    """
+    etag = make_gfx_settings_etag(match_id)
+    headers = {
+        "Cache-Control": "no-cache",
+        "ETag": etag,
+        "X-GFX-Settings-Version": str(gfx_settings_versions.get(match_id, 0))
+    }
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    
+    return Response(
+        content=json.dumps(gfx_settings.get(match_id, {}), ensure_ascii=False),
+        media_type="application/json",
+        headers=headers
+    )
 
 @app.post("/api/match/{match_id}/gfx-settings")
 async def set_gfx_settings(match_id: str, settings: dict):
-    """Save GFX settings for a match (primary storage for vMix)"""
-    gfx_settings[match_id] = settings
-    # Broadcast settings update to connected overlays via WebSocket
-    if match_id in connections:
-        message = json.dumps({"type": "gfxSettings", "settings": settings})
-        disconnected = []
-        for ws in connections[match_id]:
-            try:
-                await ws.send_text(message)
-            except:
-                disconnected.append(ws)
-        # Clean up disconnected clients
-        for ws in disconnected:
-            connections[match_id].discard(ws)
-    return {"status": "ok"}
+    """Save GFX settings for a match (primary storage for vMix)
+    
+    Replaces the settings; connected overlays receive only the difference.
+    """
+    patch = make_merge_patch(gfx_settings.get(match_id, {}), settings)
+    version = update_gfx_settings(match_id, settings, patch)
+    return {"status": "ok", "version": version}
+
+@app.patch("/api/match/{match_id}/gfx-settings")
+async def patch_gfx_settings(match_id: str, patch: dict):
+    """Update GFX settings for a match with an RFC 7386 JSON merge patch"""
+    settings = merge_patch(gfx_settings.get(match_id, {}), patch)
+    version = update_gfx_settings(match_id, settings, make_merge_patch(gfx_settings.get(match_id, {}), settings))
+    return {"status": "ok", "version": version}
 
 @app.post("/api/match/{match_id}/background-upload")
 async def upload_background(match_id: str, file: UploadFile = File(...)):
-    """Upload a background image for a match (converts to base64)"""
-    # Read file content
-    contents = await file.read()
+    """Upload a background image for a match (stored in the asset store)
+    
+    Only the image types in ASSET_IMAGE_TYPES are accepted (415 otherwise).
+    """
+    mime_type = (file.content_type or "image/png").split(";")[0].strip().lower()
+    if mime_type not in ASSET_IMAGE_TYPES:
+        raise HTTPException(status_code=415, detail=f"Unsupported image type: {mime_type}")
     
-    # Convert to base64
-    base64_content = base64.b64encode(contents).decode('utf-8')
+    # Stream the upload to disk in a thread (the event loop never blocks on it)
+    asset_name = await asyncio.to_thread(store_asset, file.file, mime_type)
+    asset_url = f"/assets/{asset_name}"
     
-    # Get file extension/mime type
-    mime_type = file.content_type or "image/png"
+    # Store the uploaded background image
+    patch = {
+        'backgrounds': {
+            'container': {
+                'type': 'image',
+                'imageUrl': asset_url,
+                'imageSize': 'cover',
+                'imageOpacity': 100,
+                'imagePositionX': 50,  # Percentage 0-100
+                'imagePositionY': 50  # Percentage 0-100
+            }
+        }
+    }
+    settings = merge_patch(gfx_settings.get(match_id, {}), patch)
+    update_gfx_settings(match_id, settings, make_merge_patch(gfx_settings.get(match_id, {}), settings))
     
-    # Create data URL
-    data_url = f"data:{mime_type};base64,{base64_content}"
+    return {
+        "status": "ok",
+        "message": "Background uploaded successfully",
+        "settings": gfx_settings[match_id]
+    }
+
+# ============================================================================
+# Asset Store
+# ============================================================================
+
+# Accepted upload types and the extension they are stored with. Assets are
+# served from the app's own origin, so types a browser may run as a page
+# (HTML, SVG, ...) are never stored.
+ASSET_IMAGE_TYPES = {
+    "image/png": ".png",
+    "image/jpeg": ".jpg",
+    "image/gif": ".gif",
+    "image/webp": ".webp",
+    "image/avif": ".avif",
+    "image/bmp": ".bmp"
+}
+
+# Asset file names: sha256 of the content plus one of the image extensions
+ASSET_NAME_PATTERN = re.compile(r"^[0-9a-f]{64}(\.(png|jpg|gif|webp|avif|bmp))?$")
+
+# Chunk size for streaming uploads to disk
+ASSET_CHUNK_SIZE = 64 * 1024
+
+def store_asset(source, mime_type: str) -> str:
+    """Stream a file object into the asset store and return the asset name
     
-    # Get or create GFX settings for this match
-    if match_id not in gfx_settings:
-        gfx_settings[match_id] = {}
+    The content is hashed while it is copied to a temporary file, which is then
+    renamed to its hash. Identical uploads end up as the same asset.
+    Blocking: run it in a thread.
+    """
+    assets_dir = get_assets_directory()
+    assets_dir.mkdir(parents=True, exist_ok=True)
     
-    if 'backgrounds' not in gfx_settings[match_id]:
-        gfx_settings[match_id]['backgrounds'] = {}
+    extension = ASSET_IMAGE_TYPES.get(mime_type, "")
     
-    if 'container' not in gfx_settings[match_id]['backgrounds']:
-        gfx_settings[match_id]['backgrounds']['container'] = {}
+    digest = hashlib.sha256()
+    fd, temp_name = tempfile.mkstemp(dir=assets_dir, suffix=".tmp")
+    temp_path = Path(temp_name)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            while True:
+                chunk = source.read(ASSET_CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                f.write(chunk)
+        
+        asset_name = digest.hexdigest() + extension
+        asset_path = assets_dir / asset_name
+        if asset_path.exists():
+            temp_path.unlink()
+        else:
+            temp_path.replace(asset_path)
+    except Exception:
+        temp_path.unlink(missing_ok=True)
+        raise
     
-    # Store the uploaded background image
-    gfx_settings[match_id]['backgrounds']['container']['type'] = 'image'
-    gfx_settings[match_id]['backgrounds']['container']['imageUrl'] = data_url
-    gfx_settings[match_id]['backgrounds']['container']['imageSize'] = 'cover'
-    gfx_settings[match_id]['backgrounds']['container']['imageOpacity'] = 100
-    gfx_settings[match_id]['backgrounds']['container']['imagePositionX'] = 50  # Percentage 0-100
-    gfx_settings[match_id]['backgrounds']['container']['imagePositionY'] = 50  # Percentage 0-100
+    return asset_name
+
+@app.get("/assets/{asset_name}")
+async def get_asset(asset_name: str):
+    """Serve an uploaded asset (content never changes for a name)"""
+    if not ASSET_NAME_PATTERN.match(asset_name):
+        raise HTTPException(status_code=404, detail="Asset not found")
     
-    # Broadcast settings update to connected overlays via WebSocket
-    if match_id in connections:
-        message = json.dumps({"type": "gfxSettings", "settings": gfx_settings[match_id]})
-        disconnected = []
-        for ws in connections[match_id]:
-            try:
-                await ws.send_text(message)
-            except:
-                disconnected.append(ws)
-        for ws in disconnected:
-            connections[match_id].discard(ws)
+    asset_path = get_assets_directory() / asset_name
+    if not asset_path.is_file():
+        raise HTTPException(status_code=404, detail="Asset not found")
+    
+    return FileResponse(
+        asset_path,
+        headers={
+            "Cache-Control": "public, max-age=31536000, immutable",
+            "ETag": f'"{asset_name}"',
+            "X-Content-Type-Options": "nosniff"
+        }
+    )
+
+# ============================================================================
+# Player Index
+# ============================================================================
+#
+# Tournament.players keeps the stored order; all lookups, searches and listings
+# go through the PlayerIndex of the tournament. Players are added and removed
+# with add_tournament_player() / remove_tournament_player() so both stay in sync.
+
+# Highest page size for player listings
+PLAYER_PAGE_LIMIT_MAX = 1000
+
+# Bulk player import/export formats and the content types that select them
+PLAYER_BULK_CSV = "csv"
+PLAYER_BULK_NDJSON = "ndjson"
+PLAYER_BULK_CONTENT_TYPES = {
+    "text/csv": PLAYER_BULK_CSV,
+    "application/csv": PLAYER_BULK_CSV,
+    "application/x-ndjson": PLAYER_BULK_NDJSON,
+    "application/ndjson": PLAYER_BULK_NDJSON,
+    "application/jsonl": PLAYER_BULK_NDJSON,
+}
+
+# Rejected rows reported back by a bulk import, and players per export chunk
+PLAYER_BULK_MAX_ERRORS = 100
+PLAYER_EXPORT_CHUNK = 500
+
+# Removals after which the player slots of an index are renumbered
+PLAYER_INDEX_RENUMBER = 1024
+
+class PlayerIndex:
+    """Lookup structures for the players of one tournament
+    
+    by_name and by_recent are sorted key lists: (casefolded name, id) for
+    prefix search and (-created_at, id) for the newest-first listing. Keys are
+    also the positions cursors point at.
+    
+    slots gives each player its position in `players` as of the last
+    renumbering (later additions continue the count). Subtracting the removed
+    slots before it gives the current position, so a removal finds the player
+    without scanning `players`.
+    """
+    
+    def __init__(self, players: List[Player]):
+        self.players = players
+        self.by_id: Dict[str, Player] = {p.id: p for p in players}
+        self.dumps: Dict[str, dict] = {p.id: p.model_dump() for p in players}
+        self.by_name = sorted(self.name_key(p) for p in players)
+        self.by_recent = sorted(self.recent_key(p) for p in players)
+        self.renumber()
+    
+    def renumber(self):
+        self.slots: Dict[str, int] = {p.id: i for i, p in enumerate(self.players)}
+        self.removed_slots: List[int] = []
+        self.next_slot = len(self.players)
+    
+    @staticmethod
+    def name_key(player: Player) -> tuple:
+        return (player.name.casefold(), player.id)
+    
+    @staticmethod
+    def recent_key(player: Player) -> tuple:
+        return (-player.created_at, player.id)
+    
+    def add(self, player: Player):
+        """Index a player just appended to `players`"""
+        self.slots[player.id] = self.next_slot
+        self.next_slot += 1
+        self.by_id[player.id] = player
+        self.dumps[player.id] = player.model_dump()
+        bisect.insort(self.by_name, self.name_key(player))
+        bisect.insort(self.by_recent, self.recent_key(player))
+    
+    def remove(self, player: Player):
+        """Unindex a player and delete it from `players`, keeping the order"""
+        del self.by_id[player.id]
+        del self.dumps[player.id]
+        for keys, key in ((self.by_name, self.name_key(player)), (self.by_recent, self.recent_key(player))):
+            i = bisect.bisect_left(keys, key)
+            if i < len(keys) and keys[i] == key:
+                del keys[i]
+        
+        slot = self.slots.pop(player.id)
+        del self.players[slot - bisect.bisect_left(self.removed_slots, slot)]
+        bisect.insort(self.removed_slots, slot)
+        if len(self.removed_slots) >= PLAYER_INDEX_RENUMBER:
+            self.renumber()
+
+def get_player_index(tournament: Tournament) -> PlayerIndex:
+    """Get the player index of a tournament, building it on first use"""
+    index = player_indexes.get(tournament.id)
+    if index is None or index.players is not tournament.players:
+        index = PlayerIndex(tournament.players)
+        player_indexes[tournament.id] = index
+    return index
+
+def add_tournament_player(tournament: Tournament, player: Player):
+    """Add a player to a tournament and its index"""
+    index = get_player_index(tournament)
+    tournament.players.append(player)
+    index.add(player)
+
+def remove_tournament_player(tournament: Tournament, player_id: str) -> Optional[Player]:
+    """Remove a player from a tournament and its index (None if not found)"""
+    index = get_player_index(tournament)
+    player = index.by_id.get(player_id)
+    if player is None:
+        return None
+    
+    index.remove(player)
+    return player
+
+def encode_player_cursor(key: tuple) -> str:
+    """Encode an index key as an opaque pagination cursor"""
+    return base64.urlsafe_b64encode(json.dumps(key, ensure_ascii=False).encode('utf-8')).decode('ascii')
+
+def decode_player_cursor(cursor: str, key_types: tuple) -> tuple:
+    """Decode a pagination cursor, checking it belongs to the listing"""
+    try:
+        key = tuple(json.loads(base64.urlsafe_b64decode(cursor.encode('ascii'))))
+    except (ValueError, UnicodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if len(key) != len(key_types) or not all(isinstance(k, t) for k, t in zip(key, key_types)):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return key
+
+def list_tournament_players(tournament: Tournament, q: Optional[str], cursor: Optional[str],
+                            limit: Optional[int]) -> dict:
+    """List players newest first, or by name for a ?q= prefix search (case-insensitive)
+    
+    Without `limit` all remaining players are returned. `next_cursor` continues
+    the listing, `total` counts all players in it.
+    """
+    if limit is not None and not 1 <= limit <= PLAYER_PAGE_LIMIT_MAX:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {PLAYER_PAGE_LIMIT_MAX}")
+    
+    index = get_player_index(tournament)
+    if q:
+        # All names with the prefix form one range of the sorted name keys
+        prefix = q.casefold()
+        keys = index.by_name
+        start = bisect.bisect_left(keys, (prefix,))
+        end = bisect.bisect_left(keys, (prefix + "\U0010ffff",))
+        key_types = (str, str)
+    else:
+        keys = index.by_recent
+        start, end = 0, len(keys)
+        key_types = ((int, float), str)
     
+    total = end - start
+    if cursor:
+        start = max(start, bisect.bisect_right(keys, decode_player_cursor(cursor, key_types)))
+    stop = end if limit is None else min(end, start + limit)
+    page = keys[start:stop]
     return {
         "status": "ok",
-        "message": "Background uploaded successfully",
-        "settings": gfx_settings[match_id]
+        "players": [index.dumps[key[1]] for key in page],
+        "total": total,
+        "next_cursor": encode_player_cursor(page[-1]) if page and stop < end else None
     }
 
 # ============================================================================
@@ -957,7 +4174,7 @@ async def create_tournament(request: TournamentCreate):
     tournaments_data.tournaments[tournament_id] = tournament
     # Automatically select newly created tournament
     tournaments_data.current_tournament_id = tournament_id
-    save_tournaments_data(tournaments_data)
+    mark_tournaments_dirty(tournament_change(tournament), meta_change())
     
     return {"status": "ok", "tournament": {
         "id": tournament.id,
@@ -988,7 +4205,7 @@ async def update_tournament(tournament_id: str, request: TournamentUpdate):
         raise HTTPException(status_code=404, detail="Tournament not found")
     
     tournaments_data.tournaments[tournament_id].name = request.name
-    save_tournaments_data(tournaments_data)
+    mark_tournaments_dirty(tournament_change(tournaments_data.tournaments[tournament_id]))
     
     return {"status": "ok", "tournament": {
         "id": tournaments_data.tournaments[tournament_id].id,
@@ -1008,6 +4225,7 @@ async def delete_tournament(tournament_id: str):
         raise HTTPException(status_code=400, detail="Cannot delete the only tournament")
     
     del tournaments_data.tournaments[tournament_id]
+    player_indexes.pop(tournament_id, None)
     
     # If deleted tournament was current, select first available
     if tournaments_data.current_tournament_id == tournament_id:
@@ -1016,7 +4234,7 @@ async def delete_tournament(tournament_id: str):
         else:
             tournaments_data.current_tournament_id = None
     
-    save_tournaments_data(tournaments_data)
+    mark_tournaments_dirty(("delete_tournament", tournament_id), meta_change())
     return {"status": "ok", "message": "Tournament deleted"}
 
 @app.get("/api/tournaments/current")
@@ -1053,7 +4271,7 @@ async def save_current_tournament_text_areas(text_areas: Dict[str, Dict[str, flo
     
     # Update tournament text_areas
     tournament.text_areas = text_areas
-    save_tournaments_data(tournaments_data)
+    mark_tournaments_dirty(tournament_change(tournament))
     
     return {"status": "ok", "message": "Text areas saved to tournament", "text_areas": text_areas}
 
@@ -1064,20 +4282,18 @@ async def select_tournament(tournament_id: str):
         raise HTTPException(status_code=404, detail="Tournament not found")
     
     tournaments_data.current_tournament_id = tournament_id
-    save_tournaments_data(tournaments_data)
+    mark_tournaments_dirty(meta_change())
     
     return {"status": "ok", "message": "Tournament selected", "tournament_id": tournament_id}
 
 @app.get("/api/tournaments/{tournament_id}/players")
-async def get_tournament_players(tournament_id: str):
-    """Get players in a tournament"""
+async def get_tournament_players(tournament_id: str, q: Optional[str] = None, cursor: Optional[str] = None,
+                                 limit: Optional[int] = None):
+    """Get players in a tournament (see list_tournament_players for q/cursor/limit)"""
     if tournament_id not in tournaments_data.tournaments:
         raise HTTPException(status_code=404, detail="Tournament not found")
     
-    tournament = tournaments_data.tournaments[tournament_id]
-    player_list = [player.model_dump() for player in tournament.players]
-    player_list.sort(key=lambda x: x.get('created_at', 0), reverse=True)
-    return {"status": "ok", "players": player_list}
+    return list_tournament_players(tournaments_data.tournaments[tournament_id], q, cursor, limit)
 
 @app.post("/api/tournaments/{tournament_id}/players")
 async def add_player_to_tournament(tournament_id: str, request: PlayerCreate):
@@ -1094,8 +4310,8 @@ async def add_player_to_tournament(tournament_id: str, request: PlayerCreate):
         created_at=time.time()
     )
     
-    tournaments_data.tournaments[tournament_id].players.append(player)
-    save_tournaments_data(tournaments_data)
+    add_tournament_player(tournaments_data.tournaments[tournament_id], player)
+    mark_tournaments_dirty(player_change(tournament_id, player), meta_change())
     
     return {"status": "ok", "player": player.model_dump()}
 
@@ -1106,20 +4322,166 @@ async def delete_player_from_tournament(tournament_id: str, player_id: str):
         raise HTTPException(status_code=404, detail="Tournament not found")
     
     tournament = tournaments_data.tournaments[tournament_id]
-    player_index = None
-    for i, p in enumerate(tournament.players):
-        if p.id == player_id:
-            player_index = i
-            break
-    
-    if player_index is None:
+    if remove_tournament_player(tournament, player_id) is None:
         raise HTTPException(status_code=404, detail="Player not found in tournament")
     
-    tournament.players.pop(player_index)
-    save_tournaments_data(tournaments_data)
+    mark_tournaments_dirty(("delete_player", tournament.id, player_id))
     
     return {"status": "ok", "message": "Player deleted"}
 
+def get_player_bulk_format(request: Request, requested: Optional[str]) -> str:
+    """Pick the bulk format from ?format= or the Content-Type of an import"""
+    if requested is None:
+        content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+        requested = PLAYER_BULK_CONTENT_TYPES.get(content_type, content_type)
+    if requested not in (PLAYER_BULK_CSV, PLAYER_BULK_NDJSON):
+        raise HTTPException(status_code=415, detail="Use CSV (text/csv) or NDJSON (application/x-ndjson)")
+    return requested
+
+async def read_request_lines(request: Request):
+    """Yield the lines of a UTF-8 request body as it arrives (a BOM is skipped)"""
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    pending = ""
+    try:
+        async for chunk in request.stream():
+            pending += decoder.decode(chunk)
+            *lines, pending = pending.split("\n")
+            for line in lines:
+                yield line.rstrip("\r")
+        pending += decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Body is not valid UTF-8")
+    if pending.rstrip("\r"):
+        yield pending.rstrip("\r")
+
+async def parse_player_rows(request: Request, bulk_format: str):
+    """Yield (line number, name or None) for each non-empty row of an import
+    
+    CSV rows take the "name" column if the first row is a header with one,
+    otherwise the first column; ";" is accepted as delimiter. NDJSON rows are
+    objects with "name" or plain strings. Fields spanning lines are not supported.
+    """
+    name_column = 0
+    delimiter = None
+    line_number = 0
+    async for line in read_request_lines(request):
+        line_number += 1
+        if not line.strip():
+            continue
+        
+        if bulk_format == PLAYER_BULK_NDJSON:
+            try:
+                row = json.loads(line)
+            except ValueError:
+                yield line_number, None
+                continue
+            name = row.get("name") if isinstance(row, dict) else row
+            yield line_number, name if isinstance(name, str) else None
+            continue
+        
+        if delimiter is None:
+            delimiter = ";" if ";" in line and "," not in line else ","
+            header = [cell.strip().lower() for cell in next(csv.reader([line], delimiter=delimiter))]
+            if "name" in header:
+                name_column = header.index("name")
+                continue
+        cells = next(csv.reader([line], delimiter=delimiter), [])
+        yield line_number, cells[name_column] if name_column < len(cells) else None
+
+@app.post("/api/tournaments/{tournament_id}/players:bulk")
+async def import_tournament_players(tournament_id: str, request: Request, format: Optional[str] = None):
+    """Import players from a CSV or NDJSON body
+    
+    Names are validated like PlayerCreate and skipped if already present in the
+    tournament or earlier in the file (case-insensitive). All new players are
+    added and persisted in one step.
+    """
+    if tournament_id not in tournaments_data.tournaments:
+        raise HTTPException(status_code=404, detail="Tournament not found")
+    bulk_format = get_player_bulk_format(request, format)
+    
+    names = []
+    seen = set()
+    duplicates = 0
+    errors = []
+    async for line_number, name in parse_player_rows(request, bulk_format):
+        try:
+            name = PlayerCreate(name=name.strip()).name if isinstance(name, str) else None
+        except ValueError:
+            name = None
+        if name is None:
+            if len(errors) < PLAYER_BULK_MAX_ERRORS:
+                errors.append({"line": line_number, "error": "Invalid player name"})
+            continue
+        
+        key = name.casefold()
+        if key in seen:
+            duplicates += 1
+            continue
+        seen.add(key)
+        names.append(name)
+    
+    # The tournament may have changed (or gone) while the body was read
+    tournament = tournaments_data.tournaments.get(tournament_id)
+    if tournament is None:
+        raise HTTPException(status_code=404, detail="Tournament not found")
+    
+    index = get_player_index(tournament)
+    changes = []
+    for name in names:
+        key = name.casefold()
+        i = bisect.bisect_left(index.by_name, (key,))
+        if i < len(index.by_name) and index.by_name[i][0] == key:
+            duplicates += 1
+            continue
+        
+        tournaments_data.player_id_counter += 1
+        player = Player(
+            id=str(tournaments_data.player_id_counter),
+            name=name,
+            created_at=time.time()
+        )
+        add_tournament_player(tournament, player)
+        changes.append(player_change(tournament_id, player))
+    
+    if changes:
+        mark_tournaments_dirty(*changes, meta_change())
+    
+    return {"status": "ok", "imported": len(changes), "duplicates": duplicates, "errors": errors}
+
+@app.get("/api/tournaments/{tournament_id}/players:bulk")
+async def export_tournament_players(tournament_id: str, format: str = PLAYER_BULK_CSV):
+    """Export the players of a tournament as CSV (id,name,created_at) or NDJSON, streamed"""
+    if tournament_id not in tournaments_data.tournaments:
+        raise HTTPException(status_code=404, detail="Tournament not found")
+    if format not in (PLAYER_BULK_CSV, PLAYER_BULK_NDJSON):
+        raise HTTPException(status_code=400, detail="format must be csv or ndjson")
+    
+    # Copy of the list, so players added or removed meanwhile do not disturb the export
+    players = list(tournaments_data.tournaments[tournament_id].players)
+    
+    def generate():
+        for start in range(0, len(players), PLAYER_EXPORT_CHUNK):
+            chunk = players[start:start + PLAYER_EXPORT_CHUNK]
+            if format == PLAYER_BULK_NDJSON:
+                yield "".join(json.dumps(p.model_dump(), ensure_ascii=False) + "\n" for p in chunk)
+            else:
+                buffer = io.StringIO()
+                writer = csv.writer(buffer, lineterminator="\n")
+                if start == 0:
+                    writer.writerow(["id", "name", "created_at"])
+                writer.writerows([p.id, p.name, p.created_at] for p in chunk)
+                yield buffer.getvalue()
+        if not players and format == PLAYER_BULK_CSV:
+            yield "id,name,created_at\n"
+    
+    media_type = "text/csv" if format == PLAYER_BULK_CSV else "application/x-ndjson"
+    return StreamingResponse(
+        generate(),
+        media_type=f"{media_type}; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="{tournament_id}-players.{format}"'}
+    )
+
 # ============================================================================
 # Players Management API (Updated to work with tournaments)
 # ============================================================================
@@ -1138,41 +4500,19 @@ async def create_player(request: PlayerCreate):
         created_at=time.time()
     )
     
-    tournament.players.append(player)
-    save_tournaments_data(tournaments_data)
+    add_tournament_player(tournament, player)
+    mark_tournaments_dirty(player_change(tournament.id, player), meta_change())
     
     return {"status": "ok", "player": player.model_dump()}
 
 @app.get("/api/players")
-async def get_players():
-    """Get all players from the current tournament"""
-    try:
-        tournament = get_current_tournament()
-        if tournament is None:
-            return {"status": "ok", "players": []}
-        
-        # Ensure players is a list
-        if not isinstance(tournament.players, list):
-            return {"status": "ok", "players": []}
-        
-        # Convert players to dict format, handling both Player objects and dicts
-        player_list = []
-        for player in tournament.players:
-            try:
-                if hasattr(player, 'model_dump'):
-                    # It's a Pydantic model
-                    player_list.append(player.model_dump())
-                elif isinstance(player, dict):
-                    # It's already a dict
-                    player_list.append(player)
-            except Exception:
-                continue
-        
-        # Sort by creation time (newest first)
-        player_list.sort(key=lambda x: x.get('created_at', 0), reverse=True)
-        return {"status": "ok", "players": player_list}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+async def get_players(q: Optional[str] = None, cursor: Optional[str] = None, limit: Optional[int] = None):
+    """Get all players from the current tournament (see list_tournament_players for q/cursor/limit)"""
+    tournament = get_current_tournament()
+    if tournament is None:
+        return {"status": "ok", "players": [], "total": 0, "next_cursor": None}
+    
+    return list_tournament_players(tournament, q, cursor, limit)
 
 @app.delete("/api/players/{player_id}")
 async def delete_player(player_id: str):
@@ -1181,17 +4521,10 @@ async def delete_player(player_id: str):
     if tournament is None:
         raise HTTPException(status_code=404, detail="No current tournament")
     
-    player_index = None
-    for i, p in enumerate(tournament.players):
-        if p.id == player_id:
-            player_index = i
-            break
-    
-    if player_index is None:
+    if remove_tournament_player(tournament, player_id) is None:
         raise HTTPException(status_code=404, detail="Player not found")
     
-    tournament.players.pop(player_index)
-    save_tournaments_data(tournaments_data)
+    mark_tournaments_dirty(("delete_player", tournament.id, player_id))
     
     return {"status": "ok", "message": "Player deleted"}
 
@@ -1202,16 +4535,11 @@ async def assign_player_to_match(match_id: str, request: PlayerAssign):
     if tournament is None:
         raise HTTPException(status_code=404, detail="No current tournament")
     
-    player = None
-    for p in tournament.players:
-        if p.id == request.player_id:
-            player = p
-            break
-    
+    player = get_player_index(tournament).by_id.get(request.player_id)
     if player is None:
         raise HTTPException(status_code=404, detail="Player not found")
     
-    async with state_lock:
+    async with match_lock(match_id):
         state = get_or_create_match(match_id)
         
         if request.team == "home":
@@ -1253,5 +4581,22 @@ async def root(request: Request):
     }
 
 if __name__ == "__main__":
+    if "--migrate-sqlite" in sys.argv:
+        # One-shot: copy tournaments.json into data/tournaments.db, which is used from then on
+        player_count = migrate_tournaments_to_sqlite()
+        print(f"Migrated {player_count} players to {get_tournaments_db_path()}")
+        sys.exit(0)
+    
+    if "--vmix-files" in sys.argv:
+        # Enables the vMix file output (kept on for later runs)
+        get_vmix_files_directory().mkdir(parents=True, exist_ok=True)
+    
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    if "--bus-owner" in sys.argv:
+        # Owner process of --workers mode: serves the workers on a Unix socket
+        uvicorn.run(app, uds=os.environ[BUS_OWNER_SOCKET_ENV])
+    elif "--workers" in sys.argv:
+        # Several processes sharing the port; see State Bus
+        run_multiprocess(int(sys.argv[sys.argv.index("--workers") + 1]), host="0.0.0.0", port=8000)
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,149 @@
+"""
+Delta WebSocket protocol (?protocol=2): patches, gap detection and resync.
+
+The test client keeps its own copy of the match state like the overlay does:
+it starts from the full "state" frame, applies each patch whose base_rev is
+its rev, and sends {"type": "resync"} when it sees a gap.
+
+Run from the backend directory: python -m unittest discover tests
+"""
+
+import asyncio
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import main  # noqa: E402
+
+MATCH_ID = "delta"
+
+
+class DeltaClient:
+    """Match state as seen by a delta protocol client"""
+
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self.state = None
+        self.rev = None
+
+    def receive(self) -> dict:
+        frame = self.websocket.receive_json()
+        if frame["type"] == "state":
+            self.state = dict(frame["state"])
+            self.rev = self.state["rev"]
+        return frame
+
+    def apply(self, frame: dict) -> bool:
+        """Apply a patch frame; False (and a resync request) on a gap"""
+        if frame["base_rev"] != self.rev:
+            self.websocket.send_json({"type": "resync"})
+            return False
+        self.state.update(frame["patch"])
+        self.rev = self.state["rev"] = frame["rev"]
+        return True
+
+
+class DeltaProtocolTest(unittest.TestCase):
+
+    def setUp(self):
+        self.data_directory = tempfile.TemporaryDirectory()
+        self.get_data_directory = main.get_data_directory
+        main.get_data_directory = lambda: Path(self.data_directory.name)
+        main.matches.pop(MATCH_ID, None)
+        main.gfx_settings.pop(MATCH_ID, None)
+        main.gfx_settings_versions.pop(MATCH_ID, None)
+
+    def tearDown(self):
+        main.matches.pop(MATCH_ID, None)
+        main.gfx_settings.pop(MATCH_ID, None)
+        main.gfx_settings_versions.pop(MATCH_ID, None)
+        main.get_data_directory = self.get_data_directory
+        # Events bind to the loop of the test client
+        main.journal_wakeup = asyncio.Event()
+        main.timer_wakeup = asyncio.Event()
+        self.data_directory.cleanup()
+
+    def server_state(self, client: TestClient) -> dict:
+        return client.get(f"/api/match/{MATCH_ID}/state").json()
+
+    def score(self, client: TestClient, team: str, delta: int = 1):
+        response = client.post(f"/api/match/{MATCH_ID}/score", json={"team": team, "delta": delta})
+        self.assertEqual(response.status_code, 200)
+
+    def test_patches_rebuild_the_state(self):
+        with TestClient(main.app) as client:
+            with client.websocket_connect(f"/ws/match/{MATCH_ID}?protocol=2") as websocket:
+                overlay = DeltaClient(websocket)
+                self.assertEqual(overlay.receive()["type"], "state")
+
+                self.score(client, "home")
+                self.score(client, "away", 2)
+                response = client.post(f"/api/match/{MATCH_ID}/setup",
+                                       json={"homeName": "Ivanov", "awayName": "Petrov", "period": 2})
+                self.assertEqual(response.status_code, 200)
+                self.score(client, "home", -1)
+
+                for _ in range(4):
+                    frame = overlay.receive()
+                    self.assertNotIn("state", frame)
+                    if frame["type"] == "score_changed":
+                        # Only changed fields travel
+                        self.assertNotIn("homeName", frame["patch"])
+                    self.assertTrue(overlay.apply(frame))
+                self.assertEqual(overlay.state, self.server_state(client))
+
+    def test_gap_is_resolved_by_resync(self):
+        with TestClient(main.app) as client:
+            with client.websocket_connect(f"/ws/match/{MATCH_ID}?protocol=2") as websocket:
+                overlay = DeltaClient(websocket)
+                overlay.receive()
+
+                # The client misses the first patch
+                self.score(client, "home")
+                overlay.receive()
+                self.score(client, "away")
+                self.assertFalse(overlay.apply(overlay.receive()))
+
+                frame = overlay.receive()
+                self.assertEqual(frame["type"], "state")
+                self.assertEqual(overlay.state, self.server_state(client))
+
+                # Patches continue from the resynced state
+                self.score(client, "home", 3)
+                self.assertTrue(overlay.apply(overlay.receive()))
+                self.assertEqual(overlay.state, self.server_state(client))
+                self.assertEqual(overlay.state["homeScore"], 4)
+
+    def test_settings_with_nulls_are_sent_in_full(self):
+        with TestClient(main.app) as client:
+            with client.websocket_connect(f"/ws/match/{MATCH_ID}?protocol=2") as websocket:
+                websocket.receive_json()
+                url = f"/api/match/{MATCH_ID}/gfx-settings"
+
+                client.post(url, json={"layout": {"style": "vertical"}, "theme": "dark"})
+                frame = websocket.receive_json()
+                self.assertEqual(frame["type"], "gfxSettingsPatch")
+
+                # As a merge patch the nulls would delete the keys
+                settings = {"layout": {"style": "vertical", "separator": None}, "theme": None}
+                client.post(url, json=settings)
+                frame = websocket.receive_json()
+                self.assertEqual(frame["type"], "gfxSettings")
+                self.assertEqual(frame["settings"], settings)
+                self.assertEqual(frame["version"], 2)
+                self.assertEqual(client.get(url).json(), settings)
+
+                # Patches again once no null values are left
+                client.patch(url, json={"layout": {"separator": None}, "theme": "light"})
+                frame = websocket.receive_json()
+                self.assertEqual(frame["type"], "gfxSettingsPatch")
+                self.assertEqual(frame["base_version"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,255 @@
+"""
+Match journal: crash recovery from matches.snapshot.json plus the journal.
+
+Each test gets its own data directory and empty in-memory state. A crash is
+simulated either for real (a child process that ends with os._exit, so no
+shutdown compaction runs) or by dropping the in-memory state after the
+journal has been written.
+
+Run from the backend directory: python -m unittest discover tests
+"""
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+import unittest
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+import main  # noqa: E402
+
+
+def commands(*ops) -> list:
+    """Parse (op, args) pairs like a command batch"""
+    return main.parse_match_commands([main.MatchCommand(op=op, args=args or {}) for op, args in ops])
+
+
+def reset_state():
+    """Forget all matches, timers and journal progress of this process"""
+    for match_id in list(main.timer_deadlines):
+        main.stop_timer_task(match_id)
+    for registry in (main.matches, main.gfx_settings, main.gfx_settings_versions, main.retired_revs,
+                     main.payload_cache, main.match_changes, main.timer_deadlines):
+        registry.clear()
+    main.journal_buffer = []
+    main.journal_seq = 0
+    main.journal_records = 0
+    main.journal_task = None
+    if main.timer_scheduler_task is not None:
+        main.timer_scheduler_task.cancel()
+    main.timer_scheduler_task = None
+    # Events bind to the first loop that waits on them
+    main.journal_wakeup = asyncio.Event()
+    main.timer_wakeup = asyncio.Event()
+
+
+def written_seq() -> int:
+    """Sequence number of the last complete record on disk"""
+    seq = 0
+    if main.get_journal_snapshot_path().exists():
+        seq = json.loads(main.get_journal_snapshot_path().read_bytes())["seq"]
+    if main.get_journal_path().exists():
+        for line in reversed(main.get_journal_path().read_bytes().split(b"\n")[:-1]):
+            header = main.JOURNAL_RECORD_HEADER.match(line)
+            if header is not None:
+                return max(seq, int(header.group(1)))
+    return seq
+
+
+CRASHING_CHILD = textwrap.dedent("""
+    import asyncio, json, os, sys
+    from pathlib import Path
+    sys.path.insert(0, sys.argv[1])
+    import main
+
+    main.get_data_directory = lambda: Path(sys.argv[2])
+
+    def commands(*ops):
+        return main.parse_match_commands([main.MatchCommand(op=op, args=args) for op, args in ops])
+
+    async def scenario():
+        await main.run_match_commands("table1", commands(("score", {"team": "home", "delta": 3})))
+        await main.run_match_commands("table1", commands(("timer/set", {"seconds": 600}), ("timer/start", {})))
+        state = await main.run_match_commands("table2", commands(("fora", {"team": "away", "delta": 2})))
+        # Let the batched write reach the disk, then die without any shutdown work
+        await asyncio.sleep(main.JOURNAL_FLUSH_INTERVAL * 4)
+        print(json.dumps({"table1": main.matches["table1"].rev, "table2": state.rev}), flush=True)
+        os._exit(0)
+
+    asyncio.run(scenario())
+""")
+
+
+class JournalTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.loop = asyncio.new_event_loop()
+        cls.get_data_directory = main.get_data_directory
+        cls.compact_records = main.JOURNAL_COMPACT_RECORDS
+
+    @classmethod
+    def tearDownClass(cls):
+        reset_state()
+        # Let the cancelled tasks finish
+        cls.loop.run_until_complete(asyncio.sleep(0.01))
+        cls.loop.close()
+        main.get_data_directory = cls.get_data_directory
+
+    def setUp(self):
+        self.data_directory = tempfile.TemporaryDirectory()
+        self.data_path = Path(self.data_directory.name)
+        main.get_data_directory = lambda: self.data_path
+        reset_state()
+
+    def tearDown(self):
+        self.run_async(main.stop_journal())
+        reset_state()
+        main.JOURNAL_COMPACT_RECORDS = self.compact_records
+        self.data_directory.cleanup()
+
+    def run_async(self, coroutine):
+        return self.loop.run_until_complete(asyncio.wait_for(coroutine, 30))
+
+    def write_journal(self):
+        """Wait until every queued record is on disk, also one the journal task is writing"""
+        async def scenario():
+            await main.flush_journal()
+            while written_seq() < main.journal_seq:
+                await asyncio.sleep(0.01)
+
+        self.run_async(scenario())
+
+    def crash_and_recover(self) -> int:
+        """Write the journal, drop the in-memory state and recover it"""
+        self.write_journal()
+
+        async def scenario():
+            if main.journal_task is not None:
+                main.journal_task.cancel()
+            reset_state()
+            return main.recover_matches()
+
+        return self.run_async(scenario())
+
+    def test_replay_after_process_exit_with_running_timer(self):
+        result = subprocess.run(
+            [sys.executable, "-c", CRASHING_CHILD, str(BACKEND_DIR), str(self.data_path)],
+            capture_output=True, text=True, timeout=60
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        revs = json.loads(result.stdout.strip().splitlines()[-1])
+        self.assertFalse(main.get_journal_snapshot_path().exists())
+
+        async def recover():
+            return main.recover_matches()
+
+        self.assertEqual(self.run_async(recover()), 2)
+        table1, table2 = main.matches["table1"], main.matches["table2"]
+        self.assertEqual(table1.homeScore, 3)
+        self.assertEqual(table2.foraAway, 2)
+        self.assertEqual(table2.rev, revs["table2"])
+
+        # The timer continues from its deadline, past any rev used by unjournaled ticks
+        self.assertTrue(table1.timerRunning)
+        self.assertIn("table1", main.timer_deadlines)
+        self.assertTrue(590 <= table1.timerSecondsRemaining <= 600, table1.timerSecondsRemaining)
+        self.assertGreater(table1.rev, revs["table1"])
+
+    def test_expired_timer_is_stopped_on_recovery(self):
+        async def scenario():
+            await main.run_match_commands("table1", commands(("timer/set", {"seconds": 5}), ("timer/start", None)))
+
+        self.run_async(scenario())
+        # Move the journaled deadline into the past
+        main.timer_deadlines["table1"] -= 10
+        main.journal_match(main.matches["table1"])
+        self.crash_and_recover()
+
+        state = main.matches["table1"]
+        self.assertFalse(state.timerRunning)
+        self.assertEqual(state.timerSecondsRemaining, 0)
+        self.assertNotIn("table1", main.timer_deadlines)
+
+    def test_torn_last_line_is_ignored(self):
+        async def scenario():
+            for _ in range(3):
+                await main.run_match_commands("table1", commands(("score", {"team": "home", "delta": 1})))
+
+        self.run_async(scenario())
+        self.write_journal()
+        rev = main.matches["table1"].rev
+        with open(main.get_journal_path(), "ab") as f:
+            f.write(b'{"q":999,"m":"table1","s":{"match_id":"table1","homeSc')
+
+        self.crash_and_recover()
+        self.assertEqual(main.matches["table1"].homeScore, 3)
+        self.assertEqual(main.matches["table1"].rev, rev)
+
+        # Records written after the recovery are not glued to the torn line
+        self.run_async(main.run_match_commands("table1", commands(("score", {"team": "home", "delta": 1}))))
+        self.crash_and_recover()
+        self.assertEqual(main.matches["table1"].homeScore, 4)
+
+    def test_compaction_folds_the_journal_into_a_snapshot(self):
+        main.JOURNAL_COMPACT_RECORDS = 5
+
+        async def scenario():
+            for _ in range(12):
+                await main.run_match_commands("table1", commands(("score", {"team": "away", "delta": 1})))
+                await asyncio.sleep(main.JOURNAL_FLUSH_INTERVAL * 1.5)
+            await main.set_gfx_settings("table1", {"theme": "dark"})
+            await asyncio.sleep(main.JOURNAL_FLUSH_INTERVAL * 2)
+
+        self.run_async(scenario())
+        self.assertTrue(main.get_journal_snapshot_path().exists())
+        with open(main.get_journal_path(), "rb") as f:
+            self.assertLess(len(f.read().splitlines()), 12)
+        version = main.gfx_settings_versions["table1"]
+
+        self.crash_and_recover()
+        self.assertEqual(main.matches["table1"].awayScore, 12)
+        self.assertEqual(main.gfx_settings["table1"], {"theme": "dark"})
+        self.assertEqual(main.gfx_settings_versions["table1"], version)
+
+        # Records after the snapshot replay on top of it
+        self.run_async(main.compact_journal())
+        self.run_async(main.run_match_commands("table1", commands(("period/set", {"period": 2}))))
+        self.crash_and_recover()
+        self.assertEqual(main.matches["table1"].awayScore, 12)
+        self.assertEqual(main.matches["table1"].period, 2)
+
+    def test_removed_match_stays_removed(self):
+        async def scenario():
+            await main.run_match_commands("table1", commands(("score", {"team": "home", "delta": 1})))
+            await main.run_match_commands("table2", commands(("score", {"team": "home", "delta": 1})))
+            await main.delete_match("table1")
+
+        self.run_async(scenario())
+        self.crash_and_recover()
+        self.assertNotIn("table1", main.matches)
+        self.assertIn("table2", main.matches)
+
+        # A re-created match continues after its last rev, also after a restart
+        retired = main.retired_revs["table1"]
+        self.assertGreater(main.get_or_create_match("table1").rev, retired)
+        self.run_async(main.run_match_commands("table1", commands(("score", {"team": "away", "delta": 1}))))
+        self.crash_and_recover()
+        self.assertEqual(main.matches["table1"].awayScore, 1)
+        self.assertGreater(main.matches["table1"].rev, retired)
+
+        # Removal survives compaction as well
+        self.run_async(main.delete_match("table2"))
+        self.run_async(main.compact_journal())
+        self.crash_and_recover()
+        self.assertNotIn("table2", main.matches)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+"""
+Player index: removal by id, listing order and pagination cursors.
+
+Run from the backend directory: python -m unittest discover tests
+"""
+
+import random
+import sys
+import unittest
+from pathlib import Path
+
+from fastapi import HTTPException
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import main  # noqa: E402
+
+
+def make_tournament(created_at: list) -> main.Tournament:
+    """A tournament with players "0", "1", ... created at the given times"""
+    tournament = main.Tournament(id="t1", name="Test", created_at=0, players=[])
+    for i, timestamp in enumerate(created_at):
+        main.add_tournament_player(tournament, main.Player(id=str(i), name=f"Player {i}", created_at=timestamp))
+    return tournament
+
+
+def listed_ids(tournament: main.Tournament, q=None, cursor=None, limit=None) -> list:
+    return [player["id"] for player in main.list_tournament_players(tournament, q, cursor, limit)["players"]]
+
+
+def page_through(tournament: main.Tournament, limit: int, q=None) -> list:
+    """Ids of all pages of a listing, following next_cursor"""
+    ids, cursor = [], None
+    while True:
+        page = main.list_tournament_players(tournament, q, cursor, limit)
+        ids += [player["id"] for player in page["players"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return ids
+
+
+class PlayerIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        main.player_indexes.clear()
+        self.renumber = main.PLAYER_INDEX_RENUMBER
+
+    def tearDown(self):
+        main.player_indexes.clear()
+        main.PLAYER_INDEX_RENUMBER = self.renumber
+
+    def test_remove_by_id_keeps_order(self):
+        tournament = make_tournament([100 + i for i in range(6)])
+        for player_id in ("2", "0", "5"):
+            self.assertEqual(main.remove_tournament_player(tournament, player_id).id, player_id)
+        self.assertIsNone(main.remove_tournament_player(tournament, "2"))
+        self.assertIsNone(main.remove_tournament_player(tournament, "missing"))
+
+        self.assertEqual([p.id for p in tournament.players], ["1", "3", "4"])
+        self.assertEqual(listed_ids(tournament), ["4", "3", "1"])
+        self.assertEqual(listed_ids(tournament, q="player 3"), ["3"])
+        self.assertEqual(listed_ids(tournament, q="player 2"), [])
+
+    def test_remove_matches_list_across_renumbering(self):
+        main.PLAYER_INDEX_RENUMBER = 8
+        random.seed(1)
+        tournament = make_tournament([float(i) for i in range(40)])
+        expected = [p.id for p in tournament.players]
+        next_id = 40
+        for _ in range(200):
+            if expected and random.random() < 0.6:
+                player_id = random.choice(expected)
+                expected.remove(player_id)
+                main.remove_tournament_player(tournament, player_id)
+            else:
+                player = main.Player(id=str(next_id), name=f"Player {next_id}", created_at=float(next_id))
+                next_id += 1
+                expected.append(player.id)
+                main.add_tournament_player(tournament, player)
+            self.assertEqual([p.id for p in tournament.players], expected)
+
+        index = main.get_player_index(tournament)
+        self.assertEqual(sorted(index.by_id), sorted(expected))
+        self.assertEqual(len(index.by_name), len(expected))
+        self.assertEqual(len(index.by_recent), len(expected))
+
+    def test_equal_created_at_is_ordered_by_id(self):
+        tournament = make_tournament([50, 70, 70, 70, 60, 70])
+        self.assertEqual(listed_ids(tournament), ["1", "2", "3", "5", "4", "0"])
+        # Pages split inside the tie neither repeat nor skip a player
+        for limit in (1, 2, 4):
+            self.assertEqual(page_through(tournament, limit), ["1", "2", "3", "5", "4", "0"])
+
+    def test_equal_names_are_ordered_by_id(self):
+        tournament = main.Tournament(id="t1", name="Test", created_at=0, players=[])
+        for player_id in ("b", "a", "c"):
+            main.add_tournament_player(tournament, main.Player(id=player_id, name="Smith", created_at=1))
+        self.assertEqual(page_through(tournament, 1, q="smi"), ["a", "b", "c"])
+
+    def test_invalid_cursor_is_rejected(self):
+        tournament = make_tournament([1, 2, 3])
+        name_cursor = main.encode_player_cursor(("player 1", "1"))
+        for cursor in ("not base64!", "e30=", main.encode_player_cursor([1]), name_cursor):
+            with self.assertRaises(HTTPException) as raised:
+                main.list_tournament_players(tournament, None, cursor, 2)
+            self.assertEqual(raised.exception.status_code, 400, cursor)
+        # A cursor of the newest-first listing is not a name cursor either
+        recent_cursor = main.list_tournament_players(tournament, None, None, 1)["next_cursor"]
+        with self.assertRaises(HTTPException) as raised:
+            main.list_tournament_players(tournament, "player", recent_cursor, 2)
+        self.assertEqual(raised.exception.status_code, 400)
+
+    def test_stale_cursor_continues_after_its_position(self):
+        tournament = make_tournament([10, 20, 30, 40, 50])
+        page = main.list_tournament_players(tournament, None, None, 2)
+        self.assertEqual([p["id"] for p in page["players"]], ["4", "3"])
+
+        # The player the cursor points at is gone and a newer one was added
+        main.remove_tournament_player(tournament, "3")
+        main.add_tournament_player(tournament, main.Player(id="9", name="Player 9", created_at=60))
+        self.assertEqual(listed_ids(tournament, cursor=page["next_cursor"]), ["2", "1", "0"])
+
+        name_page = main.list_tournament_players(tournament, "player", None, 2)
+        main.remove_tournament_player(tournament, "1")
+        self.assertEqual(listed_ids(tournament, q="player", cursor=name_page["next_cursor"]), ["2", "4", "9"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+"""
+vMix file output: match ids whose file names collide after sanitizing.
+
+Run from the backend directory: python -m unittest discover tests
+"""
+
+import asyncio
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import main  # noqa: E402
+
+# All three are written to match_a_b.json on a file system that ignores case
+COLLIDING_IDS = ("a/b", "a_b", "A_B")
+
+
+class VMixFilesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.data_directory = tempfile.TemporaryDirectory()
+        self.data_path = Path(self.data_directory.name)
+        self.get_data_directory = main.get_data_directory
+        main.get_data_directory = lambda: self.data_path
+        (self.data_path / "vmix").mkdir()
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.run_until_complete(main.stop_vmix_files())
+        self.loop.run_until_complete(main.stop_journal())
+        self.loop.close()
+        for match_id in COLLIDING_IDS:
+            main.matches.pop(match_id, None)
+        main.vmix_files_enabled = False
+        main.vmix_files_written.clear()
+        main.vmix_file_owners.clear()
+        main.vmix_file_conflicts.clear()
+        main.get_data_directory = self.get_data_directory
+        main.journal_wakeup = asyncio.Event()
+        main.vmix_files_wakeup = asyncio.Event()
+        self.data_directory.cleanup()
+
+    def written_ids(self) -> list:
+        """Match id in each match_*.json file"""
+        return sorted(json.loads(path.read_bytes())[0]["match_id"]
+                      for path in (self.data_path / "vmix").glob("match_*.json"))
+
+    def test_colliding_ids_do_not_share_a_file(self):
+        async def scenario():
+            main.start_vmix_files()
+            for match_id in COLLIDING_IDS:
+                await main.run_match_commands(match_id, main.parse_match_commands(
+                    [main.MatchCommand(op="score", args={"team": "home", "delta": 1})]
+                ))
+            await main.flush_vmix_files()
+            owner = main.vmix_file_owners["match_a_b.json"]
+            self.assertEqual(self.written_ids(), [owner])
+
+            # Changes of the other matches never overwrite the owner's file
+            for match_id in COLLIDING_IDS:
+                await main.run_match_commands(match_id, main.parse_match_commands(
+                    [main.MatchCommand(op="score", args={"team": "away", "delta": 1})]
+                ))
+            await main.flush_vmix_files()
+            self.assertEqual(self.written_ids(), [owner])
+
+            # Once the owner is removed, one of the others takes the name over
+            await main.delete_match(owner)
+            await main.flush_vmix_files()
+            await main.flush_vmix_files()
+            successor = main.vmix_file_owners["match_a_b.json"]
+            self.assertNotEqual(successor, owner)
+            self.assertEqual(self.written_ids(), [successor])
+
+        self.loop.run_until_complete(scenario())
+
+
+if __name__ == "__main__":
+    unittest.main()
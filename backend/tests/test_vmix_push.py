@@ -0,0 +1,203 @@
+"""
+vMix push mode against a local stand-in for the vMix HTTP API.
+
+The stand-in records every SetText call, so the tests can check which title
+fields were sent, that bursts are coalesced, that failed calls are retried,
+and how long a change takes to reach vMix.
+
+Run from the backend directory: python -m unittest discover tests
+"""
+
+import asyncio
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import unittest
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import main  # noqa: E402
+
+
+class StandInVMix(ThreadingHTTPServer):
+    """HTTP server answering /api/?Function=... like vMix, recording each call"""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StandInHandler)
+        self.calls = []  # (perf_counter() on arrival, query parameters)
+        self.failures_left = 0  # Answer this many calls with HTTP 500
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/api/"
+
+    def set_text_calls(self, field: str) -> list:
+        """Values sent to a title field, in arrival order"""
+        with self.lock:
+            return [params["Value"] for _, params in self.calls
+                    if params.get("Function") == "SetText" and params.get("SelectedName") == field]
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, like vMix
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        params = dict(urllib.parse.parse_qsl(urllib.parse.urlsplit(self.path).query))
+        server = self.server
+        with server.lock:
+            failing = server.failures_left > 0
+            if failing:
+                server.failures_left -= 1
+            else:
+                server.calls.append((time.perf_counter(), params))
+        self.send_response(500 if failing else 200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+async def wait_until(predicate, timeout: float = 5.0):
+    """Wait until predicate() is true (fails the test after `timeout` seconds)"""
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        await asyncio.sleep(0.005)
+
+
+def score(team: str, delta: int = 1) -> list:
+    return main.parse_match_commands([main.MatchCommand(op="score", args={"team": team, "delta": delta})])
+
+
+class VMixPushTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # Module state (events, tasks) belongs to one event loop for the whole class
+        cls.loop = asyncio.new_event_loop()
+        cls.data_directory = tempfile.TemporaryDirectory()
+        cls.get_data_directory = main.get_data_directory
+        main.get_data_directory = lambda: Path(cls.data_directory.name)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.loop.run_until_complete(main.stop_vmix_push())
+        cls.loop.run_until_complete(main.stop_journal())
+        cls.loop.close()
+        main.get_data_directory = cls.get_data_directory
+        cls.data_directory.cleanup()
+
+    def setUp(self):
+        self.vmix = StandInVMix()
+        threading.Thread(target=self.vmix.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        main.configure_vmix_push(None)
+        self.vmix.shutdown()
+        self.vmix.server_close()
+
+    def run_async(self, coroutine):
+        return self.loop.run_until_complete(asyncio.wait_for(coroutine, 30))
+
+    def configure(self, match_id: str):
+        """Push balls and fora of a match to the title input "Score" """
+        main.configure_vmix_push(main.VMixPushConfig(url=self.vmix.url, targets=[
+            main.VMixPushTarget(match_id=match_id, input="Score", fields={
+                "balls_home": "Home.Text",
+                "balls_away": "Away.Text",
+                "fora_home": "ForaHome.Text"
+            })
+        ]))
+
+    def test_sends_only_changed_fields(self):
+        async def scenario():
+            self.configure("push-changed")
+            # Every mapped field is sent once when push mode is configured
+            await wait_until(lambda: len(self.vmix.calls) == 3)
+
+            await main.run_match_commands("push-changed", score("home"))
+            await wait_until(lambda: len(self.vmix.calls) == 4)
+            await asyncio.sleep(0.1)
+
+            self.assertEqual(len(self.vmix.calls), 4)
+            self.assertEqual(self.vmix.set_text_calls("Home.Text"), ["0", "1"])
+            self.assertEqual(self.vmix.set_text_calls("Away.Text"), ["0"])
+            self.assertEqual(self.vmix.set_text_calls("ForaHome.Text"), ["0"])
+
+        self.run_async(scenario())
+
+    def test_burst_collapses_into_one_call(self):
+        async def scenario():
+            self.configure("push-burst")
+            await wait_until(lambda: len(self.vmix.calls) == 3)
+
+            for _ in range(20):
+                await main.run_match_commands("push-burst", score("home"))
+            await wait_until(lambda: "20" in self.vmix.set_text_calls("Home.Text"))
+            await asyncio.sleep(0.1)
+
+            self.assertEqual(self.vmix.set_text_calls("Home.Text"), ["0", "20"])
+            self.assertEqual(len(self.vmix.calls), 4)
+
+        self.run_async(scenario())
+
+    def test_resumes_after_server_errors(self):
+        async def scenario():
+            retry_min = main.VMIX_PUSH_RETRY_MIN
+            main.VMIX_PUSH_RETRY_MIN = 0.05
+            try:
+                self.configure("push-retry")
+                await wait_until(lambda: len(self.vmix.calls) == 3)
+
+                self.vmix.failures_left = 3
+                failures = main.vmix_push_stats["failures"]
+                await main.run_match_commands("push-retry", score("away", 2))
+                await wait_until(lambda: self.vmix.set_text_calls("Away.Text") == ["0", "2"])
+
+                self.assertEqual(self.vmix.failures_left, 0)
+                self.assertEqual(main.vmix_push_stats["failures"] - failures, 3)
+
+                # Later changes go through normally
+                await main.run_match_commands("push-retry", score("away"))
+                await wait_until(lambda: self.vmix.set_text_calls("Away.Text") == ["0", "2", "3"])
+            finally:
+                main.VMIX_PUSH_RETRY_MIN = retry_min
+
+        self.run_async(scenario())
+
+    def test_end_to_end_latency(self):
+        async def scenario():
+            self.configure("push-latency")
+            await wait_until(lambda: len(self.vmix.calls) == 3)
+
+            # Changes spaced beyond the coalescing window, like score updates in a match
+            latencies = []
+            for value in range(1, 101):
+                await asyncio.sleep(main.VMIX_PUSH_WINDOW * 2)
+                started = time.perf_counter()
+                await main.run_match_commands("push-latency", score("home"))
+                await wait_until(lambda: len(self.vmix.calls) == 3 + value)
+                latencies.append(self.vmix.calls[-1][0] - started)
+
+            latencies.sort()
+            p50 = statistics.median(latencies)
+            p95 = latencies[int(len(latencies) * 0.95) - 1]
+            self.assertLess(p50, 0.1, f"mutation to SetText at the stand-in: p50 {p50 * 1000:.2f} ms, "
+                                      f"p95 {p95 * 1000:.2f} ms, max {latencies[-1] * 1000:.2f} ms")
+
+        self.run_async(scenario())
+
+
+if __name__ == "__main__":
+    unittest.main()
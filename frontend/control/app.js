@@ -11,6 +11,11 @@ let reconnectTimeout = null;
 let reconnectDelay = 1000; // Start with 1 second
 const maxReconnectDelay = 8000; // Max 8 seconds
 let currentState = null;
+let wsState = null; // Match state as known from the WebSocket (delta protocol)
+let resyncPending = false; // A snapshot was requested after a revision gap
+let commandSeq = 0; // Id of the last command sent over the WebSocket
+const pendingCommands = new Map(); // Command id -> {resolve, timeout} until its ack arrives
+const COMMAND_ACK_TIMEOUT = 5000; // ms
 let currentTournamentId = null;
 let tournamentsList = [];
 
@@ -881,6 +886,34 @@ function updatePlayerButtonSelection() {
 // WebSocket Connection
 // ============================================================================
 
+/**
+ * Resolve a WebSocket event to the full match state (delta protocol).
+ * Full "state" frames replace the local copy, patch frames are applied on top
+ * of it. On a revision gap a snapshot is requested and the frame is skipped.
+ */
+function resolveEventState(data) {
+    if (data.patch) {
+        if (wsState && data.rev <= wsState.rev) {
+            return null; // Already covered by a newer snapshot
+        }
+        if (!wsState || data.base_rev > wsState.rev) {
+            if (!resyncPending && ws && ws.readyState === WebSocket.OPEN) {
+                resyncPending = true;
+                ws.send(JSON.stringify({ type: 'resync' }));
+            }
+            return null;
+        }
+        wsState = Object.assign({}, wsState, data.patch, { rev: data.rev });
+        return wsState;
+    }
+    if (data.state) {
+        wsState = data.state;
+        resyncPending = false;
+        return wsState;
+    }
+    return null;
+}
+
 function connectWebSocket() {
     if (ws && ws.readyState === WebSocket.OPEN) {
         return;
@@ -896,7 +929,11 @@ function connectWebSocket() {
     }
     
     const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
-    const wsUrl = `${protocol}//${window.location.host}/ws/match/${matchId}`;
+    // Protocol 2: events carry only the changed fields (patches)
+    const wsUrl = `${protocol}//${window.location.host}/ws/match/${matchId}?protocol=2`;
+    
+    wsState = null;
+    resyncPending = false;
     
     try {
         ws = new WebSocket(wsUrl);
@@ -909,8 +946,13 @@ function connectWebSocket() {
         ws.onmessage = (event) => {
             try {
                 const data = JSON.parse(event.data);
-                if (data.state) {
-                    updateUI(data.state);
+                if (data.type === 'ack') {
+                    resolveCommand(data);
+                    return;
+                }
+                const state = resolveEventState(data);
+                if (state) {
+                    updateUI(state);
                 }
             } catch (error) {
                 console.error('Failed to parse WebSocket message:', error);
@@ -923,6 +965,7 @@ function connectWebSocket() {
         
         ws.onclose = (event) => {
             updateConnectionStatus(false);
+            failPendingCommands();
             if (event.code !== 1000) {
                 scheduleReconnect();
             }
@@ -949,7 +992,67 @@ function scheduleReconnect() {
 // REST API Calls
 // ============================================================================
 
+/**
+ * Send a match command over the open WebSocket. Resolves with the ack
+ * ({ok, rev} or {ok: false, status, detail}), or null if no ack arrived.
+ */
+function sendCommand(op, args) {
+    return new Promise((resolve) => {
+        const id = ++commandSeq;
+        const timeout = setTimeout(() => {
+            pendingCommands.delete(id);
+            resolve(null);
+        }, COMMAND_ACK_TIMEOUT);
+        pendingCommands.set(id, { resolve, timeout });
+        ws.send(JSON.stringify({ type: 'command', id, op, args: args || {} }));
+    });
+}
+
+function resolveCommand(ack) {
+    const pending = pendingCommands.get(ack.id);
+    if (pending) {
+        pendingCommands.delete(ack.id);
+        clearTimeout(pending.timeout);
+        pending.resolve(ack);
+    }
+}
+
+function failPendingCommands() {
+    for (const pending of pendingCommands.values()) {
+        clearTimeout(pending.timeout);
+        pending.resolve(null);
+    }
+    pendingCommands.clear();
+}
+
+function formatErrorDetail(detail) {
+    if (Array.isArray(detail)) {
+        return detail.map(error => error.msg).join('; ');
+    }
+    if (detail && typeof detail === 'object') {
+        return formatErrorDetail(detail.error);
+    }
+    return detail;
+}
+
 async function apiCall(endpoint, method = 'GET', body = null) {
+    // Commands go over the WebSocket when it is open: the new state arrives
+    // there as an event anyway, the ack only confirms it
+    if (method === 'POST' && ws && ws.readyState === WebSocket.OPEN) {
+        const ack = await sendCommand(endpoint.slice(1), body);
+        if (ack && ack.ok) {
+            return ack;
+        }
+        if (ack) {
+            console.error('Command error:', ack);
+            alert(`${t('error')}: ${formatErrorDetail(ack.detail) || t('unknownError')}`);
+        } else {
+            // Not retried over REST: the command may have been applied already
+            console.error('Command not acknowledged:', endpoint);
+        }
+        return null;
+    }
+    
     try {
         const options = {
             method,
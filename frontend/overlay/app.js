@@ -634,77 +634,72 @@ if (window.location.search.includes('preview=true')) {
             );
         }
     }, 200); // Check every 200ms for changes (preview mode only)
-} else {
-    // vMix mode: Periodically refresh settings from API (not localStorage)
-    // Use shorter interval for more responsive position updates
-    setInterval(async () => {
-        try {
-            const response = await fetch(`/api/match/${matchId}/gfx-settings`);
-            if (response.ok) {
-                const settings = await response.json();
-                if (settings && Object.keys(settings).length > 0) {
-                    // Normalize position values to ensure they're numbers (0-100) for consistent comparison
-                    if (settings.positions) {
-                        if (typeof settings.positions.scoreX === 'string' && settings.positions.scoreX.includes('%')) {
-                            settings.positions.scoreX = parseInt(settings.positions.scoreX.replace('%', '')) || 50;
-                        }
-                        if (typeof settings.positions.scoreY === 'string' && settings.positions.scoreY.includes('%')) {
-                            settings.positions.scoreY = parseInt(settings.positions.scoreY.replace('%', '')) || 50;
-                        }
-                        if (typeof settings.positions.infoX === 'string' && settings.positions.infoX.includes('%')) {
-                            settings.positions.infoX = parseInt(settings.positions.infoX.replace('%', '')) || 50;
-                        }
-                        if (typeof settings.positions.infoY === 'string' && settings.positions.infoY.includes('%') && settings.positions.infoY !== 'auto') {
-                            settings.positions.infoY = parseInt(settings.positions.infoY.replace('%', '')) || 80;
-                        }
-                        // Ensure absolutePositioning defaults to true if not explicitly false
-                        if (settings.positions.absolutePositioning === undefined) {
-                            settings.positions.absolutePositioning = true;
-                        }
-                    }
-                    
-                    // Ensure layout settings are present (for spacing, separator, etc.)
-                    if (!settings.layout) {
-                        settings.layout = {
-                            spacingScores: 40,
-                            spacingInfo: 30,
-                            separatorSize: 80,
-                            style: 'vertical',
-                            showMatchScores: false,
-                            matchScoreFormat: 'player1'
-                        };
-                    }
-                    
-                    // Ensure typography settings are present
-                    if (!settings.typography) {
-                        settings.typography = {
-                            fontFamily: "'Arial Black', 'Arial Bold', Arial, sans-serif",
-                            playerNameSize: 48,
-                            scoreSize: 120,
-                            gameTimerSize: 42,
-                            fontWeight: 900
-                        };
-                    }
-                    
-                    // Only apply if settings actually changed (avoid unnecessary re-renders)
-                    const settingsStr = JSON.stringify(settings);
-                    if (!window.lastSettingsStr || window.lastSettingsStr !== settingsStr) {
-                        window.lastSettingsStr = settingsStr;
-                        applyGFXSettings(settings);
-                        if (settings.visibility) {
-                            updateVisibility(
-                                settings.visibility.showGame !== false,
-                                settings.visibility.showTimer !== false
-                            );
-                        }
-                    }
-                }
-            }
-        } catch (e) {
-            // Silent fail - will retry on next interval
-            console.error('Failed to fetch GFX settings:', e);
+}
+
+// vMix mode: settings arrive over the WebSocket (full gfxSettings frame on
+// connect, then versioned merge patches), no polling needed
+function applyServerGFXSettings(settings) {
+    if (!settings || Object.keys(settings).length === 0) {
+        return;
+    }
+    settings = JSON.parse(JSON.stringify(settings));
+    
+    // Normalize position values to ensure they're numbers (0-100) for consistent comparison
+    if (settings.positions) {
+        if (typeof settings.positions.scoreX === 'string' && settings.positions.scoreX.includes('%')) {
+            settings.positions.scoreX = parseInt(settings.positions.scoreX.replace('%', '')) || 50;
+        }
+        if (typeof settings.positions.scoreY === 'string' && settings.positions.scoreY.includes('%')) {
+            settings.positions.scoreY = parseInt(settings.positions.scoreY.replace('%', '')) || 50;
         }
-    }, 1000); // Check API every 1 second for more responsive updates
+        if (typeof settings.positions.infoX === 'string' && settings.positions.infoX.includes('%')) {
+            settings.positions.infoX = parseInt(settings.positions.infoX.replace('%', '')) || 50;
+        }
+        if (typeof settings.positions.infoY === 'string' && settings.positions.infoY.includes('%') && settings.positions.infoY !== 'auto') {
+            settings.positions.infoY = parseInt(settings.positions.infoY.replace('%', '')) || 80;
+        }
+        // Ensure absolutePositioning defaults to true if not explicitly false
+        if (settings.positions.absolutePositioning === undefined) {
+            settings.positions.absolutePositioning = true;
+        }
+    }
+
+    // Ensure layout settings are present (for spacing, separator, etc.)
+    if (!settings.layout) {
+        settings.layout = {
+            spacingScores: 40,
+            spacingInfo: 30,
+            separatorSize: 80,
+            style: 'vertical',
+            showMatchScores: false,
+            matchScoreFormat: 'player1'
+        };
+    }
+
+    // Ensure typography settings are present
+    if (!settings.typography) {
+        settings.typography = {
+            fontFamily: "'Arial Black', 'Arial Bold', Arial, sans-serif",
+            playerNameSize: 48,
+            scoreSize: 120,
+            gameTimerSize: 42,
+            fontWeight: 900
+        };
+    }
+
+    // Only apply if settings actually changed (avoid unnecessary re-renders)
+    const settingsStr = JSON.stringify(settings);
+    if (!window.lastSettingsStr || window.lastSettingsStr !== settingsStr) {
+        window.lastSettingsStr = settingsStr;
+        applyGFXSettings(settings);
+        if (settings.visibility) {
+            updateVisibility(
+                settings.visibility.showGame !== false,
+                settings.visibility.showTimer !== false,
+                settings.visibility.showMatchScoreNextTimer === true
+            );
+        }
+    }
 }
 
 // Function to update visibility of game and timer displays
@@ -744,6 +739,13 @@ let reconnectTimeout = null;
 let reconnectDelay = 1000; // Start with 1 second
 const maxReconnectDelay = 8000; // Max 8 seconds
 let currentState = null;
+let wsState = null; // Match state as known from the WebSocket (delta protocol)
+let resyncPending = false; // A snapshot was requested after a revision gap
+let gfxSettingsState = null; // GFX settings as known from the WebSocket
+let gfxVersion = null; // Version of gfxSettingsState on the server
+let settingsResyncPending = false; // Full settings were requested after a version gap
+let timerDeadline = null; // performance.now() time at which the running timer hits 0
+let timerFrame = null; // requestAnimationFrame id of the local countdown
 
 // DOM Elements
 const elements = {
@@ -788,6 +790,40 @@ function formatTimer(seconds) {
     }
 }
 
+/**
+ * Sync the local countdown with the server timer (deadline timer protocol).
+ * The server sends the remaining time with every event while the timer runs
+ * and only resyncs occasionally, so the overlay renders the countdown itself.
+ */
+function syncTimer(state, timer) {
+    if (state && state.timerRunning && timer) {
+        timerDeadline = performance.now() + timer.remainingMs;
+        if (timerFrame === null) {
+            timerFrame = requestAnimationFrame(renderTimer);
+        }
+    } else if (!state || !state.timerRunning) {
+        timerDeadline = null;
+    }
+}
+
+/**
+ * Render the local countdown once per animation frame while the timer runs
+ */
+function renderTimer() {
+    if (timerDeadline === null || !currentState || !currentState.timerRunning) {
+        timerDeadline = null;
+        timerFrame = null;
+        return;
+    }
+    
+    const remaining = Math.max(0, Math.ceil((timerDeadline - performance.now()) / 1000));
+    const text = formatTimer(remaining);
+    if (elements.timerValue.textContent !== text) {
+        elements.timerValue.textContent = text;
+    }
+    timerFrame = requestAnimationFrame(renderTimer);
+}
+
 /**
  * Update UI with current state
  */
@@ -914,8 +950,10 @@ function updateUI(state, eventType = null, changed = null) {
     // Update period (display in brackets)
     elements.periodValue.textContent = `(${state.period || 1})`;
     
-    // Update timer
-    elements.timerValue.textContent = formatTimer(state.timerSecondsRemaining || 0);
+    // Update timer (the local countdown takes over while it is running)
+    if (timerDeadline === null || !state.timerRunning) {
+        elements.timerValue.textContent = formatTimer(state.timerSecondsRemaining || 0);
+    }
     
     // Update match score next to timer (total games played)
     if (elements.matchScoreNextTimer) {
@@ -1052,13 +1090,94 @@ async function fetchState() {
 // WebSocket Connection with Exponential Backoff Reconnection
 // ============================================================================
 
+/**
+ * Resolve a WebSocket event to the full match state (delta protocol).
+ * Full "state" frames replace the local copy, patch frames are applied on top
+ * of it. On a revision gap a snapshot is requested and the frame is skipped.
+ */
+function resolveEventState(data) {
+    if (data.patch) {
+        if (wsState && data.rev <= wsState.rev) {
+            return null; // Already covered by a newer snapshot
+        }
+        if (!wsState || data.base_rev > wsState.rev) {
+            if (!resyncPending && ws && ws.readyState === WebSocket.OPEN) {
+                resyncPending = true;
+                ws.send(JSON.stringify({ type: 'resync' }));
+            }
+            return null;
+        }
+        wsState = Object.assign({}, wsState, data.patch, { rev: data.rev });
+        return wsState;
+    }
+    if (data.state) {
+        wsState = data.state;
+        resyncPending = false;
+        return wsState;
+    }
+    return null;
+}
+
+/**
+ * Apply an RFC 7386 JSON merge patch: null removes a key, objects merge
+ * recursively, anything else replaces the value.
+ */
+function mergePatch(target, patch) {
+    if (patch === null || typeof patch !== 'object' || Array.isArray(patch)) {
+        return patch;
+    }
+    const result = (target && typeof target === 'object' && !Array.isArray(target)) ? Object.assign({}, target) : {};
+    for (const key of Object.keys(patch)) {
+        if (patch[key] === null) {
+            delete result[key];
+        } else {
+            result[key] = mergePatch(result[key], patch[key]);
+        }
+    }
+    return result;
+}
+
+/**
+ * Track versioned GFX settings frames. Returns the full settings to apply,
+ * or null when the frame was skipped (full settings are requested on a gap).
+ */
+function resolveGFXSettings(data) {
+    if (data.type === 'gfxSettings') {
+        gfxSettingsState = data.settings || {};
+        gfxVersion = data.version;
+        settingsResyncPending = false;
+        return gfxSettingsState;
+    }
+    if (gfxVersion !== null && data.version <= gfxVersion) {
+        return null;
+    }
+    if (gfxSettingsState === null || data.base_version !== gfxVersion) {
+        if (!settingsResyncPending && ws && ws.readyState === WebSocket.OPEN) {
+            settingsResyncPending = true;
+            ws.send(JSON.stringify({ type: 'resyncSettings' }));
+        }
+        return null;
+    }
+    gfxSettingsState = mergePatch(gfxSettingsState, data.patch);
+    gfxVersion = data.version;
+    return gfxSettingsState;
+}
+
 function connectWebSocket() {
     if (ws && ws.readyState === WebSocket.OPEN) {
         return;
     }
     
     const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
-    const wsUrl = `${protocol}//${window.location.host}/ws/match/${matchId}`;
+    // Deadline timer protocol: no per-second frames, the countdown runs locally
+    // Protocol 2: events carry only the changed fields (patches)
+    const wsUrl = `${protocol}//${window.location.host}/ws/match/${matchId}?timer=deadline&protocol=2`;
+    
+    wsState = null;
+    resyncPending = false;
+    gfxSettingsState = null;
+    gfxVersion = null;
+    settingsResyncPending = false;
     
     try {
         ws = new WebSocket(wsUrl);
@@ -1073,34 +1192,37 @@ function connectWebSocket() {
                 const data = JSON.parse(event.data);
                 
                 // Handle GFX settings updates via WebSocket (for vMix - no localStorage needed)
-                if (data.type === 'gfxSettings' && data.settings) {
-                    applyGFXSettings(data.settings);
-                    if (data.settings.visibility) {
-                        updateVisibility(
-                            data.settings.visibility.showGame !== false,
-                            data.settings.visibility.showTimer !== false,
-                            data.settings.visibility.showMatchScoreNextTimer === true
-                        );
-                    }
+                if (data.type === 'gfxSettings' || data.type === 'gfxSettingsPatch') {
+                    applyServerGFXSettings(resolveGFXSettings(data));
                     return; // Don't process as state update
                 }
                 
-                if (data.state) {
+                const state = resolveEventState(data);
+                if (state) {
+                    syncTimer(state, data.timer);
+                    
+                    // A batch event carries the individual changes in order
+                    const entries = data.type === 'batch' && data.changed
+                        ? data.changed.events || []
+                        : [{ type: data.type, changed: data.changed }];
+                    const resetEntry = entries.find(entry => entry.type === 'setup' || entry.type === 'reset');
+                    
                     // Update UI with event type and change info
                     updateUI(
-                        data.state,
-                        data.type,
+                        state,
+                        resetEntry ? resetEntry.type : data.type,
                         data.changed
                     );
                     
-                    // Special handling for score_changed event
-                    if (data.type === 'score_changed' && data.changed) {
-                        const team = data.changed.team;
-                        if (team === 'home') {
-                            animateScoreChange(elements.homeScore, data.state.homeScore || 0);
-                        } else if (team === 'away') {
-                            animateScoreChange(elements.awayScore, data.state.awayScore || 0);
-                        }
+                    // Special handling for score_changed event (once per team)
+                    const scoredTeams = new Set(entries
+                        .filter(entry => entry.type === 'score_changed' && entry.changed)
+                        .map(entry => entry.changed.team));
+                    if (scoredTeams.has('home')) {
+                        animateScoreChange(elements.homeScore, state.homeScore || 0);
+                    }
+                    if (scoredTeams.has('away')) {
+                        animateScoreChange(elements.awayScore, state.awayScore || 0);
                     }
                 }
             } catch (error) {